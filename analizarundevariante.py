@@ -1,9 +1,20 @@
-
-import pandas as pd
+import streamlit as st
 import numpy as np
-import plotly.express as px
-from numba import jit
+from numba import get_num_threads, set_num_threads
+from numba import config as numba_config
 from collections import Counter
+from ingestie import NUMAR_MAXIM, parseaza_runde, parseaza_variante
+from motor import (
+    BINOM, MARIME_COMBINARE, CacheRezultate, RundeChenar, StocVariante, cautare_exhaustiva,
+    filtrare_variante_finale_hibrid, histograma_chenare, incalzeste, mesaj_linii_respinse, recente_chenare, statistici_din_histograma, top_recente,
+    top_stabilitate
+)
+from lucrari import Lucrare, LucrareAnulata, fond_lucrari
+from pachet import DIRECTOR_PACHETE, directorul_pachet, incarca_pachet, salveaza_pachet
+from depozit import DepozitRezultate, filtrare_hibrid_memorata
+from instrumentare import Instrumentare, activeaza, etapa, opreste_urmarirea_memoriei
+from frecvente import numere_calde_reci, statistici_numere
+from export import csv_variante, parquet_disponibil, parquet_variante, previzualizare, text_variante
 
 # Configurare pagină
 st.set_page_config(
@@ -16,165 +27,317 @@ st.set_page_config(
 st.title("🎰 Verificare Variante Loterie")
 st.divider()
 
+# Încălzire o singură dată per proces de server: nucleele Numba se compilează sau, după primul
+# deploy, se încarcă din cache-ul de pe disc înainte de prima interacțiune
+@st.cache_resource(show_spinner="Pregătire nuclee de calcul...")
+def stare_server():
+    return {'incalzire': incalzeste(), 'prim_rezultat': None}
+
+def inregistreaza_rezultat(secunde):
+    """Reține durata primului rezultat calculat în acest proces de server (timpul până la primul rezultat)"""
+    server = stare_server()
+    if server['prim_rezultat'] is None:
+        server['prim_rezultat'] = secunde
+
+# Fondul de fire pentru lucrările de fundal, comun tuturor sesiunilor
+@st.cache_resource
+def fond_server():
+    return fond_lucrari()
+
+# Punctajele seturilor filtrate pot rămâne pe disc între sesiuni (opțiune pe pagina de filtrare)
+@st.cache_resource
+def depozit_server():
+    return DepozitRezultate()
+
+stare_server()
+
+# Funcții legate de sesiune (session_state)
+def raporteaza_linii_respinse(sursa, linii_respinse):
+    """Reține avertismentul pentru liniile respinse; se afișează după st.rerun()"""
+    if len(linii_respinse) > 0:
+        st.session_state.avertismente_ingestie.append(mesaj_linii_respinse(sursa, linii_respinse))
+
+def marcheaza_date_modificate():
+    """Invalidează histograma din cache după orice modificare a rundelor sau variantelor"""
+    st.session_state.versiune_date += 1
+
+def porneste_lucrare(cheie, functie, *argumente, context=None, **optiuni):
+    """Trimite funcția în fundal (anulând lucrarea anterioară cu aceeași cheie) și o reține în sesiune.
+
+    Chenarele se dau ca listă copiată (list(...)): pagina poate înlocui chenare cât timp lucrarea rulează.
+    """
+    veche = st.session_state.lucrari.pop(cheie, None)
+    if veche is not None:
+        veche.anuleaza()
+    st.session_state.lucrari_anulate.pop(cheie, None)
+    lucrare = Lucrare(fond_server(), functie, *argumente, numar_fire=get_num_threads(), context=context, **optiuni)
+    st.session_state.lucrari[cheie] = lucrare
+    return lucrare
+
+def histograma_sesiune():
+    """Histograma variantelor din sesiune pe rundele din sesiune - recalculată în fundal doar la modificarea datelor.
+
+    Returnează None cât timp lucrarea e în curs sau dacă a fost anulată pentru versiunea curentă a datelor.
+    """
+    versiune = st.session_state.versiune_date
+    cache = st.session_state.histograma_cache
+    if cache is not None and cache[0] == versiune:
+        return cache[1]
+    
+    lucrare = st.session_state.lucrari.get('histograma')
+    anulata = st.session_state.lucrari_anulate.get('histograma')
+    if (lucrare is None or lucrare.context['versiune'] != versiune) and (anulata is None or anulata.context['versiune'] != versiune):
+        porneste_lucrare(
+            'histograma', histograma_chenare, st.session_state.variante.masti, list(st.session_state.runde_chenare),
+            st.session_state.cache_rezultate, context={'versiune': versiune}
+        )
+    return None
+
+def recente_sesiune():
+    """Sumele cumulative pe runde recente pentru datele din sesiune - ca histograma_sesiune, calculate în fundal"""
+    versiune = st.session_state.versiune_date
+    cache = st.session_state.recente_cache
+    if cache is not None and cache[0] == versiune:
+        return cache[1]
+    
+    lucrare = st.session_state.lucrari.get('recente')
+    anulata = st.session_state.lucrari_anulate.get('recente')
+    if (lucrare is None or lucrare.context['versiune'] != versiune) and (anulata is None or anulata.context['versiune'] != versiune):
+        porneste_lucrare(
+            'recente', recente_chenare, st.session_state.variante.masti, list(st.session_state.runde_chenare),
+            st.session_state.cache_rezultate, context={'versiune': versiune}
+        )
+    return None
+
+# Livrarea rezultatelor în sesiune, la prima rulare după terminarea lucrării
+def livreaza_histograma(lucrare):
+    if lucrare.context['versiune'] == st.session_state.versiune_date:
+        st.session_state.histograma_cache = (lucrare.context['versiune'], lucrare.rezultat())
+        inregistreaza_rezultat(lucrare.durata)
+
+def statistici_numere_sesiune(c, fereastra):
+    """Statisticile numerelor chenarului c, recalculate doar la schimbarea datelor, a chenarului sau a ferestrei"""
+    cheie = (st.session_state.versiune_date, c, fereastra)
+    cache = st.session_state.statistici_numere_cache
+    if cache is None or cache[0] != cheie:
+        st.session_state.statistici_numere_cache = (cheie, statistici_numere(st.session_state.runde_chenare[c], fereastra))
+    return st.session_state.statistici_numere_cache[1]
+
+def livreaza_recente(lucrare):
+    if lucrare.context['versiune'] == st.session_state.versiune_date:
+        st.session_state.recente_cache = (lucrare.context['versiune'], lucrare.rezultat())
+
+def livreaza_filtrare(lucrare):
+    variante_filtrate, aparitii_finale = lucrare.rezultat()
+    inregistreaza_rezultat(lucrare.durata)
+    st.session_state.variante_filtrate_finale = variante_filtrate
+    
+    mod_text = "cu sortare pe runde" if lucrare.context['usar_runde'] else "fără runde (ordine originală)"
+    st.session_state.mesaje_lucrari['filtrare'] = [
+        (st.success, f"✅ Filtrat ({mod_text}): {lucrare.context['numar_input']} → {len(variante_filtrate)} variante!"),
+        (st.info, f"📊 Numere unice: {np.count_nonzero(aparitii_finale)} | Max apariții: {aparitii_finale.max()}")
+    ]
+
+def livreaza_cautare(lucrare):
+    rezultate, aparitii_exhaustiv = lucrare.rezultat()
+    inregistreaza_rezultat(lucrare.durata)
+    st.session_state.rezultate_exhaustive = rezultate
+    st.session_state.mesaje_lucrari['cautare'] = [
+        (st.success, f"✅ {len(rezultate)} variante din {BINOM[NUMAR_MAXIM, MARIME_COMBINARE]:,} combinări "
+                     f"în {lucrare.durata:.1f}s"),
+        (st.info, f"📊 Numere unice: {np.count_nonzero(aparitii_exhaustiv)} | Max apariții: {aparitii_exhaustiv.max()}")
+    ]
+
+LUCRARI = {
+    'histograma': ("Scorare variante pe runde", livreaza_histograma),
+    'recente': ("Sume cumulative pe runde recente", livreaza_recente),
+    'filtrare': ("Filtrare hibrid", livreaza_filtrare),
+    'cautare': ("Căutare exhaustivă", livreaza_cautare),
+}
+
+def livreaza_lucrari():
+    """Mută în sesiune rezultatele lucrărilor terminate"""
+    for cheie, lucrare in list(st.session_state.lucrari.items()):
+        if not lucrare.in_curs():
+            del st.session_state.lucrari[cheie]
+            try:
+                LUCRARI[cheie][1](lucrare)
+            except Exception:
+                # Lucrarea eșuată se păstrează ca una anulată, deci nu repornește singură la rularea următoare
+                st.session_state.lucrari_anulate[cheie] = lucrare
+
+def eroare_lucrare(cheie):
+    """Excepția lucrării oprite cu cheia dată, dacă a eșuat (None dacă a fost anulată sau încă se oprește)"""
+    lucrare = st.session_state.lucrari_anulate.get(cheie)
+    if lucrare is None or lucrare.in_curs() or lucrare.viitor.cancelled():
+        return None
+    eroare = lucrare.viitor.exception()
+    return None if isinstance(eroare, LucrareAnulata) else eroare
+
+def afiseaza_oprire(cheie, text_anulare):
+    """Eroarea lucrării oprite, dacă a eșuat, altfel avertismentul de anulare"""
+    eroare = eroare_lucrare(cheie)
+    if eroare is not None:
+        st.error(f"❌ {LUCRARI[cheie][0]} a eșuat: {eroare}")
+    else:
+        st.warning(text_anulare)
+
+def afiseaza_mesaje(cheie):
+    """Mesajele lăsate de livrarea unei lucrări (afișate o singură dată) și eroarea ei, dacă a eșuat"""
+    for afisare, text in st.session_state.mesaje_lucrari.pop(cheie, []):
+        afisare(text)
+    eroare = eroare_lucrare(cheie)
+    if eroare is not None:
+        st.error(f"❌ {LUCRARI[cheie][0]} a eșuat: {eroare}")
+
+# Listele lungi (runde, variante) se afișează pe pagini: se construiește textul doar pentru pagina curentă
+MARIME_PAGINA = 100
+
+def selector_pagina(n, cheie):
+    """Selector de pagină pentru n rânduri; returnează intervalul [inceput, sfarsit) afișat"""
+    n_pagini = max(1, -(-n // MARIME_PAGINA))
+    pagina = 1
+    if n_pagini > 1:
+        pagina = st.number_input(f"Pagina (din {n_pagini})", min_value=1, max_value=n_pagini, value=1, key=cheie)
+    inceput = (pagina - 1) * MARIME_PAGINA
+    return inceput, min(inceput + MARIME_PAGINA, n)
+
+def afiseaza_runde(runde, cheie):
+    """Rundele unui chenar, paginat, într-un singur tabel"""
+    inceput, sfarsit = selector_pagina(len(runde), cheie)
+    st.dataframe({
+        "#": np.arange(inceput + 1, sfarsit + 1),
+        "Rundă": [','.join(map(str, runde.runda(j))) for j in range(inceput, sfarsit)]
+    }, use_container_width=True, height=150, hide_index=True)
+
+# Rezultatele se previzualizează parțial; fișierele complete se generează doar la descărcare
+LINII_PREVIZUALIZARE = 100
+
+def afiseaza_export(variante, eticheta, cheie, nume_fisier):
+    """Previzualizare (primele linii) + descărcare TXT / CSV / Parquet"""
+    if len(variante) > LINII_PREVIZUALIZARE:
+        eticheta = f"{eticheta} (primele {LINII_PREVIZUALIZARE} din {len(variante)})"
+    # Valoarea se pune prin session_state: un widget cu cheie și-ar păstra altfel textul vechi după recalculare
+    st.session_state[cheie] = previzualizare(variante, LINII_PREVIZUALIZARE)
+    st.text_area(eticheta, height=300, key=cheie)
+    
+    col_d1, col_d2, col_d3 = st.columns(3)
+    with col_d1:
+        st.download_button("⬇️ TXT", data=lambda: text_variante(variante), file_name=f"{nume_fisier}.txt",
+                           mime="text/plain", key=f"{cheie}_txt", on_click="ignore", use_container_width=True)
+    with col_d2:
+        st.download_button("⬇️ CSV", data=lambda: csv_variante(variante), file_name=f"{nume_fisier}.csv",
+                           mime="text/csv", key=f"{cheie}_csv", on_click="ignore", use_container_width=True)
+    with col_d3:
+        if parquet_disponibil():
+            st.download_button("⬇️ Parquet", data=lambda: parquet_variante(variante), file_name=f"{nume_fisier}.parquet",
+                               mime="application/vnd.apache.parquet", key=f"{cheie}_parquet", on_click="ignore",
+                               use_container_width=True)
+
+def optiuni_runde_recente(cheie):
+    """Fereastra (ultimele N runde per chenar, None = toate) și factorul de descreștere pe runde"""
+    col_r1, col_r2 = st.columns(2)
+    with col_r1:
+        fereastra = st.number_input(
+            "🕒 Doar ultimele N runde din fiecare chenar (0 = toate):",
+            min_value=0,
+            value=0,
+            step=50,
+            key=f"fereastra_{cheie}",
+            help="Punctajele se calculează doar pe cele mai recente N runde (ultimele adăugate) ale fiecărui chenar."
+        )
+    with col_r2:
+        descrestere = st.slider(
+            "📉 Descreștere per rundă (1.00 = fără):",
+            min_value=0.80,
+            max_value=1.00,
+            value=1.00,
+            step=0.01,
+            key=f"descrestere_{cheie}",
+            help="Runda cea mai recentă are ponderea 1, fiecare rundă mai veche ponderea anterioară × factor."
+        )
+    return (fereastra or None), descrestere
+
+@st.fragment(run_every=0.5)
+def panou_lucrare(cheie):
+    """Progresul unei lucrări, cu buton de anulare; se reîmprospătează singur și reîncarcă pagina la final"""
+    lucrare = st.session_state.lucrari.get(cheie)
+    if lucrare is None:
+        return
+    if not lucrare.in_curs():
+        st.rerun()
+    
+    text, _ = LUCRARI[cheie]
+    col_p1, col_p2 = st.columns([4, 1])
+    with col_p1:
+        st.progress(lucrare.progres, text=f"⏳ {text}... {lucrare.progres * 100:.0f}%")
+    with col_p2:
+        if st.button("⏹️ Anulează", key=f"anuleaza_{cheie}", use_container_width=True):
+            st.session_state.lucrari.pop(cheie, None)
+            lucrare.anuleaza()
+            st.session_state.lucrari_anulate[cheie] = lucrare
+            st.rerun()
+
 # Inițializare session state
 if 'runde_chenare' not in st.session_state:
-    st.session_state.runde_chenare = [[] for _ in range(7)]
+    st.session_state.runde_chenare = [RundeChenar() for _ in range(7)]
 
 if 'variante' not in st.session_state:
-    st.session_state.variante = []
+    st.session_state.variante = StocVariante()
 
 if 'variante_filtrate_finale' not in st.session_state:
-    st.session_state.variante_filtrate_finale = []
-
-# Funcții Numba pentru viteză maximă
-@jit(nopython=True)
-def verifica_varianta_numba(varianta, runda):
-    """Verifică câte numere se potrivesc între variantă și rundă"""
-    count = 0
-    for v in varianta:
-        for r in runda:
-            if v == r:
-                count += 1
-                break
-    return count
-
-@jit(nopython=True)
-def calculeaza_punctaj_numba(potriviri):
-    """Calculează punctaj bazat pe potriviri"""
-    if potriviri == 2:
-        return 5
-    elif potriviri == 3:
-        return 8
-    elif potriviri == 4:
-        return 10
-    return 0
-
-@jit(nopython=True)
-def calculeaza_statistici_chenar(variante_arr, runde_arr, numar_minim):
-    """Calculează statistici pentru un chenar"""
-    castiguri = 0
-    count_2_4 = 0
-    count_3_4 = 0
-    count_4_4 = 0
-    punctaje_lista = []
-    
-    for runda in runde_arr:
-        for varianta in variante_arr:
-            potriviri = verifica_varianta_numba(varianta, runda)
-            
-            if potriviri >= numar_minim:
-                castiguri += 1
-            
-            punctaj = calculeaza_punctaj_numba(potriviri)
-            if punctaj > 0:
-                punctaje_lista.append(punctaj)
-                
-                if potriviri == 4:
-                    count_4_4 += 1
-                elif potriviri == 3:
-                    count_3_4 += 1
-                elif potriviri == 2:
-                    count_2_4 += 1
-    
-    return castiguri, count_2_4, count_3_4, count_4_4, np.array(punctaje_lista)
-
-def aplica_restrictie_diversitate(variante_sortate, max_aparitii):
-    """Aplică restricția de diversitate - fiecare număr apare maxim X ori"""
-    counter_numere = Counter()
-    variante_filtrate = []
-    
-    for var in variante_sortate:
-        poate_adauga = True
-        
-        for num in var['numere']:
-            if counter_numere[num] + 1 > max_aparitii:
-                poate_adauga = False
-                break
-        
-        if poate_adauga:
-            variante_filtrate.append(var)
-            for num in var['numere']:
-                counter_numere[num] += 1
-        
-        if len(variante_filtrate) >= 100:
-            break
-    
-    return variante_filtrate, counter_numere
-
-def filtrare_variante_finale_hibrid(toate_variantele, runde_chenare, usar_runde, max_aparitii_finale, target_count):
-    """Filtrează variante HIBRID - cu sau fără runde pentru sortare"""
-    
-    # PAS 1: Sortare (dacă se folosesc runde)
-    if usar_runde and any(len(runde) > 0 for runde in runde_chenare):
-        # Calculează punctaj pentru fiecare variantă
-        variante_cu_punctaj = []
-        
-        for var_obj in toate_variantele:
-            varianta = np.array(var_obj['numere'], dtype=np.int64)
-            punctaj_total = 0
-            chenare_active = 0
-            
-            for i in range(7):
-                if not runde_chenare[i]:
-                    continue
-                    
-                runde_arr = np.array(runde_chenare[i], dtype=np.int64)
-                punctaj_chenar = 0
-                are_potriviri = False
-                
-                for runda in runde_arr:
-                    potriviri = verifica_varianta_numba(varianta, runda)
-                    punctaj = calculeaza_punctaj_numba(potriviri)
-                    punctaj_chenar += punctaj
-                    
-                    if potriviri >= 2:
-                        are_potriviri = True
-                
-                punctaj_total += punctaj_chenar
-                
-                if are_potriviri:
-                    chenare_active += 1
-            
-            variante_cu_punctaj.append({
-                'id': var_obj['id'],
-                'numere': var_obj['numere'],
-                'punctaj_total': punctaj_total,
-                'chenare_active': chenare_active
-            })
-        
-        # Sortare după punctaj
-        variante_sortate = sorted(variante_cu_punctaj, key=lambda x: (-x['chenare_active'], -x['punctaj_total']))
-    else:
-        # Fără sortare - ordinea originală
-        variante_sortate = toate_variantele
-    
-    # PAS 2: Filtrare diversitate (max apariții)
-    counter_numere = Counter()
-    variante_filtrate = []
-    
-    for var in variante_sortate:
-        poate_adauga = True
-        
-        for num in var['numere']:
-            if counter_numere[num] + 1 > max_aparitii_finale:
-                poate_adauga = False
-                break
-        
-        if poate_adauga:
-            variante_filtrate.append(var)
-            for num in var['numere']:
-                counter_numere[num] += 1
-        
-        if len(variante_filtrate) >= target_count:
-            break
-    
-    return variante_filtrate, counter_numere
+    st.session_state.variante_filtrate_finale = StocVariante()
+
+if 'rezultate_exhaustive' not in st.session_state:
+    st.session_state.rezultate_exhaustive = StocVariante()
+
+# Versiunea datelor crește la fiecare modificare a rundelor sau variantelor;
+# histograma potrivirilor se recalculează doar când versiunea se schimbă
+if 'versiune_date' not in st.session_state:
+    st.session_state.versiune_date = 0
+
+if 'histograma_cache' not in st.session_state:
+    st.session_state.histograma_cache = None
+
+# Sumele cumulative pe runde recente (fereastră / descreștere), calculate doar la cerere
+if 'recente_cache' not in st.session_state:
+    st.session_state.recente_cache = None
+
+if 'statistici_numere_cache' not in st.session_state:
+    st.session_state.statistici_numere_cache = None
+
+if 'cache_rezultate' not in st.session_state:
+    st.session_state.cache_rezultate = CacheRezultate()
+
+if 'avertismente_ingestie' not in st.session_state:
+    st.session_state.avertismente_ingestie = []
+
+# Lucrări de fundal în curs, cele anulate (nu se repornesc singure) și mesajele rezultatelor livrate
+if 'lucrari' not in st.session_state:
+    st.session_state.lucrari = {}
+
+if 'lucrari_anulate' not in st.session_state:
+    st.session_state.lucrari_anulate = {}
+
+if 'mesaje_lucrari' not in st.session_state:
+    st.session_state.mesaje_lucrari = {}
+
+# Măsurătorile pe etape (opționale), păstrate între rulări
+if 'instrumentare' not in st.session_state:
+    st.session_state.instrumentare = Instrumentare()
+
+livreaza_lucrari()
+
+# Avertismentele de la ultima încărcare (rămân vizibile o singură rulare)
+for avertisment in st.session_state.avertismente_ingestie:
+    st.warning(avertisment)
+st.session_state.avertismente_ingestie = []
 
 # MENIU LATERAL - NAVIGARE
 st.sidebar.title("🎯 Navigare")
 pagina = st.sidebar.radio(
     "Selectează modul:",
-    ["📊 Analiză Runde + Variante", "🔬 Filtrare Hibrid Variante"],
+    ["📊 Analiză Runde + Variante", "🔬 Filtrare Hibrid Variante", "🔎 Căutare Exhaustivă"],
     index=0
 )
 
@@ -190,7 +353,47 @@ else:
     st.sidebar.info("📋 Nicio rundă încărcată")
 
 st.sidebar.divider()
-st.sidebar.info("**Analiză**: Verifică variante pe runde\n\n**Filtrare Hibrid**: Filtrează cu/fără runde")
+
+# Fire de execuție pentru calculele paralele
+numar_fire = st.sidebar.number_input(
+    "🧵 Fire de execuție:",
+    min_value=1,
+    max_value=numba_config.NUMBA_NUM_THREADS,
+    value=numba_config.NUMBA_NUM_THREADS,
+    help="Numărul de nuclee folosite la calcul. Datele mici rulează oricum serial."
+)
+set_num_threads(numar_fire)
+
+cache_rezultate = st.session_state.cache_rezultate
+if cache_rezultate.gasite + cache_rezultate.ratate > 0:
+    st.sidebar.caption(
+        f"💾 Cache: {cache_rezultate.octeti / 1024**2:.1f} MB | "
+        f"{cache_rezultate.gasite}/{cache_rezultate.gasite + cache_rezultate.ratate} chenare din cache"
+    )
+
+# Instrumentarea pe etape e opțională: tracemalloc și evenimentele Numba costă, deci doar la cerere
+instrumentare_activa = st.sidebar.toggle(
+    "⏱️ Instrumentare pe etape",
+    key="instrumentare_activa",
+    on_change=lambda: None if st.session_state.instrumentare_activa else opreste_urmarirea_memoriei(),
+    help="Măsoară timpul, compilarea Numba, debitul și memoria pe fiecare etapă (parsare, nuclee, sortare, randare)."
+)
+activeaza(st.session_state.instrumentare if instrumentare_activa else None)
+if instrumentare_activa:
+    st.session_state.instrumentare.rulare += 1
+panou_instrumentare = st.sidebar.container()
+
+# Lucrările în curs rămân vizibile (și anulabile) de pe orice pagină; se completează la finalul rulării
+panou_lucrari = st.sidebar.container()
+
+# Timpii de pornire se completează la finalul rulării, după ce pagina a calculat rezultatul
+panou_pornire = st.sidebar.empty()
+
+st.sidebar.divider()
+st.sidebar.info("**Analiză**: Verifică variante pe runde\n\n**Filtrare Hibrid**: Filtrează cu/fără runde\n\n**Căutare Exhaustivă**: Toate combinările de 4 numere")
+
+# Randarea întregii pagini e o etapă; secțiunile mai scumpe au etape proprii, imbricate
+randare_pagina = etapa(f"randare pagină: {pagina}").porneste()
 
 # =====================================================
 # PAGINA 1: ANALIZĂ RUNDE + VARIANTE
@@ -227,20 +430,13 @@ if pagina == "📊 Analiză Runde + Variante":
                     if idx >= 7:  # Max 7 chenare
                         break
                     
-                    content = uploaded_file.read().decode('utf-8')
-                    linii = content.strip().split('\n')
-                    runde_noi = []
-                    
-                    for linie in linii:
-                        try:
-                            numere = [int(n.strip()) for n in linie.split(',') if n.strip()]
-                            if numere:
-                                runde_noi.append(numere)
-                        except:
-                            pass
+                    valori, offsets, linii_respinse = parseaza_runde(uploaded_file.getvalue())
+                    raporteaza_linii_respinse(uploaded_file.name, linii_respinse)
+                    runde_noi = RundeChenar(valori, offsets)
                     
                     if runde_noi:
                         st.session_state.runde_chenare[idx] = runde_noi
+                        marcheaza_date_modificate()
                         incarcate += 1
                 
                 if incarcate > 0:
@@ -249,6 +445,31 @@ if pagina == "📊 Analiză Runde + Variante":
             else:
                 st.warning("⚠️ Selectează fișierele mai întâi!")
     
+    # PACHET BINAR - salvare / reîncărcare fără parsare
+    with st.expander("💾 Set de date salvat (pachet binar)"):
+        st.caption(f"Salvează chenarele și variantele într-un subdirector al „{DIRECTOR_PACHETE}” de pe server; la încărcare "
+                   "fișierele se mapează direct în memorie, fără parsare.")
+        director_pachet = st.text_input("Director pachet:", value="pachet_date", key="director_pachet")
+        
+        col_p1, col_p2 = st.columns(2)
+        with col_p1:
+            if st.button("💾 Salvează", use_container_width=True, key="salveaza_pachet"):
+                try:
+                    cale_pachet = directorul_pachet(director_pachet)
+                    salveaza_pachet(cale_pachet, st.session_state.runde_chenare, st.session_state.variante)
+                    st.success(f"✅ Salvat în {cale_pachet}")
+                except (OSError, ValueError) as eroare:
+                    st.error(f"Nu s-a putut salva: {eroare}")
+        
+        with col_p2:
+            if st.button("📂 Încarcă", use_container_width=True, key="incarca_pachet"):
+                try:
+                    st.session_state.runde_chenare, st.session_state.variante = incarca_pachet(directorul_pachet(director_pachet))
+                    marcheaza_date_modificate()
+                    st.rerun()
+                except (OSError, ValueError) as eroare:
+                    st.error(f"Nu s-a putut încărca: {eroare}")
+    
     st.divider()
     
     # Primul rând - 4 chenare
@@ -260,27 +481,20 @@ if pagina == "📊 Analiză Runde + Variante":
             uploaded_file = st.file_uploader(f"Import .txt", type=['txt'], key=f"upload_{i}")
             
             if uploaded_file is not None:
-                content = uploaded_file.read().decode('utf-8')
-                linii = content.strip().split('\n')
-                runde_noi = []
-                
-                for linie in linii:
-                    try:
-                        numere = [int(n.strip()) for n in linie.split(',') if n.strip()]
-                        if numere:
-                            runde_noi.append(numere)
-                    except:
-                        pass
+                valori, offsets, linii_respinse = parseaza_runde(uploaded_file.getvalue())
+                raporteaza_linii_respinse(uploaded_file.name, linii_respinse)
+                runde_noi = RundeChenar(valori, offsets)
                 
                 if runde_noi:
                     st.session_state.runde_chenare[i] = runde_noi
+                    marcheaza_date_modificate()
                     st.success(f"✅ {len(runde_noi)} runde")
                     st.rerun()
             
             text_runde = st.text_area(
-                "Format: 1,6,7,9,44,77",
+                "Format: 1,6,7,9,44,61",
                 height=100,
-                placeholder="1,6,7,9,44,77",
+                placeholder="1,6,7,9,44,61",
                 key=f"input_runde_{i}"
             )
             
@@ -288,34 +502,26 @@ if pagina == "📊 Analiză Runde + Variante":
             with col_btn1:
                 if st.button("Adaugă", type="primary", use_container_width=True, key=f"add_runde_{i}"):
                     if text_runde.strip():
-                        linii = text_runde.strip().split('\n')
-                        runde_noi = []
-                        
-                        for linie in linii:
-                            try:
-                                numere = [int(n.strip()) for n in linie.split(',') if n.strip()]
-                                if numere:
-                                    runde_noi.append(numere)
-                            except:
-                                pass
+                        valori, offsets, linii_respinse = parseaza_runde(text_runde)
+                        raporteaza_linii_respinse(f"Chenar {i+1}", linii_respinse)
+                        runde_noi = RundeChenar(valori, offsets)
                         
                         if runde_noi:
-                            st.session_state.runde_chenare[i].extend(runde_noi)
+                            st.session_state.runde_chenare[i] = st.session_state.runde_chenare[i].adauga(runde_noi)
+                            marcheaza_date_modificate()
                             st.success(f"✅ {len(runde_noi)} runde")
                             st.rerun()
             
             with col_btn2:
                 if st.button("Șterge", use_container_width=True, key=f"del_runde_{i}"):
-                    st.session_state.runde_chenare[i] = []
+                    st.session_state.runde_chenare[i] = RundeChenar()
+                    marcheaza_date_modificate()
                     st.rerun()
             
             if st.session_state.runde_chenare[i]:
                 st.caption(f"Total: {len(st.session_state.runde_chenare[i])} runde")
                 
-                container_runde = st.container(height=150)
-                with container_runde:
-                    for j, runda in enumerate(st.session_state.runde_chenare[i], 1):
-                        st.text(f"{j}. {','.join(map(str, runda))}")
+                afiseaza_runde(st.session_state.runde_chenare[i], f"pagina_runde_{i}")
     
     # Al doilea rând - 3 chenare
     cols_rand2 = st.columns(3)
@@ -327,27 +533,20 @@ if pagina == "📊 Analiză Runde + Variante":
             uploaded_file = st.file_uploader(f"Import .txt", type=['txt'], key=f"upload_{idx}")
             
             if uploaded_file is not None:
-                content = uploaded_file.read().decode('utf-8')
-                linii = content.strip().split('\n')
-                runde_noi = []
-                
-                for linie in linii:
-                    try:
-                        numere = [int(n.strip()) for n in linie.split(',') if n.strip()]
-                        if numere:
-                            runde_noi.append(numere)
-                    except:
-                        pass
+                valori, offsets, linii_respinse = parseaza_runde(uploaded_file.getvalue())
+                raporteaza_linii_respinse(uploaded_file.name, linii_respinse)
+                runde_noi = RundeChenar(valori, offsets)
                 
                 if runde_noi:
                     st.session_state.runde_chenare[idx] = runde_noi
+                    marcheaza_date_modificate()
                     st.success(f"✅ {len(runde_noi)} runde")
                     st.rerun()
             
             text_runde = st.text_area(
-                "Format: 1,6,7,9,44,77",
+                "Format: 1,6,7,9,44,61",
                 height=100,
-                placeholder="1,6,7,9,44,77",
+                placeholder="1,6,7,9,44,61",
                 key=f"input_runde_{idx}"
             )
             
@@ -355,86 +554,137 @@ if pagina == "📊 Analiză Runde + Variante":
             with col_btn1:
                 if st.button("Adaugă", type="primary", use_container_width=True, key=f"add_runde_{idx}"):
                     if text_runde.strip():
-                        linii = text_runde.strip().split('\n')
-                        runde_noi = []
-                        
-                        for linie in linii:
-                            try:
-                                numere = [int(n.strip()) for n in linie.split(',') if n.strip()]
-                                if numere:
-                                    runde_noi.append(numere)
-                            except:
-                                pass
+                        valori, offsets, linii_respinse = parseaza_runde(text_runde)
+                        raporteaza_linii_respinse(f"Chenar {idx+1}", linii_respinse)
+                        runde_noi = RundeChenar(valori, offsets)
                         
                         if runde_noi:
-                            st.session_state.runde_chenare[idx].extend(runde_noi)
+                            st.session_state.runde_chenare[idx] = st.session_state.runde_chenare[idx].adauga(runde_noi)
+                            marcheaza_date_modificate()
                             st.success(f"✅ {len(runde_noi)} runde")
                             st.rerun()
             
             with col_btn2:
                 if st.button("Șterge", use_container_width=True, key=f"del_runde_{idx}"):
-                    st.session_state.runde_chenare[idx] = []
+                    st.session_state.runde_chenare[idx] = RundeChenar()
+                    marcheaza_date_modificate()
                     st.rerun()
             
             if st.session_state.runde_chenare[idx]:
                 st.caption(f"Total: {len(st.session_state.runde_chenare[idx])} runde")
                 
-                container_runde = st.container(height=150)
-                with container_runde:
-                    for j, runda in enumerate(st.session_state.runde_chenare[idx], 1):
-                        st.text(f"{j}. {','.join(map(str, runda))}")
+                afiseaza_runde(st.session_state.runde_chenare[idx], f"pagina_runde_{idx}")
+    
+    # STATISTICI NUMERE - frecvențe, perechi și numere calde / reci pe rundele unui chenar
+    chenare_cu_runde = [i for i in range(7) if len(st.session_state.runde_chenare[i]) > 0]
+    if chenare_cu_runde:
+        with st.expander("📈 Statistici numere per chenar"):
+            col_s1, col_s2, col_s3 = st.columns(3)
+            with col_s1:
+                chenar_statistici = st.selectbox(
+                    "Chenar:", chenare_cu_runde, format_func=lambda i: f"Chenar {i+1}", key="chenar_statistici"
+                )
+            with col_s2:
+                fereastra_statistici = st.number_input(
+                    "Fereastră - ultimele N runde (0 = toate):", min_value=0, value=0, step=50, key="fereastra_statistici"
+                )
+            with col_s3:
+                numar_calde_reci = st.number_input(
+                    "Numere calde / reci:", min_value=1, max_value=33, value=10, key="numar_calde_reci"
+                )
+            
+            statistici = statistici_numere_sesiune(chenar_statistici, fereastra_statistici or None)
+            runde_fereastra = statistici['runde_fereastra']
+            st.caption(f"Fereastră: ultimele {runde_fereastra} din {statistici['runde']} runde")
+            
+            # Numere calde / reci: apariții în fereastră, comparate cu rata pe tot istoricul
+            calde, reci = numere_calde_reci(statistici, numar_calde_reci)
+            
+            def tabel_numere(numere):
+                return {
+                    "Număr": numere,
+                    "Apariții": statistici['frecvente_fereastra'][numere - 1],
+                    "% fereastră": np.round(statistici['frecvente_fereastra'][numere - 1] / max(runde_fereastra, 1) * 100, 1),
+                    "% total": np.round(statistici['frecvente'][numere - 1] / max(statistici['runde'], 1) * 100, 1),
+                    "Runde de la ultima apariție": statistici['ultima_aparitie'][numere - 1],
+                }
+            
+            col_c1, col_c2 = st.columns(2)
+            with col_c1:
+                st.markdown("**🔥 Numere calde**")
+                st.dataframe(tabel_numere(calde), use_container_width=True, hide_index=True)
+            with col_c2:
+                st.markdown("**🧊 Numere reci**")
+                st.dataframe(tabel_numere(reci), use_container_width=True, hide_index=True)
+            
+            # Graficele (plotly și harta 66 × 66) se construiesc doar la cerere: expanderul rulează și închis
+            if st.toggle("📊 Grafice frecvențe și perechi", value=False, key="grafice_statistici"):
+                import plotly.express as px
+                
+                fig = px.bar(
+                    x=np.arange(1, NUMAR_MAXIM + 1),
+                    y=statistici['frecvente_fereastra'],
+                    labels=dict(x="Număr", y="Apariții"),
+                    title="Frecvența numerelor în fereastră"
+                )
+                fig.update_layout(height=350)
+                st.plotly_chart(fig, use_container_width=True)
+                
+                # Diagonala (frecvența numărului) ar domina scala de culori
+                perechi = statistici['perechi'].copy()
+                np.fill_diagonal(perechi, 0)
+                etichete = [str(n) for n in range(1, NUMAR_MAXIM + 1)]
+                fig = px.imshow(
+                    perechi,
+                    labels=dict(x="Număr", y="Număr", color="Runde comune"),
+                    x=etichete,
+                    y=etichete,
+                    color_continuous_scale="YlOrRd",
+                    title="Co-apariția perechilor în fereastră"
+                )
+                fig.update_layout(height=700)
+                st.plotly_chart(fig, use_container_width=True)
     
     st.divider()
     
     # SECȚIUNEA VARIANTE
     st.header("🎲 Variante")
     
-    text_variante = st.text_area(
-        "Format: 1, 6 7 5 77",
+    text_introdus_variante = st.text_area(
+        "Format: 1, 6 7 5 61",
         height=150,
-        placeholder="1, 6 7 5 77\n2, 4 65 45 23",
+        placeholder="1, 6 7 5 61\n2, 4 65 45 23",
         key="input_variante_bulk"
     )
     
     col_btn3, col_btn4 = st.columns(2)
     with col_btn3:
         if st.button("Adaugă", type="primary", use_container_width=True, key="add_var"):
-            if text_variante.strip():
-                linii = text_variante.strip().split('\n')
-                variante_noi = []
+            if text_introdus_variante.strip():
+                ids_noi, numere_noi, linii_respinse = parseaza_variante(text_introdus_variante)
+                raporteaza_linii_respinse("Variante", linii_respinse)
                 
-                for linie in linii:
-                    try:
-                        parti = linie.split(',', 1)
-                        if len(parti) == 2:
-                            id_var = parti[0].strip()
-                            numere_str = parti[1].strip()
-                            numere = [int(n.strip()) for n in numere_str.split() if n.strip()]
-                            if numere:
-                                variante_noi.append({
-                                    'id': id_var,
-                                    'numere': numere
-                                })
-                    except:
-                        pass
-                
-                if variante_noi:
-                    st.session_state.variante.extend(variante_noi)
-                    st.success(f"✅ {len(variante_noi)} variante")
+                if len(ids_noi) > 0:
+                    st.session_state.variante.adauga(StocVariante(ids_noi, numere_noi))
+                    marcheaza_date_modificate()
+                    st.success(f"✅ {len(ids_noi)} variante")
                     st.rerun()
     
     with col_btn4:
         if st.button("Șterge", use_container_width=True, key="del_var"):
-            st.session_state.variante = []
+            st.session_state.variante = StocVariante()
+            marcheaza_date_modificate()
             st.rerun()
     
     if st.session_state.variante:
         st.caption(f"Total: {len(st.session_state.variante)} variante")
         
-        container_variante = st.container(height=250)
-        with container_variante:
-            for var in st.session_state.variante:
-                st.text(f"ID {var['id']}: {' '.join(map(str, var['numere']))}")
+        stoc_variante = st.session_state.variante
+        inceput, sfarsit = selector_pagina(len(stoc_variante), "pagina_variante")
+        st.dataframe({
+            "ID": stoc_variante.ids[inceput:sfarsit],
+            "Numere": [' '.join(map(str, stoc_variante.numere_varianta(j))) for j in range(inceput, sfarsit)]
+        }, use_container_width=True, height=250, hide_index=True)
     
     st.divider()
     
@@ -442,7 +692,19 @@ if pagina == "📊 Analiză Runde + Variante":
     are_runde = any(len(runde) > 0 for runde in st.session_state.runde_chenare)
     are_variante = len(st.session_state.variante) > 0
     
-    if are_runde and are_variante:
+    # Histograma se calculează în fundal; progresul e în bara laterală, iar pagina se reîncarcă la final
+    histograma = histograma_sesiune() if are_runde and are_variante else None
+    if are_runde and are_variante and histograma is None:
+        if 'histograma' in st.session_state.lucrari:
+            st.info("⏳ Variantele se scorează pe runde în fundal (progresul e în bara laterală) - poți folosi celelalte pagini între timp.")
+        else:
+            afiseaza_oprire('histograma', "⏹️ Calculul a fost anulat.")
+            if st.button("▶️ Reia calculul", key="reia_histograma"):
+                st.session_state.lucrari_anulate.pop('histograma', None)
+                st.rerun()
+    
+    if histograma is not None:
+        sectiune = etapa("Pagina 1: secțiunea 1 - statistici (randare)").porneste()
         
         # SECȚIUNEA 1 - ANALIZĂ CLASICĂ
         st.header("🏆 Secțiunea 1 - Analiză Clasică")
@@ -462,18 +724,22 @@ if pagina == "📊 Analiză Runde + Variante":
         
         cols_stats = st.columns(7)
         
-        variante_arr = np.array([var['numere'] for var in st.session_state.variante], dtype=np.int64)
+        # Histograma potrivirilor se calculează o dată per modificare a datelor;
+        # slider-ele de mai jos folosesc doar reduceri ieftine peste ea
+        castiguri_chenare, count_2_4_chenare, count_3_4_chenare, count_4_4_chenare, suma_punctaj_chenare = statistici_din_histograma(
+            histograma, numar_minim
+        )
         
         for i in range(7):
             with cols_stats[i]:
                 if st.session_state.runde_chenare[i]:
-                    runde_arr = np.array(st.session_state.runde_chenare[i], dtype=np.int64)
-                    
-                    castiguri_chenar, count_2_4, count_3_4, count_4_4, punctaje_chenar = calculeaza_statistici_chenar(
-                        variante_arr, runde_arr, numar_minim
-                    )
+                    castiguri_chenar = castiguri_chenare[i]
+                    count_2_4 = count_2_4_chenare[i]
+                    count_3_4 = count_3_4_chenare[i]
+                    count_4_4 = count_4_4_chenare[i]
                     
-                    medie_punctaj = np.mean(punctaje_chenar) if len(punctaje_chenar) > 0 else 0
+                    numar_punctate = count_2_4 + count_3_4 + count_4_4
+                    medie_punctaj = suma_punctaj_chenare[i] / numar_punctate if numar_punctate > 0 else 0
                     coverage = (castiguri_chenar / (len(st.session_state.runde_chenare[i]) * len(st.session_state.variante)) * 100) if castiguri_chenar > 0 else 0
                     
                     st.metric(f"Chenar {i+1}", f"{castiguri_chenar}")
@@ -490,12 +756,13 @@ if pagina == "📊 Analiză Runde + Variante":
         with rezultate_container:
             for i in range(7):
                 if st.session_state.runde_chenare[i]:
-                    runde_arr = np.array(st.session_state.runde_chenare[i], dtype=np.int64)
-                    castiguri_total, _, _, _, _ = calculeaza_statistici_chenar(variante_arr, runde_arr, numar_minim)
+                    castiguri_total = castiguri_chenare[i]
                     st.text(f"Chenarul {i+1} - {castiguri_total} variante câștigătoare")
         
         st.divider()
         
+        sectiune.opreste()
+        
         # SECȚIUNEA 2 - TOP 100 STABILITATE
         st.header("💎 Secțiunea 2 - TOP 100 Stabilitate")
         
@@ -507,65 +774,56 @@ if pagina == "📊 Analiză Runde + Variante":
             help="Fiecare număr poate apărea maxim de atâtea ori în cele 100 variante."
         )
         
+        fereastra_top, descrestere_top = optiuni_runde_recente("top")
+        # Sumele cumulative se calculează o singură dată; orice fereastră sau descreștere se citește din ele
+        pe_runde_recente = fereastra_top is not None or descrestere_top != 1.0
+        recente = recente_sesiune() if pe_runde_recente else None
+        if pe_runde_recente and recente is None:
+            if 'recente' in st.session_state.lucrari:
+                st.info("⏳ Sumele pe runde recente se calculează în fundal - până atunci TOP-ul e pe toate rundele.")
+            else:
+                afiseaza_oprire('recente', "⏹️ Calculul pe runde recente a fost anulat - TOP-ul e pe toate rundele.")
+                if st.button("▶️ Reia calculul", key="reia_recente"):
+                    st.session_state.lucrari_anulate.pop('recente', None)
+                    st.rerun()
+        
         st.divider()
         
-        with st.spinner('Calculare TOP 100...'):
-            rezultate = []
-            
-            for var_obj in st.session_state.variante:
-                var_id = var_obj['id']
-                varianta = np.array(var_obj['numere'], dtype=np.int64)
-                
-                punctaje_per_chenar = []
-                chenare_active = 0
-                punctaj_total = 0
-                
-                for i in range(7):
-                    if not st.session_state.runde_chenare[i]:
-                        punctaje_per_chenar.append(0)
-                        continue
-                        
-                    runde_arr = np.array(st.session_state.runde_chenare[i], dtype=np.int64)
-                    punctaj_chenar = 0
-                    are_potriviri = False
-                    
-                    for runda in runde_arr:
-                        potriviri = verifica_varianta_numba(varianta, runda)
-                        punctaj = calculeaza_punctaj_numba(potriviri)
-                        punctaj_chenar += punctaj
-                        
-                        if potriviri >= 2:
-                            are_potriviri = True
-                    
-                    punctaje_per_chenar.append(punctaj_chenar)
-                    punctaj_total += punctaj_chenar
-                    
-                    if are_potriviri:
-                        chenare_active += 1
-                
-                sd = np.std(punctaje_per_chenar)
-                
-                rezultate.append({
-                    'id': var_id,
-                    'numere': var_obj['numere'],
-                    'punctaj_total': punctaj_total,
-                    'chenare_active': chenare_active,
-                    'sd': sd,
-                    'punctaje_per_chenar': punctaje_per_chenar
-                })
+        with st.spinner('Calculare TOP 100...'), etapa("Pagina 1: TOP 100 (calcul)", elemente=len(st.session_state.variante)):
+            stoc_variante = st.session_state.variante
+            if recente is not None:
+                indici_top, aparitii_top = top_recente(stoc_variante, recente, max_aparitii, 100, fereastra_top, descrestere_top)
+            else:
+                indici_top, aparitii_top = top_stabilitate(stoc_variante, histograma, max_aparitii, 100)
+            punctaje = stoc_variante.coloane['punctaje_per_chenar']
+            punctaj_total_var = stoc_variante.coloane['punctaj_total']
+            chenare_active_var = stoc_variante.coloane['chenare_active']
+            sd_var = stoc_variante.coloane['sd']
             
-            rezultate_sortate = sorted(rezultate, key=lambda x: (-x['chenare_active'], -x['punctaj_total'], x['sd']))
-            top_100, counter_numere = aplica_restrictie_diversitate(rezultate_sortate, max_aparitii)
+            # Doar câștigătorii devin înregistrări pentru afișare
+            top_100 = [
+                {
+                    'id': stoc_variante.ids[idx_var],
+                    'numere': stoc_variante.numere_varianta(idx_var),
+                    'punctaj_total': punctaj_total_var[idx_var].item(),
+                    'chenare_active': int(chenare_active_var[idx_var]),
+                    'sd': float(sd_var[idx_var]),
+                    'punctaje_per_chenar': punctaje[idx_var].tolist()
+                }
+                for idx_var in indici_top
+            ]
         
         st.success(f"✅ TOP {len(top_100)} Variante - Cu diversitate maximă!")
         
-        numere_peste_limita = [num for num, count in counter_numere.items() if count > max_aparitii]
-        st.info(f"📊 Numere unice folosite: {len(counter_numere)} din 66 | Maxim apariții găsite: {max(counter_numere.values()) if counter_numere else 0} | Peste limită: {len(numere_peste_limita)} numere")
+        numere_peste_limita = np.count_nonzero(aparitii_top > max_aparitii)
+        st.info(f"📊 Numere unice folosite: {np.count_nonzero(aparitii_top)} din {NUMAR_MAXIM} | Maxim apariții găsite: {aparitii_top.max()} | Peste limită: {numere_peste_limita} numere")
         
         st.divider()
         
         # HEATMAP
+        sectiune = etapa("Pagina 1: heatmap (randare)").porneste()
         st.subheader("🔥 Heatmap Distribuție Punctaj")
+        import plotly.express as px
         
         heatmap_data = []
         labels_y = []
@@ -592,75 +850,38 @@ if pagina == "📊 Analiză Runde + Variante":
         
         st.divider()
         
+        sectiune.opreste()
+        
         # FORMAT 1 - TABEL DETALIAT
+        sectiune = etapa("Pagina 1: tabel TOP + export (randare)").porneste()
         st.subheader("📋 Format 1 - Tabel Detaliat")
         
-        col_h1, col_h2, col_h3, col_h4, col_h5, col_h6, col_h7 = st.columns([1, 2, 4, 2, 2, 2, 2])
-        with col_h1:
-            st.markdown("**#**")
-        with col_h2:
-            st.markdown("**ID**")
-        with col_h3:
-            st.markdown("**Numere**")
-        with col_h4:
-            st.markdown("**Punctaj**")
-        with col_h5:
-            st.markdown("**Chenare**")
-        with col_h6:
-            st.markdown("**SD**")
-        with col_h7:
-            st.markdown("**Detalii**")
+        # Un singur tabel cu coloane de punctaj per chenar, construit direct din tablourile TOP
+        insigne = [
+            ("⭐ " if sd_var[idx_var] < 50.0 else "") + ("🎯 " if chenare_active_var[idx_var] >= 5 else "") + ("🏆 " if loc == 0 else "")
+            for loc, idx_var in enumerate(indici_top)
+        ]
+        tabel_top = {
+            "#": np.arange(1, len(indici_top) + 1),
+            "ID": stoc_variante.ids[indici_top],
+            "Numere": [' '.join(map(str, stoc_variante.numere_varianta(idx_var))) for idx_var in indici_top],
+            "Punctaj": np.round(punctaj_total_var[indici_top], 2),
+            "Chenare": [f"{chenare}/7" for chenare in chenare_active_var[indici_top]],
+            "SD": np.round(sd_var[indici_top], 2),
+        }
+        for i in range(punctaje.shape[1]):
+            tabel_top[f"C{i+1}"] = np.round(punctaje[indici_top, i], 2)
+        tabel_top["Insigne"] = insigne
         
-        st.divider()
-        
-        tabel_container = st.container(height=400)
-        with tabel_container:
-            for idx, item in enumerate(top_100, 1):
-                badge = ""
-                if item['sd'] < 50.0:
-                    badge += "⭐ "
-                if item['chenare_active'] >= 5:
-                    badge += "🎯 "
-                if idx == 1:
-                    badge += "🏆 "
-                
-                col_t1, col_t2, col_t3, col_t4, col_t5, col_t6, col_t7 = st.columns([1, 2, 4, 2, 2, 2, 2])
-                
-                with col_t1:
-                    st.text(f"#{idx}")
-                with col_t2:
-                    st.text(f"ID {item['id']}")
-                with col_t3:
-                    st.text(' '.join(map(str, item['numere'])))
-                with col_t4:
-                    st.text(f"{item['punctaj_total']}")
-                with col_t5:
-                    st.text(f"{item['chenare_active']}/7")
-                with col_t6:
-                    st.text(f"{item['sd']:.2f}")
-                with col_t7:
-                    with st.expander("👁️"):
-                        for i, punctaj in enumerate(item['punctaje_per_chenar'], 1):
-                            st.text(f"Chenar {i}: {punctaj} puncte")
-                
-                if badge:
-                    st.caption(badge)
+        st.dataframe(tabel_top, use_container_width=True, height=400, hide_index=True)
         
         st.divider()
         
         # FORMAT 2 - COPY-PASTE
         st.subheader("📝 Format 2 - Copy-Paste")
         
-        copy_text = ""
-        for item in top_100:
-            copy_text += f"{item['id']}, {' '.join(map(str, item['numere']))}\n"
-        
-        st.text_area(
-            "Copy-paste:",
-            value=copy_text,
-            height=300,
-            key="copy_paste_area"
-        )
+        afiseaza_export(stoc_variante.subset(indici_top), "Copy-paste:", "copy_paste_area", "top_100")
+        sectiune.opreste()
     
     else:
         st.info("Adaugă runde și variante pentru verificare")
@@ -699,12 +920,21 @@ elif pagina == "🔬 Filtrare Hibrid Variante":
     else:
         st.info("ℹ️ Filtrare fără runde - ordinea variantelor rămâne ca în input")
     
+    fereastra_filtrare, descrestere_filtrare = optiuni_runde_recente("filtrare") if usar_runde else (None, 1.0)
+    pastreaza_in_depozit = usar_runde and st.checkbox(
+        "💾 Păstrează punctajele pe disc (rezultate_scorate.sqlite)",
+        value=False,
+        key="pastreaza_in_depozit",
+        help="Același set de variante pe aceleași runde se citește de pe disc și în sesiunile următoare. "
+             "Salvarea adaugă câteva secunde la seturile mari; se păstrează doar ultimele seturi."
+    )
+    
     st.divider()
     
     text_variante_finale = st.text_area(
         "Paste variante pentru filtrare (format: ID, numere separate prin spațiu):",
         height=300,
-        placeholder="1, 5 12 34 56\n2, 3 15 42 89\n3, 7 21 48 63\n...",
+        placeholder="1, 5 12 34 56\n2, 3 15 42 59\n3, 7 21 48 63\n...",
         key="input_variante_finale"
     )
     
@@ -733,54 +963,51 @@ elif pagina == "🔬 Filtrare Hibrid Variante":
         st.write("")
         if st.button("🎯 Filtrează Variante", type="primary", use_container_width=True):
             if text_variante_finale.strip():
-                with st.spinner('Filtrare hibrid în curs...'):
-                    linii = text_variante_finale.strip().split('\n')
-                    variante_input = []
-                    
-                    for linie in linii:
-                        try:
-                            parti = linie.split(',', 1)
-                            if len(parti) == 2:
-                                id_var = parti[0].strip()
-                                numere_str = parti[1].strip()
-                                numere = [int(n.strip()) for n in numere_str.split() if n.strip()]
-                                if numere:
-                                    variante_input.append({
-                                        'id': id_var,
-                                        'numere': numere
-                                    })
-                        except:
-                            pass
-                    
-                    if variante_input:
-                        variante_filtrate, counter_finale = filtrare_variante_finale_hibrid(
-                            variante_input,
-                            st.session_state.runde_chenare,
-                            usar_runde,
-                            max_aparitii_finale,
-                            target_variante
-                        )
-                        
-                        st.session_state.variante_filtrate_finale = variante_filtrate
-                        
-                        mod_text = "cu sortare pe runde" if usar_runde else "fără runde (ordine originală)"
-                        st.success(f"✅ Filtrat ({mod_text}): {len(variante_input)} → {len(variante_filtrate)} variante!")
-                        st.info(f"📊 Numere unice: {len(counter_finale)} | Max apariții: {max(counter_finale.values()) if counter_finale else 0}")
-                    else:
-                        st.error("Nu s-au putut procesa variante. Verifică formatul.")
+                ids_input, numere_input, linii_respinse = parseaza_variante(text_variante_finale)
+                if len(linii_respinse) > 0:
+                    st.warning(mesaj_linii_respinse("Variante", linii_respinse))
+                
+                if len(ids_input) > 0:
+                    variante_input = StocVariante(ids_input, numere_input)
+                    # Fără depozit, scorarea folosește doar cache-ul din memorie
+                    functie_filtrare, argumente_depozit = (
+                        (filtrare_hibrid_memorata, (depozit_server(),)) if pastreaza_in_depozit
+                        else (filtrare_variante_finale_hibrid, ())
+                    )
+                    porneste_lucrare(
+                        'filtrare',
+                        functie_filtrare,
+                        *argumente_depozit,
+                        variante_input,
+                        list(st.session_state.runde_chenare),
+                        usar_runde,
+                        max_aparitii_finale,
+                        target_variante,
+                        cache=st.session_state.cache_rezultate,
+                        fereastra=fereastra_filtrare,
+                        descrestere=descrestere_filtrare,
+                        context={'usar_runde': usar_runde, 'numar_input': len(variante_input)}
+                    )
+                else:
+                    st.error("Nu s-au putut procesa variante. Verifică formatul.")
             else:
                 st.warning("Adaugă variante pentru filtrare.")
     
+    # Filtrarea rulează în fundal; rezultatul apare la final, fără a bloca pagina
+    if 'filtrare' in st.session_state.lucrari:
+        st.info("⏳ Filtrarea rulează în fundal - progresul e în bara laterală.")
+    afiseaza_mesaje('filtrare')
+    
     if st.session_state.variante_filtrate_finale:
+        sectiune = etapa("Pagina 2: rezultat filtrare (randare)", elemente=len(st.session_state.variante_filtrate_finale)).porneste()
         st.divider()
         
         st.subheader("📋 Rezultat Filtrare")
         
         # Analiză distribuție
-        counter_distributie = Counter()
-        for var in st.session_state.variante_filtrate_finale:
-            for num in var['numere']:
-                counter_distributie[num] += 1
+        variante_finale = st.session_state.variante_filtrate_finale
+        aparitii = np.bincount(variante_finale.numere.ravel(), minlength=256)
+        counter_distributie = Counter({num: int(aparitii[num]) for num in np.flatnonzero(aparitii[1:]) + 1})
         
         col_a1, col_a2, col_a3 = st.columns(3)
         with col_a1:
@@ -795,22 +1022,142 @@ elif pagina == "🔬 Filtrare Hibrid Variante":
         # Copy-paste format
         st.subheader("📝 Variante Filtrate - Copy-Paste")
         
-        copy_text_filtrat = ""
-        for item in st.session_state.variante_filtrate_finale:
-            copy_text_filtrat += f"{item['id']}, {' '.join(map(str, item['numere']))}\n"
-        
-        st.text_area(
-            "Variante finale:",
-            value=copy_text_filtrat,
-            height=400,
-            key="copy_paste_filtrate"
-        )
+        afiseaza_export(variante_finale, "Variante finale:", "copy_paste_filtrate", "variante_filtrate")
         
         # Analiză distribuție detaliată
         with st.expander("📊 Analiză Distribuție Numere"):
+            import pandas as pd
             df_distributie = pd.DataFrame([
                 {"Număr": num, "Apariții": count}
                 for num, count in sorted(counter_distributie.items())
             ])
             
-            st.dataframe(df_distributie, use_container_width=True, height=400)
\ No newline at end of file
+            st.dataframe(df_distributie, use_container_width=True, height=400)
+        
+        sectiune.opreste()
+
+# =====================================================
+# PAGINA 3: CĂUTARE EXHAUSTIVĂ
+# =====================================================
+
+elif pagina == "🔎 Căutare Exhaustivă":
+    
+    st.header("🔎 Căutare Exhaustivă")
+    
+    st.markdown("""
+    **Toate combinările de 4 numere (1-66):** cele 720.720 de variante posibile sunt generate și scorate
+    pe rundele încărcate, cu aceleași reguli ca TOP 100 (5/8/10 puncte, chenare active, stabilitate),
+    apoi trec prin filtrul de diversitate. Nu e nevoie să lipești variante.
+    """)
+    
+    st.divider()
+    
+    if not any(len(runde) > 0 for runde in st.session_state.runde_chenare):
+        st.info("📋 Încarcă runde în pagina de analiză pentru căutarea exhaustivă.")
+    else:
+        col_e1, col_e2, col_e3 = st.columns(3)
+        
+        with col_e1:
+            max_aparitii_exhaustiv = st.number_input(
+                "Maxim apariții per număr:",
+                min_value=1,
+                max_value=50,
+                value=5,
+                key="max_aparitii_exhaustiv",
+                help="Fiecare număr poate apărea maxim de atâtea ori în rezultat."
+            )
+        
+        with col_e2:
+            top_exhaustiv = st.number_input(
+                "Câte variante să păstrezi:",
+                min_value=1,
+                max_value=10000,
+                value=100,
+                key="top_exhaustiv",
+                help="Numărul de variante în TOP."
+            )
+        
+        with col_e3:
+            st.write("")
+            st.write("")
+            if st.button("🔎 Caută", type="primary", use_container_width=True):
+                porneste_lucrare('cautare', cautare_exhaustiva, list(st.session_state.runde_chenare), max_aparitii_exhaustiv, top_exhaustiv)
+        
+        if 'cautare' in st.session_state.lucrari:
+            st.info("⏳ Căutarea rulează în fundal - progresul e în bara laterală.")
+        afiseaza_mesaje('cautare')
+        
+        if st.session_state.rezultate_exhaustive:
+            st.divider()
+            
+            st.subheader("📋 TOP Combinări")
+            
+            rezultate = st.session_state.rezultate_exhaustive
+            df_exhaustiv = {
+                "ID": rezultate.ids,
+                "Combinație": [' '.join(map(str, rezultate.numere_varianta(j))) for j in range(len(rezultate))],
+                "Chenare active": rezultate.coloane['chenare_active'],
+                "Punctaj total": rezultate.coloane['punctaj_total'],
+                "SD": np.round(rezultate.coloane['sd'], 2)
+            }
+            st.dataframe(df_exhaustiv, use_container_width=True, height=400, hide_index=True)
+            
+            if st.button("➕ Adaugă la variante", help="Adaugă combinările găsite la variantele din pagina de analiză."):
+                st.session_state.variante.adauga(StocVariante(rezultate.ids, rezultate.numere))
+                marcheaza_date_modificate()
+                st.success(f"✅ {len(rezultate)} variante adăugate")
+            
+            afiseaza_export(rezultate, "Copy-paste (format variante):", "copy_paste_exhaustiv", "cautare_exhaustiva")
+
+randare_pagina.opreste()
+
+# Timpii de pornire ai procesului de server (încălzire + primul rezultat)
+server = stare_server()
+text_pornire = f"⚡ Încălzire nuclee: {server['incalzire']:.2f}s"
+if server['prim_rezultat'] is not None:
+    text_pornire += f" | Primul rezultat: {server['prim_rezultat']:.2f}s"
+panou_pornire.caption(text_pornire)
+
+# Progresul lucrărilor de fundal (inclusiv cele pornite în această rulare)
+if st.session_state.lucrari:
+    with panou_lucrari:
+        st.divider()
+        st.caption("Lucrări în fundal")
+        for cheie in list(st.session_state.lucrari):
+            panou_lucrare(cheie)
+
+# Panoul de instrumentare, completat la final ca să includă și etapele acestei rulări
+if instrumentare_activa:
+    with panou_instrumentare:
+        with st.expander("⏱️ Măsurători pe etape"):
+            instrumentare = st.session_state.instrumentare
+            rezumat = instrumentare.rezumat()
+            st.caption(
+                f"{rezumat['etape']} etape | Compilare Numba (și încărcare din cache): {rezumat['compilare_numba_s']:.2f}s "
+                f"({rezumat['nuclee_compilate']} compilări) | Regim stabil: {rezumat['stabil_s']:.2f}s"
+            )
+            
+            # Cele mai recente etape primele
+            etape = instrumentare.inregistrari()[::-1][:MARIME_PAGINA]
+            st.dataframe({
+                "Etapă": [e['etapa'] for e in etape],
+                "Rulare": [e['rulare'] for e in etape],
+                "Fir": [e['fir'] for e in etape],
+                "Timp (s)": [round(e['secunde'], 4) for e in etape],
+                "Compilare (s)": [round(e['compilare_numba_s'], 4) for e in etape],
+                "Elemente": [e['elemente'] for e in etape],
+                "Debit (/s)": [None if e['debit_pe_s'] is None else f"{e['debit_pe_s']:.3g}" for e in etape],
+                "Alocat (MB)": [round(e['octeti_alocati'] / 1024**2, 2) for e in etape],
+                "Vârf (MB)": [round(e['octeti_varf'] / 1024**2, 2) for e in etape],
+            }, use_container_width=True, height=300, hide_index=True)
+            
+            col_i1, col_i2 = st.columns(2)
+            with col_i1:
+                st.download_button(
+                    "⬇️ JSON", data=instrumentare.ca_json, file_name="instrumentare.json",
+                    mime="application/json", on_click="ignore", use_container_width=True
+                )
+            with col_i2:
+                if st.button("🗑️ Golește", use_container_width=True, key="goleste_instrumentare"):
+                    instrumentare.goleste()
+                    st.rerun()
\ No newline at end of file
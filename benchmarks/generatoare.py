@@ -0,0 +1,59 @@
+"""Generatoare deterministe (cu sămânță) de runde și variante sintetice pentru benchmark-uri.
+
+Rundele au lungimi amestecate (6, 10, 20 numere din 1..66), ca în datele reale; variantele au câte 4
+numere distincte. Totul se generează vectorizat, în blocuri, ca să încapă și 10⁷ variante în memorie.
+"""
+import numpy as np
+
+from ingestie import NUMAR_MAXIM
+from motor import RundeChenar, StocVariante
+
+LUNGIMI_RUNDE = (6, 10, 20)
+MARIME_VARIANTA = 4
+MARIME_BLOC_GENERARE = 1 << 18
+
+def numere_distincte(rng, n, marime):
+    """Matrice uint8 (n, marime) cu câte `marime` numere distincte din 1..66 pe rând, crescătoare"""
+    if marime * 4 <= NUMAR_MAXIM:
+        # Puține coliziuni: se trag numere independent și se retrag doar rândurile cu repetiții
+        numere = rng.integers(1, NUMAR_MAXIM + 1, size=(n, marime), dtype=np.uint8)
+        numere.sort(axis=1)
+        repetate = np.flatnonzero((numere[:, 1:] == numere[:, :-1]).any(axis=1))
+        while repetate.shape[0] > 0:
+            noi = rng.integers(1, NUMAR_MAXIM + 1, size=(repetate.shape[0], marime), dtype=np.uint8)
+            noi.sort(axis=1)
+            numere[repetate] = noi
+            repetate = repetate[(noi[:, 1:] == noi[:, :-1]).any(axis=1)]
+        return numere
+
+    numere = np.empty((n, marime), dtype=np.uint8)
+    for inceput in range(0, n, MARIME_BLOC_GENERARE):
+        sfarsit = min(inceput + MARIME_BLOC_GENERARE, n)
+        # Primele `marime` poziții ale unei permutări aleatoare a lui 1..66, pe fiecare rând
+        alese = rng.random((sfarsit - inceput, NUMAR_MAXIM)).argpartition(marime, axis=1)[:, :marime]
+        numere[inceput:sfarsit] = np.sort(alese, axis=1) + 1
+    return numere
+
+def genereaza_runde(n_runde, rng, lungimi=LUNGIMI_RUNDE):
+    """Un chenar (RundeChenar) cu `n_runde` runde de lungimi alese uniform din `lungimi`"""
+    lungimi_runde = rng.choice(np.asarray(lungimi), size=n_runde)
+    offsets = np.zeros(n_runde + 1, dtype=np.int32)
+    np.cumsum(lungimi_runde, out=offsets[1:])
+    valori = np.empty(offsets[-1], dtype=np.uint8)
+
+    for lungime in lungimi:
+        pozitii = np.flatnonzero(lungimi_runde == lungime)
+        numere = numere_distincte(rng, pozitii.shape[0], lungime)
+        valori[(offsets[pozitii][:, None] + np.arange(lungime)).ravel()] = numere.ravel()
+    return RundeChenar(valori, offsets)
+
+def genereaza_chenare(n_runde, samanta, n_chenare=7):
+    """`n_chenare` chenare cu câte `n_runde` runde fiecare"""
+    rng = np.random.default_rng(samanta)
+    return [genereaza_runde(n_runde, rng) for _ in range(n_chenare)]
+
+def genereaza_variante(n_variante, samanta, marime=MARIME_VARIANTA):
+    """StocVariante cu `n_variante` variante de câte `marime` numere și id-urile 1..n"""
+    rng = np.random.default_rng(samanta)
+    ids = np.arange(1, n_variante + 1).astype(str)
+    return StocVariante(ids, numere_distincte(rng, n_variante, marime))
@@ -0,0 +1,289 @@
+"""Suita de benchmark-uri pentru căile critice ale motorului, cu rezultate JSON și comparație între rulări.
+
+Fiecare caz rulează într-un proces separat (memoria de vârf e a lui), pe date sintetice cu sămânță fixă.
+Compilarea Numba e plătită înainte de măsurare, pe date minuscule. Cazurile al căror cost estimat
+depășește --buget sunt sărite (de exemplu verificarea pereche cu pereche pe 10⁷ variante × 10⁵ runde).
+
+Din rădăcina proiectului:
+    python -m benchmarks.suita ruleaza --scara mica -o baza.json
+    python -m benchmarks.suita ruleaza --variante 1e3 1e7 --runde 1e2 1e5 -o nou.json
+    python -m benchmarks.suita compara baza.json nou.json --prag 0.1
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numba
+import numpy as np
+from numba import get_num_threads, jit, set_num_threads
+
+from benchmarks.generatoare import genereaza_chenare, genereaza_variante
+from motor import (
+    ScoruriRecente, aplica_restrictie_diversitate, filtrare_variante_finale_hibrid, histograma_chenare, incalzeste,
+    punctaje_recente, statistici_chenar, top_stabilitate, verifica_varianta_numba
+)
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SCARI = {
+    'mica': ([1_000, 10_000, 100_000], [100, 1_000]),
+    'medie': ([1_000, 100_000, 1_000_000], [100, 1_000, 10_000]),
+    'mare': ([1_000, 100_000, 1_000_000, 10_000_000], [100, 1_000, 10_000, 100_000]),
+}
+BUGET_OPERATII = 2e10
+SAMANTA = 2024
+PRAG_REGRESIE = 0.10
+# Sub aceste diferențe absolute o schimbare e considerată zgomot de măsurare
+ZGOMOT_SECUNDE = 0.002
+ZGOMOT_MB = 1
+# Ferestrele (ultimele N runde) evaluate de cazul 'ferestre'
+FERESTRE = range(50, 5001, 50)
+
+@jit(nopython=True, nogil=True, cache=True)
+def verifica_toate(numere, valori, offsets):
+    """Suma potrivirilor pentru toate perechile variantă × rundă, prin verifica_varianta_numba"""
+    total = 0
+    for v in range(numere.shape[0]):
+        for r in range(offsets.shape[0] - 1):
+            total += verifica_varianta_numba(numere[v], valori[offsets[r]:offsets[r + 1]])
+    return total
+
+# Fiecare caz: (pregătire(variante, chenare) -> funcția măsurată, chenare folosite, cost estimat(V, R))
+def pregateste_verificare(variante, chenare):
+    numere, runde = variante.numere, chenare[0]
+    return lambda: verifica_toate(numere, runde.valori, runde.offsets)
+
+def pregateste_statistici(variante, chenare):
+    masti_variante, masti_runde = variante.masti, chenare[0].masti
+    return lambda: statistici_chenar(masti_variante, masti_runde, 4)
+
+def pregateste_top(variante, chenare):
+    return lambda: top_stabilitate(variante, histograma_chenare(variante.masti, chenare), 5, 100)
+
+def pregateste_diversitate(variante, chenare):
+    # Ordine aleatoare fixă; ținta de 1000 cu max. 10 apariții e de neatins, deci se parcurg toate variantele
+    ordine = np.random.default_rng(SAMANTA).permutation(len(variante))
+    return lambda: aplica_restrictie_diversitate(variante.numere, ordine, 10, 1000)
+
+def pregateste_hibrid(variante, chenare):
+    return lambda: filtrare_variante_finale_hibrid(variante, chenare, True, 10, 1000)
+
+def pregateste_ferestre(variante, chenare):
+    # Sumele cumulative se construiesc o dată, apoi fiecare fereastră de 50..5000 runde e o diferență
+    def baleiaza():
+        recente = ScoruriRecente(variante.masti, chenare)
+        for fereastra in FERESTRE:
+            punctaje_recente(recente, fereastra)
+    return baleiaza
+
+def cost_indexat(n_variante, n_runde):
+    # Histograma alege între măști (V × R) și indexul de submulțimi (~16 căutări per variantă + construire)
+    return 7 * min(n_variante * n_runde, 16 * n_variante + 5000 * n_runde)
+
+CAZURI = {
+    'verifica_varianta': (pregateste_verificare, 1, lambda v, r: 30 * v * r),
+    'statistici_chenar': (pregateste_statistici, 1, lambda v, r: v * r),
+    'top_100': (pregateste_top, 7, cost_indexat),
+    'diversitate': (pregateste_diversitate, 0, lambda v, r: v),
+    'hibrid': (pregateste_hibrid, 7, cost_indexat),
+    'ferestre': (pregateste_ferestre, 7, lambda v, r: 7 * v * r),
+}
+
+def memorie_rezidenta_mb():
+    """Memoria rezidentă de vârf a procesului (MB), dacă platforma o raportează"""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux raportează în KB, macOS în octeți
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+def initializeaza_proces(fire):
+    if fire:
+        set_num_threads(fire)
+    incalzeste()
+
+def masoara_caz(caz, n_variante, n_runde, repetari, samanta):
+    """Rulează un caz în procesul curent -> dicționarul de rezultate (timpi, debit, memorie)"""
+    pregatire, n_chenare, _ = CAZURI[caz]
+
+    # Încălzire pe date minuscule: nucleele specifice cazului (ex. verifica_toate) se compilează aici
+    pregatire(genereaza_variante(100, samanta), genereaza_chenare(10, samanta, max(n_chenare, 1)))()
+
+    variante = genereaza_variante(n_variante, samanta)
+    chenare = genereaza_chenare(n_runde, samanta + 1, max(n_chenare, 1))
+    functie = pregatire(variante, chenare)
+    memorie_inainte = memorie_rezidenta_mb()
+
+    durate = []
+    for _ in range(repetari):
+        inceput = time.perf_counter()
+        functie()
+        durate.append(time.perf_counter() - inceput)
+    memorie_dupa = memorie_rezidenta_mb()
+
+    # O rulare separată, nemăsurată în timp, pentru vârful alocărilor numpy și din nucleele Numba (tracemalloc încetinește)
+    tracemalloc.start()
+    functie()
+    _, varf_alocari = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    secunde = min(durate)
+    perechi = n_variante * n_runde * n_chenare
+    return {
+        'caz': caz,
+        'variante': n_variante,
+        'runde': n_runde if n_chenare else 0,
+        'chenare': n_chenare,
+        'repetari': repetari,
+        'secunde_min': secunde,
+        'secunde_mediana': statistics.median(durate),
+        'variante_runde_pe_secunda': perechi / secunde if perechi and secunde > 0 else None,
+        'variante_pe_secunda': n_variante / secunde if secunde > 0 else None,
+        'memorie_varf_mb': memorie_dupa,
+        'memorie_suplimentara_mb': None if memorie_dupa is None else max(memorie_dupa - memorie_inainte, 0.0),
+        'alocari_varf_mb': varf_alocari / (1024 * 1024),
+    }
+
+def metadate(argumente):
+    return {
+        'creat': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'numba': numba.__version__,
+        'platforma': platform.platform(),
+        'procesor': platform.processor(),
+        'nuclee': os.cpu_count(),
+        'fire_numba': argumente.fire or get_num_threads(),
+        'samanta': argumente.samanta,
+        'repetari': argumente.repetari,
+    }
+
+def ruleaza(argumente):
+    variante_scara, runde_scara = SCARI[argumente.scara]
+    lista_variante = [int(float(n)) for n in argumente.variante] if argumente.variante else variante_scara
+    lista_runde = [int(float(n)) for n in argumente.runde] if argumente.runde else runde_scara
+    cazuri = argumente.cazuri or list(CAZURI)
+
+    rezultate = []
+    sarite = []
+    esuate = []
+    context = multiprocessing.get_context('spawn')
+    for caz in cazuri:
+        _, n_chenare, cost = CAZURI[caz]
+        # Cazurile fără runde se rulează o singură dată per număr de variante
+        for n_runde in (lista_runde if n_chenare else [0]):
+            for n_variante in lista_variante:
+                if cost(n_variante, n_runde) > argumente.buget:
+                    sarite.append({'caz': caz, 'variante': n_variante, 'runde': n_runde})
+                    print(f"{caz:18} V={n_variante:>10,} R={n_runde:>7,}  sărit (cost peste buget)", file=sys.stderr)
+                    continue
+
+                # Proces nou per caz: memoria de vârf și cache-urile nu se moștenesc între cazuri
+                try:
+                    with ProcessPoolExecutor(1, mp_context=context, initializer=initializeaza_proces,
+                                             initargs=(argumente.fire,)) as proces:
+                        rezultat = proces.submit(masoara_caz, caz, n_variante, n_runde, argumente.repetari,
+                                                 argumente.samanta).result()
+                except (BrokenProcessPool, MemoryError) as eroare:
+                    # Procesul oprit brusc înseamnă de obicei memorie insuficientă (OOM killer)
+                    esuate.append({'caz': caz, 'variante': n_variante, 'runde': n_runde, 'eroare': repr(eroare)})
+                    print(f"{caz:18} V={n_variante:>10,} R={n_runde:>7,}  eșuat: {eroare!r}", file=sys.stderr)
+                    continue
+                rezultate.append(rezultat)
+                debit = rezultat['variante_runde_pe_secunda'] or rezultat['variante_pe_secunda']
+                print(f"{caz:18} V={n_variante:>10,} R={n_runde:>7,}  {rezultat['secunde_min']:9.4f}s  "
+                      f"{debit:12.3e}/s  {rezultat['alocari_varf_mb']:8.1f} MB alocați", file=sys.stderr)
+
+    raport = {'metadate': metadate(argumente), 'rezultate': rezultate, 'sarite': sarite, 'esuate': esuate}
+    text = json.dumps(raport, indent=2, ensure_ascii=False)
+    if argumente.iesire is None:
+        print(text)
+    else:
+        with open(argumente.iesire, 'w', encoding='utf-8') as fisier:
+            fisier.write(text + "\n")
+
+def cheie_rezultat(rezultat):
+    return rezultat['caz'], rezultat['variante'], rezultat['runde']
+
+def compara(argumente):
+    """Compară două rapoarte; codul de ieșire e 1 dacă există regresii de timp sau memorie peste prag"""
+    with open(argumente.baza, encoding='utf-8') as fisier:
+        baza = {cheie_rezultat(r): r for r in json.load(fisier)['rezultate']}
+    with open(argumente.nou, encoding='utf-8') as fisier:
+        raport_nou = json.load(fisier)
+    nou = {cheie_rezultat(r): r for r in raport_nou['rezultate']}
+    esuate = {cheie_rezultat(r) for r in raport_nou.get('esuate', [])}
+
+    regresii = 0
+    for cheie in sorted(baza.keys() & nou.keys()):
+        vechi, curent = baza[cheie], nou[cheie]
+        raport_timp = curent['secunde_min'] / vechi['secunde_min'] if vechi['secunde_min'] > 0 else 1.0
+        probleme = []
+        if raport_timp > 1 + argumente.prag and curent['secunde_min'] - vechi['secunde_min'] > ZGOMOT_SECUNDE:
+            probleme.append("timp")
+        # Memoria comparată e vârful alocărilor funcției măsurate; RSS-ul procesului include importurile,
+        # încălzirea și datele generate, care ar ascunde sub prag o dublare a alocărilor
+        crestere_mb = curent['alocari_varf_mb'] - vechi['alocari_varf_mb']
+        if crestere_mb > ZGOMOT_MB and crestere_mb > argumente.prag * vechi['alocari_varf_mb']:
+            probleme.append("memorie")
+
+        regresii += bool(probleme)
+        stare = "REGRESIE (" + ", ".join(probleme) + ")" if probleme else ("mai rapid" if raport_timp < 1 - argumente.prag else "ok")
+        caz, n_variante, n_runde = cheie
+        print(f"{caz:18} V={n_variante:>10,} R={n_runde:>7,}  {vechi['secunde_min']:9.4f}s -> "
+              f"{curent['secunde_min']:9.4f}s  (x{raport_timp:5.2f})  {stare}")
+
+    for cheie in sorted(baza.keys() & esuate):
+        regresii += 1
+        print(f"{cheie[0]:18} V={cheie[1]:>10,} R={cheie[2]:>7,}  REGRESIE (eșuat în raportul nou)")
+
+    for cheie in sorted((baza.keys() - esuate) ^ nou.keys()):
+        print(f"{cheie[0]:18} V={cheie[1]:>10,} R={cheie[2]:>7,}  doar în {'bază' if cheie in baza else 'raportul nou'}")
+
+    print(f"{regresii} regresii (prag {argumente.prag:.0%})")
+    return 1 if regresii else 0
+
+def argumente_linie_comanda(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark-uri pentru căile critice ale motorului.")
+    comenzi = parser.add_subparsers(dest='comanda', required=True)
+
+    rulare = comenzi.add_parser('ruleaza', help="rulează cazurile și scrie raportul JSON")
+    rulare.add_argument('--scara', choices=sorted(SCARI), default='mica',
+                        help="grila implicită de variante × runde per chenar (implicit mica)")
+    rulare.add_argument('--variante', nargs='+', metavar='N', help="numerele de variante (ex. 1e3 1e7), în locul scării")
+    rulare.add_argument('--runde', nargs='+', metavar='N', help="rundele per chenar (ex. 1e2 1e5), în locul scării")
+    rulare.add_argument('--cazuri', nargs='+', choices=list(CAZURI), help="doar aceste cazuri (implicit toate)")
+    rulare.add_argument('--repetari', type=int, default=3, help="rulări măsurate per caz; se raportează minimul (implicit 3)")
+    rulare.add_argument('--buget', type=float, default=BUGET_OPERATII,
+                        help=f"sare cazurile cu mai multe operații estimate (implicit {BUGET_OPERATII:.0e})")
+    rulare.add_argument('--fire', type=int, default=0, metavar='N', help="fire Numba per proces (implicit toate)")
+    rulare.add_argument('--samanta', type=int, default=SAMANTA, help="sămânța generatoarelor")
+    rulare.add_argument('-o', '--iesire', metavar='FISIER', help="fișierul JSON (implicit ieșirea standard)")
+
+    comparatie = comenzi.add_parser('compara', help="compară două rapoarte JSON și semnalează regresiile")
+    comparatie.add_argument('baza', help="raportul de referință")
+    comparatie.add_argument('nou', help="raportul nou")
+    comparatie.add_argument('--prag', type=float, default=PRAG_REGRESIE,
+                            help=f"creșterea relativă tolerată (implicit {PRAG_REGRESIE})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    argumente = argumente_linie_comanda(argv)
+    if argumente.comanda == 'ruleaza':
+        ruleaza(argumente)
+        return 0
+    return compara(argumente)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Rulări în lot, fără interfață: TOP stabilitate, filtrare hibrid sau căutare exhaustivă din fișiere.
+
+Un set de date e fie dat explicit (--runde 1.txt ... 7.txt --variante variante.txt), fie ca director
+care conține 1.txt - 7.txt (fișierele lipsă = chenare goale) și variante.txt, sau un pachet binar
+(pachet.py) care se încarcă fără parsare. Mai multe directoare se procesează în același proces, deci
+compilarea Numba se plătește o singură dată. Un set care eșuează e raportat la stderr, celelalte se
+procesează în continuare, iar codul de ieșire e 1.
+
+Exemple:
+    python cli.py --runde 1.txt 2.txt 3.txt --variante variante.txt --mod top -o top100.txt
+    python cli.py date/set_*/ --mod hibrid --numar 1000 --max-aparitii 10
+    python cli.py date/set_01/ --mod exhaustiv
+    python cli.py --runde 1.txt 2.txt --variante 50M.txt --procese 16 -o top100.txt
+    python cli.py --runde 1.txt 2.txt --variante 50M.txt --salveaza-pachet date/pachet_50M/
+    python cli.py date/set_01/ --mod hibrid --max-aparitii 3 --depozit rezultate_scorate.sqlite
+    python cli.py date/set_01/ --mod top --fereastra 200 --descrestere 0.99
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from motor import (
+    StocVariante, cautare_exhaustiva, citeste_runde_chenare, citeste_variante, filtrare_variante_finale_hibrid,
+    histograma_chenare, mesaj_linii_respinse, recente_chenare, top_recente, top_stabilitate
+)
+from depozit import MAX_SETURI, DepozitRezultate, amprenta_set, din_depozit, filtrare_hibrid_memorata, top_memorat
+from export import csv_variante, parquet_variante, text_variante
+from pachet import este_pachet, incarca_pachet, salveaza_pachet
+from partitionare import clasament_partitionat
+
+NUMAR_CHENARE = 7
+FISIER_VARIANTE = 'variante.txt'
+# Erorile unui set de date (fișiere lipsă sau invalide, depozit, memorie, pyarrow lipsă): raportate, cu cod de ieșire 1
+ERORI_SET = (OSError, ValueError, sqlite3.Error, MemoryError, ImportError)
+
+def fisiere_set(director):
+    """Fișierele de runde (None pentru cele lipsă) și fișierul de variante dintr-un director"""
+    runde = [os.path.join(director, f"{i}.txt") for i in range(1, NUMAR_CHENARE + 1)]
+    runde = [cale if os.path.isfile(cale) else None for cale in runde]
+    variante = os.path.join(director, FISIER_VARIANTE)
+    return runde, variante if os.path.isfile(variante) else None
+
+def avertizeaza(sursa, linii_respinse):
+    if len(linii_respinse) > 0:
+        print(mesaj_linii_respinse(sursa, linii_respinse), file=sys.stderr)
+
+def citeste_set(cai_runde, cale_variante):
+    """Citește chenarele și variantele (None dacă lipsește fișierul) din fișiere text, raportând liniile respinse"""
+    runde_chenare, respinse = citeste_runde_chenare(cai_runde)
+    for i, linii_respinse in enumerate(respinse):
+        avertizeaza(f"Chenar {i+1}", linii_respinse)
+
+    variante = None
+    if cale_variante is not None:
+        variante, linii_respinse = citeste_variante(cale_variante)
+        avertizeaza("Variante", linii_respinse)
+    return runde_chenare, variante
+
+def proceseaza_set(runde_chenare, variante, argumente, depozit=None):
+    """Rulează modul ales pe un set de date și returnează variantele rezultat (StocVariante, cu coloanele de punctaj).
+
+    Cu depozit, un set deja scorat se citește din el; altfel punctajele calculate se salvează (fără --procese).
+    Punctajele pe runde recente (--fereastra, --descrestere) se calculează mereu aici, fără depozit și --procese.
+    """
+    if argumente.mod == 'exhaustiv':
+        rezultat, _ = cautare_exhaustiva(runde_chenare, argumente.max_aparitii, argumente.numar)
+        return rezultat
+
+    if variante is None:
+        raise ValueError(f"modul '{argumente.mod}' are nevoie de un fișier de variante")
+
+    are_runde = any(len(runde) > 0 for runde in runde_chenare)
+    cu_punctaje = are_runde and not (argumente.mod == 'hibrid' and argumente.fara_runde)
+    fereastra = argumente.fereastra or None
+    pe_runde_recente = fereastra is not None or argumente.descrestere != 1.0
+    if pe_runde_recente:
+        if argumente.mod == 'top':
+            if not are_runde or len(variante) == 0:
+                return variante.subset(np.zeros(0, dtype=np.int64))
+            indici, _ = top_recente(variante, recente_chenare(variante.masti, runde_chenare), argumente.max_aparitii,
+                                    argumente.numar, fereastra, argumente.descrestere)
+            return variante.subset(indici)
+        rezultat, _ = filtrare_variante_finale_hibrid(
+            variante, runde_chenare, not argumente.fara_runde, argumente.max_aparitii, argumente.numar,
+            fereastra=fereastra, descrestere=argumente.descrestere
+        )
+        return rezultat
+
+    if depozit is not None and cu_punctaje and len(variante) > 0:
+        cheie = amprenta_set(runde_chenare, variante)
+        if depozit.contine(cheie):
+            rezultat, _ = din_depozit(depozit, cheie, variante, argumente.max_aparitii, argumente.numar,
+                                      argumente.mod == 'top')
+            return rezultat
+        if not argumente.procese:
+            if argumente.mod == 'top':
+                rezultat, _ = top_memorat(depozit, variante, runde_chenare, argumente.max_aparitii, argumente.numar)
+            else:
+                rezultat, _ = filtrare_hibrid_memorata(
+                    depozit, variante, runde_chenare, True, argumente.max_aparitii, argumente.numar
+                )
+            return rezultat
+
+    if argumente.procese and cu_punctaje:
+        # TOP cu SD ca departajare; hibridul sortează doar după (chenare active, punctaj)
+        indici, _, _ = clasament_partitionat(
+            variante, runde_chenare, argumente.max_aparitii, argumente.numar,
+            cu_sd=argumente.mod == 'top', n_procese=argumente.procese
+        )
+        return variante.subset(indici)
+
+    if argumente.mod == 'top':
+        if not are_runde or len(variante) == 0:
+            return variante.subset(np.zeros(0, dtype=np.int64))
+        histograma = histograma_chenare(variante.masti, runde_chenare)
+        indici, _ = top_stabilitate(variante, histograma, argumente.max_aparitii, argumente.numar)
+        return variante.subset(indici)
+
+    rezultat, _ = filtrare_variante_finale_hibrid(
+        variante, runde_chenare, not argumente.fara_runde, argumente.max_aparitii, argumente.numar
+    )
+    return rezultat
+
+EXPORTURI = {'txt': text_variante, 'csv': csv_variante, 'parquet': parquet_variante}
+
+def scrie_rezultat(variante, cale, format_iesire):
+    """Scrie rezultatul în formatul cerut, într-un fișier sau la ieșirea standard (cale None)"""
+    date = EXPORTURI[format_iesire](variante)
+    if cale is None:
+        sys.stdout.buffer.write(date)
+    else:
+        with open(cale, 'wb') as fisier:
+            fisier.write(date)
+
+def argumente_linie_comanda(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analiză runde + variante fără interfață (TOP stabilitate, filtrare hibrid, căutare exhaustivă)."
+    )
+    parser.add_argument('directoare', nargs='*',
+                        help=f"directoare cu 1.txt - {NUMAR_CHENARE}.txt și {FISIER_VARIANTE}")
+    parser.add_argument('--runde', nargs='+', metavar='FISIER',
+                        help=f"fișierele de runde, în ordinea chenarelor (maxim {NUMAR_CHENARE})")
+    parser.add_argument('--variante', metavar='FISIER', help="fișierul de variante ('ID, n n n n')")
+    parser.add_argument('--mod', choices=['top', 'hibrid', 'exhaustiv'], default='top',
+                        help="top = TOP stabilitate, hibrid = filtrare hibrid, exhaustiv = toate combinările de 4 numere")
+    parser.add_argument('--numar', type=int, default=100, help="câte variante să păstrezi (implicit 100)")
+    parser.add_argument('--max-aparitii', type=int, default=5, help="maxim apariții per număr (implicit 5)")
+    parser.add_argument('--fara-runde', action='store_true',
+                        help="mod hibrid: doar restricția de apariții, în ordinea originală")
+    parser.add_argument('--fereastra', type=int, default=0, metavar='N',
+                        help="punctaje doar pe ultimele N runde ale fiecărui chenar (implicit 0 = toate)")
+    parser.add_argument('--descrestere', type=float, default=1.0, metavar='F',
+                        help="ponderea unei runde scade cu factorul F (0 < F <= 1) la fiecare rundă mai veche "
+                             "(implicit 1 = fără descreștere)")
+    parser.add_argument('--procese', type=int, default=0, metavar='N',
+                        help="scorare partiționată pe N procese, cu rundele în memorie partajată "
+                             "(pentru zeci de milioane de variante; implicit dezactivată)")
+    parser.add_argument('--format', dest='format_iesire', choices=sorted(EXPORTURI), default='txt',
+                        help="txt = formatul de input 'ID, n n n n'; csv/parquet includ și punctajele (implicit txt)")
+    parser.add_argument('--salveaza-pachet', metavar='DIRECTOR',
+                        help="salvează setul dat prin --runde/--variante ca pachet binar (reîncărcabil fără parsare)")
+    parser.add_argument('--depozit', metavar='FISIER',
+                        help="bază SQLite cu punctajele seturilor scorate: un set deja scorat se citește din ea "
+                             "(alt --max-aparitii/--numar fără rescorare), altfel punctajele se salvează")
+    parser.add_argument('--depozit-seturi', type=int, default=MAX_SETURI, metavar='N',
+                        help=f"câte seturi scorate păstrează depozitul; cele mai vechi se șterg (implicit {MAX_SETURI})")
+    parser.add_argument('-o', '--iesire', metavar='FISIER',
+                        help="fișierul rezultat pentru --runde/--variante (implicit ieșirea standard); "
+                             "pentru directoare rezultatul se scrie în <director>/rezultat_<mod>.<format>")
+    argumente = parser.parse_args(argv)
+
+    if not argumente.directoare and argumente.runde is None and argumente.variante is None:
+        parser.error("dă cel puțin un director sau --runde/--variante")
+    if argumente.runde is not None and len(argumente.runde) > NUMAR_CHENARE:
+        parser.error(f"maxim {NUMAR_CHENARE} fișiere de runde")
+    if argumente.fereastra < 0:
+        parser.error("--fereastra trebuie să fie >= 0")
+    if not 0 < argumente.descrestere <= 1:
+        parser.error("--descrestere trebuie să fie în (0, 1]")
+    if argumente.depozit_seturi < 1:
+        parser.error("--depozit-seturi trebuie să fie >= 1")
+    return argumente
+
+def main(argv=None):
+    """Procesează seturile date; codul de ieșire e 1 dacă cel puțin un set a eșuat (celelalte se procesează oricum)"""
+    argumente = argumente_linie_comanda(argv)
+    try:
+        depozit = DepozitRezultate(argumente.depozit, argumente.depozit_seturi) if argumente.depozit is not None else None
+    except ERORI_SET as eroare:
+        print(f"{argumente.depozit}: {eroare}", file=sys.stderr)
+        return 1
+    esuate = 0
+
+    if argumente.runde is not None or argumente.variante is not None:
+        cai_runde = list(argumente.runde or [])
+        cai_runde += [None] * (NUMAR_CHENARE - len(cai_runde))
+        try:
+            runde_chenare, variante = citeste_set(cai_runde, argumente.variante)
+            if argumente.salveaza_pachet is not None:
+                salveaza_pachet(argumente.salveaza_pachet, runde_chenare, variante if variante is not None else StocVariante())
+            else:
+                scrie_rezultat(proceseaza_set(runde_chenare, variante, argumente, depozit), argumente.iesire,
+                               argumente.format_iesire)
+        except ERORI_SET as eroare:
+            print(f"eroare: {eroare}", file=sys.stderr)
+            esuate += 1
+
+    for director in argumente.directoare:
+        inceput = time.perf_counter()
+        try:
+            if este_pachet(director):
+                runde_chenare, variante = incarca_pachet(director)
+            else:
+                runde_chenare, variante = citeste_set(*fisiere_set(director))
+            rezultat = proceseaza_set(runde_chenare, variante, argumente, depozit)
+            cale_iesire = os.path.join(director, f"rezultat_{argumente.mod}.{argumente.format_iesire}")
+            scrie_rezultat(rezultat, cale_iesire, argumente.format_iesire)
+        except ERORI_SET as eroare:
+            print(f"{director}: {eroare}", file=sys.stderr)
+            esuate += 1
+            continue
+        print(f"{director}: {len(rezultat)} variante -> {cale_iesire} ({time.perf_counter() - inceput:.2f}s)", file=sys.stderr)
+
+    if esuate:
+        print(f"{esuate} seturi eșuate", file=sys.stderr)
+    return 1 if esuate else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""Depozit persistent (SQLite) pentru punctajele calculate, ca să nu se rescoreze la fiecare rulare.
+
+Un set de date e identificat prin amprenta conținutului (măștile rundelor per chenar și ale variantelor).
+Pentru fiecare variantă se păstrează punctajele per chenar (c1..c7), chenare_active, punctaj_total și SD,
+cu un index pe (chenare_active, punctaj_total). Reaplicarea diversității cu alt max_aparitii sau altă țintă
+- sau a doua zi, pe același set - citește clasamentul direct din index, fără histograme. Se păstrează doar
+ultimele `max_seturi` seturi salvate; cele mai vechi se șterg la salvare.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from motor import (
+    FACTOR_SUPRASELECTIE, aplica_restrictie_diversitate, amprenta, filtrare_variante_finale_hibrid,
+    histograma_chenare, histograma_in_cache, top_stabilitate
+)
+
+FISIER_DEPOZIT = 'rezultate_scorate.sqlite'
+NUMAR_CHENARE = 7
+# Rândurile se scriu în tranzacția setului în blocuri, ca să nu se construiască toate tuplurile odată
+MARIME_BLOC_SCRIERE = 100_000
+# Câte seturi scorate rămân în depozit (un set de 1M variante ocupă ~80 MB)
+MAX_SETURI = 10
+
+COLOANE_CHENARE = [f'c{c}' for c in range(1, NUMAR_CHENARE + 1)]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS seturi (
+    amprenta TEXT PRIMARY KEY,
+    n_variante INTEGER NOT NULL,
+    n_chenare INTEGER NOT NULL,
+    creat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS punctaje (
+    amprenta TEXT NOT NULL,
+    indice INTEGER NOT NULL,
+    chenare_active INTEGER NOT NULL,
+    punctaj_total INTEGER NOT NULL,
+    sd REAL NOT NULL,
+    {', '.join(f'{nume} INTEGER NOT NULL' for nume in COLOANE_CHENARE)},
+    PRIMARY KEY (amprenta, indice)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS clasament ON punctaje (amprenta, chenare_active DESC, punctaj_total DESC, sd, indice);
+"""
+
+def amprenta_set(runde_chenare, variante):
+    """Amprenta unui set de date: punctajele depind doar de măștile rundelor (per chenar) și ale variantelor"""
+    h = hashlib.blake2b(digest_size=16)
+    for runde in runde_chenare:
+        h.update(f"{len(runde)}:{amprenta(runde.masti)};".encode())
+    h.update(f"{len(variante)}:{amprenta(variante.masti)}".encode())
+    return h.hexdigest()
+
+class DepozitRezultate:
+    """Punctajele seturilor scorate, într-o bază SQLite locală; poate fi folosit din mai multe lucrări de fundal"""
+
+    def __init__(self, cale=FISIER_DEPOZIT, max_seturi=MAX_SETURI):
+        self.cale = cale
+        self.max_seturi = max_seturi
+        self.blocare = threading.Lock()
+        self.conexiune = sqlite3.connect(cale, check_same_thread=False)
+        self.conexiune.executescript(SCHEMA)
+
+    def contine(self, cheie):
+        with self.blocare:
+            return self.conexiune.execute("SELECT 1 FROM seturi WHERE amprenta = ?", (cheie,)).fetchone() is not None
+
+    def salveaza(self, cheie, variante):
+        """Scrie coloanele de punctaj atașate stocului (punctaje_per_chenar, chenare_active, punctaj_total, sd)"""
+        punctaje = variante.coloane['punctaje_per_chenar']
+        if punctaje.shape[1] > NUMAR_CHENARE:
+            raise ValueError(f"depozitul păstrează maxim {NUMAR_CHENARE} chenare, nu {punctaje.shape[1]}")
+        punctaje = np.pad(punctaje, ((0, 0), (0, NUMAR_CHENARE - punctaje.shape[1])))
+        coloane = [variante.coloane['chenare_active'], variante.coloane['punctaj_total'], variante.coloane['sd']]
+
+        inserare = (f"INSERT INTO punctaje (amprenta, indice, chenare_active, punctaj_total, sd, {', '.join(COLOANE_CHENARE)}) "
+                    f"VALUES (?, ?, ?, ?, ?, {', '.join('?' * NUMAR_CHENARE)})")
+        # O singură tranzacție: setul apare în `seturi` doar cu toate rândurile scrise
+        with self.blocare, self.conexiune:
+            self.conexiune.execute("DELETE FROM punctaje WHERE amprenta = ?", (cheie,))
+            for inceput in range(0, len(variante), MARIME_BLOC_SCRIERE):
+                sfarsit = min(inceput + MARIME_BLOC_SCRIERE, len(variante))
+                bloc = [coloana[inceput:sfarsit].tolist() for coloana in coloane]
+                bloc += punctaje[inceput:sfarsit].T.tolist()
+                self.conexiune.executemany(
+                    inserare, ((cheie, inceput + j, *rand) for j, rand in enumerate(zip(*bloc)))
+                )
+            self.conexiune.execute(
+                "INSERT OR REPLACE INTO seturi VALUES (?, ?, ?, ?)",
+                (cheie, len(variante), variante.coloane['punctaje_per_chenar'].shape[1], time.time())
+            )
+            # Retenție: seturile cele mai vechi peste max_seturi; paginile eliberate se refolosesc la scrierile următoare
+            vechi = "SELECT amprenta FROM seturi ORDER BY creat DESC LIMIT -1 OFFSET ?"
+            self.conexiune.execute(f"DELETE FROM punctaje WHERE amprenta IN ({vechi})", (self.max_seturi,))
+            self.conexiune.execute(f"DELETE FROM seturi WHERE amprenta IN ({vechi})", (self.max_seturi,))
+
+    def primele(self, cheie, m, cu_sd=True):
+        """Indicii primelor m variante în ordinea clasamentului (-chenare_active, -punctaj_total[, sd], indice)"""
+        ordine = "chenare_active DESC, punctaj_total DESC, sd, indice" if cu_sd else "chenare_active DESC, punctaj_total DESC, indice"
+        with self.blocare:
+            randuri = self.conexiune.execute(
+                f"SELECT indice FROM punctaje WHERE amprenta = ? ORDER BY {ordine} LIMIT ?", (cheie, m)
+            ).fetchall()
+        return np.array([rand[0] for rand in randuri], dtype=np.int64)
+
+    def clasament(self, cheie, numere, max_aparitii, limita, cu_sd=True):
+        """TOP `limita` cu diversitate citit din index; prefixul citit crește până se atinge ținta (ca clasament_top)"""
+        n_variante = numere.shape[0]
+        m = max(limita * FACTOR_SUPRASELECTIE, 1024)
+        while True:
+            ordine = self.primele(cheie, m, cu_sd)
+            selectati, aparitii = aplica_restrictie_diversitate(numere, ordine, max_aparitii, limita)
+            if selectati.shape[0] >= limita or m >= n_variante:
+                return selectati, aparitii
+            m *= FACTOR_SUPRASELECTIE
+
+    def coloane(self, cheie, indici):
+        """Coloanele de punctaj (ca în StocVariante.coloane) pentru variantele de la indicii dați, în ordinea dată"""
+        indici = np.asarray(indici, dtype=np.int64)
+        # O singură interogare pentru toți indicii (lista e trimisă ca JSON), apoi rândurile se reordonează
+        with self.blocare:
+            n_chenare = self.conexiune.execute("SELECT n_chenare FROM seturi WHERE amprenta = ?", (cheie,)).fetchone()[0]
+            randuri = self.conexiune.execute(
+                f"SELECT indice, chenare_active, punctaj_total, sd, {', '.join(COLOANE_CHENARE)} FROM punctaje "
+                "WHERE amprenta = ? AND indice IN (SELECT value FROM json_each(?)) ORDER BY indice",
+                (cheie, json.dumps(indici.tolist()))
+            ).fetchall()
+        tablou = np.array(randuri, dtype=np.float64).reshape(len(randuri), 4 + NUMAR_CHENARE)
+        tablou = tablou[np.searchsorted(tablou[:, 0], indici), 1:]
+        return {
+            'punctaje_per_chenar': tablou[:, 3:3 + n_chenare].astype(np.int64),
+            'punctaj_total': tablou[:, 1].astype(np.int64),
+            'chenare_active': tablou[:, 0].astype(np.int64),
+            'sd': tablou[:, 2],
+        }
+
+    def inchide(self):
+        self.conexiune.close()
+
+def din_depozit(depozit, cheie, variante, max_aparitii, limita, cu_sd):
+    """Rezultatul (stoc cu coloanele de punctaj, apariții) citit din depozit, fără rescorare"""
+    selectati, aparitii = depozit.clasament(cheie, variante.numere, max_aparitii, limita, cu_sd)
+    rezultat = variante.subset(selectati)
+    rezultat.coloane = depozit.coloane(cheie, selectati)
+    return rezultat, aparitii
+
+def top_memorat(depozit, variante, runde_chenare, max_aparitii, limita=100, cache=None, progres=None):
+    """TOP stabilitate ca (stoc rezultat, apariții): din depozit dacă setul a mai fost scorat, altfel calculat și salvat"""
+    cheie = amprenta_set(runde_chenare, variante)
+    if depozit.contine(cheie):
+        return din_depozit(depozit, cheie, variante, max_aparitii, limita, True)
+
+    histograma = histograma_chenare(variante.masti, runde_chenare, cache, progres)
+    indici, aparitii = top_stabilitate(variante, histograma, max_aparitii, limita)
+    depozit.salveaza(cheie, variante)
+    return variante.subset(indici), aparitii
+
+def filtrare_hibrid_memorata(depozit, variante, runde_chenare, usar_runde, max_aparitii_finale, target_count, cache=None,
+                             progres=None, fereastra=None, descrestere=1.0):
+    """Filtrarea hibrid (ca filtrare_variante_finale_hibrid), cu punctajele luate din / salvate în depozit.
+
+    Depozitul ține punctajele pe toate rundele; cu fereastră sau descreștere se calculează direct.
+    """
+    if fereastra is not None or descrestere != 1.0:
+        return filtrare_variante_finale_hibrid(
+            variante, runde_chenare, usar_runde, max_aparitii_finale, target_count, cache, progres, fereastra, descrestere
+        )
+    if not usar_runde or not any(len(runde) > 0 for runde in runde_chenare):
+        return filtrare_variante_finale_hibrid(variante, runde_chenare, usar_runde, max_aparitii_finale, target_count)
+
+    cheie = amprenta_set(runde_chenare, variante)
+    # Histogramele din cache-ul sesiunii răspund mai repede decât citirea din SQLite
+    if depozit.contine(cheie) and not histograma_in_cache(cache, variante.masti, runde_chenare):
+        return din_depozit(depozit, cheie, variante, max_aparitii_finale, target_count, False)
+
+    rezultat = filtrare_variante_finale_hibrid(
+        variante, runde_chenare, usar_runde, max_aparitii_finale, target_count, cache, progres
+    )
+    if not depozit.contine(cheie):
+        depozit.salveaza(cheie, variante)
+    return rezultat
@@ -0,0 +1,74 @@
+"""Export pentru variante (StocVariante): TXT în formatul de input, CSV și Parquet.
+
+Textul se construiește bloc cu bloc și se unește o singură dată (liniar în numărul de variante).
+CSV și Parquet includ și coloanele de punctaj atașate stocului (punctaj_total, chenare_active, sd,
+punctaje_per_chenar -> c1..c7). Parquet are nevoie de pyarrow.
+"""
+import csv
+import importlib.util
+import io
+
+import numpy as np
+
+MARIME_BLOC_EXPORT = 10000
+
+def linii_variante(variante, inceput=0, sfarsit=None):
+    """Liniile 'ID, n n n n' pentru variantele [inceput, sfarsit)"""
+    sfarsit = len(variante) if sfarsit is None else min(sfarsit, len(variante))
+    return [variante.linie(j) for j in range(inceput, sfarsit)]
+
+def bucati_text(variante, marime_bloc=MARIME_BLOC_EXPORT):
+    """Textul TXT ca flux de bucăți de octeți, câte un bloc de variante pe bucată"""
+    for inceput in range(0, len(variante), marime_bloc):
+        yield "".join(linie + "\n" for linie in linii_variante(variante, inceput, inceput + marime_bloc)).encode('utf-8')
+
+def text_variante(variante):
+    """Fișierul TXT (format de input, câte o variantă pe linie) ca octeți"""
+    return b"".join(bucati_text(variante))
+
+def previzualizare(variante, numar_linii):
+    """Primele `numar_linii` linii ale exportului TXT"""
+    return "\n".join(linii_variante(variante, 0, numar_linii))
+
+def coloane_export(variante):
+    """Coloanele tabelare ale exportului: id, n1..nk și coloanele de punctaj atașate"""
+    coloane = {'id': variante.ids}
+    for i in range(variante.numere.shape[1]):
+        coloane[f'n{i+1}'] = variante.numere[:, i]
+    for nume in ('punctaj_total', 'chenare_active', 'sd'):
+        if nume in variante.coloane:
+            coloane[nume] = variante.coloane[nume]
+    if 'punctaje_per_chenar' in variante.coloane:
+        punctaje = variante.coloane['punctaje_per_chenar']
+        for c in range(punctaje.shape[1]):
+            coloane[f'c{c+1}'] = punctaje[:, c]
+    return coloane
+
+def bucati_csv(variante, marime_bloc=MARIME_BLOC_EXPORT):
+    """CSV-ul ca flux de bucăți de octeți (antet + blocuri de rânduri)"""
+    coloane = coloane_export(variante)
+    for inceput in range(0, len(variante), marime_bloc) if len(variante) > 0 else [0]:
+        tampon = io.StringIO()
+        scriitor = csv.writer(tampon, lineterminator="\n")
+        if inceput == 0:
+            scriitor.writerow(coloane.keys())
+        bloc = [np.asarray(coloana[inceput:inceput + marime_bloc]).tolist() for coloana in coloane.values()]
+        scriitor.writerows(zip(*bloc))
+        yield tampon.getvalue().encode('utf-8')
+
+def csv_variante(variante):
+    """Fișierul CSV ca octeți"""
+    return b"".join(bucati_csv(variante))
+
+def parquet_disponibil():
+    return importlib.util.find_spec('pyarrow') is not None
+
+def parquet_variante(variante):
+    """Fișierul Parquet ca octeți (necesită pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tabel = pa.table({nume: np.asarray(coloana) for nume, coloana in coloane_export(variante).items()})
+    tampon = io.BytesIO()
+    pq.write_table(tabel, tampon)
+    return tampon.getvalue()
@@ -0,0 +1,86 @@
+"""Statistici pe numerele rundelor unui chenar: frecvența fiecărui număr, co-apariția perechilor, numere calde și reci.
+
+Rundele se despachetează din măști (RundeChenar.masti) într-o matrice densă 0/1 runde × 66, bloc cu bloc.
+Frecvențele sunt sume pe coloane, iar perechile produsul Mᵀ·M (BLAS, în float32 - exact, un bloc are mult
+sub 2²⁴ runde). Fereastra e formată din ultimele N runde ale chenarului (cele adăugate ultimele).
+"""
+import numpy as np
+
+from ingestie import NUMAR_MAXIM
+from instrumentare import etapa
+
+MARIME_BLOC_RUNDE = 1 << 16
+NUMAR_CALDE_RECI = 10
+
+def matrice_apartenenta(masti):
+    """Matricea 0/1 runde × 66 (uint8): coloana n-1 e 1 dacă runda conține numărul n"""
+    octeti = np.ascontiguousarray(masti, dtype='<u8').view(np.uint8)
+    return np.unpackbits(octeti, axis=1, bitorder='little')[:, 1:NUMAR_MAXIM + 1]
+
+def frecvente_numere(masti):
+    """Frecvența fiecărui număr 1..66 (int64[66]) pe rundele date"""
+    frecvente = np.zeros(NUMAR_MAXIM, dtype=np.int64)
+    for inceput in range(0, masti.shape[0], MARIME_BLOC_RUNDE):
+        frecvente += matrice_apartenenta(masti[inceput:inceput + MARIME_BLOC_RUNDE]).sum(axis=0, dtype=np.int64)
+    return frecvente
+
+def frecvente_perechi(masti):
+    """(frecvențe int64[66], perechi int64[66, 66]) pe rundele date; perechi[i, j] = rundele cu ambele numere i+1, j+1"""
+    frecvente = np.zeros(NUMAR_MAXIM, dtype=np.int64)
+    perechi = np.zeros((NUMAR_MAXIM, NUMAR_MAXIM), dtype=np.int64)
+    for inceput in range(0, masti.shape[0], MARIME_BLOC_RUNDE):
+        apartenenta = matrice_apartenenta(masti[inceput:inceput + MARIME_BLOC_RUNDE])
+        frecvente += apartenenta.sum(axis=0, dtype=np.int64)
+        dense = apartenenta.astype(np.float32)
+        perechi += (dense.T @ dense).astype(np.int64)
+    return frecvente, perechi
+
+def runde_de_la_ultima_aparitie(masti):
+    """Pentru fiecare număr, câte runde au urmat după ultima lui apariție (0 = în ultima rundă, -1 = niciodată)"""
+    distanta = np.full(NUMAR_MAXIM, -1, dtype=np.int64)
+    sfarsit = masti.shape[0]
+    # Blocurile se parcurg de la cea mai recentă rundă spre cea mai veche, până apar toate numerele
+    while sfarsit > 0 and (distanta < 0).any():
+        inceput = max(sfarsit - MARIME_BLOC_RUNDE, 0)
+        apartenenta = matrice_apartenenta(masti[inceput:sfarsit])[::-1]
+        gasite = apartenenta.any(axis=0) & (distanta < 0)
+        distanta[gasite] = masti.shape[0] - sfarsit + apartenenta.argmax(axis=0)[gasite]
+        sfarsit = inceput
+    return distanta
+
+def statistici_numere(runde, fereastra=None):
+    """Statisticile numerelor unui chenar (RundeChenar) pe tot istoricul și pe ultimele `fereastra` runde (None = toate).
+
+    Dicționar cu: runde, runde_fereastra, frecvente, frecvente_fereastra, perechi (pe fereastră) și
+    ultima_aparitie (runde de la ultima apariție, -1 = niciodată).
+    """
+    masti = runde.masti
+    n_runde = masti.shape[0]
+    runde_fereastra = n_runde if fereastra is None else min(fereastra, n_runde)
+    with etapa("statistici numere", elemente=n_runde, operatii=n_runde * NUMAR_MAXIM * NUMAR_MAXIM):
+        frecvente_fereastra, perechi = frecvente_perechi(masti[n_runde - runde_fereastra:])
+        if runde_fereastra == n_runde:
+            frecvente = frecvente_fereastra
+        else:
+            frecvente = frecvente_numere(masti[:n_runde - runde_fereastra]) + frecvente_fereastra
+        ultima_aparitie = runde_de_la_ultima_aparitie(masti)
+    return {
+        'runde': n_runde,
+        'runde_fereastra': runde_fereastra,
+        'frecvente': frecvente,
+        'frecvente_fereastra': frecvente_fereastra,
+        'perechi': perechi,
+        'ultima_aparitie': ultima_aparitie,
+    }
+
+def numere_calde_reci(statistici, numar=NUMAR_CALDE_RECI):
+    """(calde, reci): numerele (1..66) cele mai frecvente / cele mai rare în fereastră.
+
+    Egalitățile se departajează după ultima apariție: mai recentă = mai cald; niciodată apărut = cel mai rece.
+    """
+    frecvente = statistici['frecvente_fereastra']
+    ultima = statistici['ultima_aparitie']
+    ultima = np.where(ultima < 0, np.iinfo(np.int64).max, ultima)
+    calde = np.lexsort((ultima, -frecvente))[:numar] + 1
+    reci = np.lexsort((-ultima, frecvente))[:numar] + 1
+    return calde, reci
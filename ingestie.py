@@ -0,0 +1,236 @@
+"""Parsare rapidă pentru runde și variante (text sau fișiere), direct în tablouri compacte.
+
+Formate acceptate:
+- runde:    `1,6,7,9,44,61` - numere separate prin virgulă, câte o rundă pe linie
+- variante: `ID, 6 7 5 61`  - id, virgulă, numere separate prin spațiu
+
+Liniile goale sunt ignorate. Un număr poate avea semnul + lipit de cifre (`+5`), ca la int(). Liniile
+invalide (caractere nepermise, numere în afara 1..66, variante fără virgulă după id) sunt respinse și
+raportate prin numărul lor (de la 1).
+"""
+import numpy as np
+from numba import jit
+
+from instrumentare import etapa
+
+NUMAR_MAXIM = 66
+
+LINIE_NOUA = ord('\n')
+VIRGULA = ord(',')
+CIFRA_0 = ord('0')
+CIFRA_9 = ord('9')
+SPATIU = ord(' ')
+TAB = ord('\t')
+RETUR = ord('\r')
+PLUS = ord('+')
+
+def octeti(date):
+    """Textul ca tablou uint8 (fără BOM UTF-8)"""
+    if isinstance(date, str):
+        date = date.encode('utf-8')
+    if date[:3] == b'\xef\xbb\xbf':
+        date = date[3:]
+    return np.frombuffer(date, dtype=np.uint8)
+
+@jit(nopython=True, nogil=True, cache=True)
+def numara_linii(buf):
+    """Numărul maxim de linii din buffer"""
+    linii = 1
+    for octet in buf:
+        if octet == LINIE_NOUA:
+            linii += 1
+    return linii
+
+@jit(nopython=True, nogil=True, cache=True)
+def parseaza_numere_linie(buf, pos, sfarsit, separator, numar_maxim, valori, nv):
+    """Parsează numerele din buf[pos:sfarsit] în valori[nv:]; returnează noul nv sau -1 dacă linia e invalidă.
+
+    Separatorul (virgulă sau spațiu) desparte numerele; spațiile din jurul lor sunt permise, iar un + lipit
+    de cifre se ignoră.
+    """
+    curent = -1
+    spatiu_dupa_cifre = False
+    plus = False
+
+    while pos < sfarsit:
+        octet = buf[pos]
+        pos += 1
+
+        if CIFRA_0 <= octet <= CIFRA_9:
+            if curent >= 0 and spatiu_dupa_cifre:
+                return -1
+            if curent < 0:
+                curent = 0
+            if curent < 1000:
+                curent = curent * 10 + (octet - CIFRA_0)
+            plus = False
+        elif plus:
+            return -1
+        elif octet == PLUS and curent < 0:
+            plus = True
+        elif octet == SPATIU or octet == TAB or octet == RETUR:
+            if curent >= 0:
+                if separator == SPATIU:
+                    if curent < 1 or curent > numar_maxim:
+                        return -1
+                    valori[nv] = curent
+                    nv += 1
+                    curent = -1
+                else:
+                    spatiu_dupa_cifre = True
+        elif octet == separator:
+            if curent >= 0:
+                if curent < 1 or curent > numar_maxim:
+                    return -1
+                valori[nv] = curent
+                nv += 1
+                curent = -1
+            spatiu_dupa_cifre = False
+        else:
+            return -1
+
+    if plus:
+        return -1
+    if curent >= 0:
+        if curent < 1 or curent > numar_maxim:
+            return -1
+        valori[nv] = curent
+        nv += 1
+    return nv
+
+@jit(nopython=True, nogil=True, cache=True)
+def este_linie_goala(buf, pos, sfarsit):
+    """Linia conține doar spații"""
+    for j in range(pos, sfarsit):
+        octet = buf[j]
+        if octet != SPATIU and octet != TAB and octet != RETUR:
+            return False
+    return True
+
+@jit(nopython=True, nogil=True, cache=True)
+def parseaza_runde_octeti(buf, numar_maxim):
+    """Runde `1,6,7,9` -> (valori uint8, offsets int32, linii respinse int32)"""
+    max_linii = numara_linii(buf)
+    valori = np.empty(buf.shape[0] // 2 + 1, dtype=np.uint8)
+    offsets = np.zeros(max_linii + 1, dtype=np.int32)
+    respinse = np.empty(max_linii, dtype=np.int32)
+    nv = 0
+    nl = 0
+    nr = 0
+    linie = 0
+    pos = 0
+
+    while pos < buf.shape[0]:
+        sfarsit = pos
+        while sfarsit < buf.shape[0] and buf[sfarsit] != LINIE_NOUA:
+            sfarsit += 1
+        linie += 1
+
+        if not este_linie_goala(buf, pos, sfarsit):
+            nv_nou = parseaza_numere_linie(buf, pos, sfarsit, VIRGULA, numar_maxim, valori, nv)
+            # Linie invalidă sau fără niciun număr (de exemplu `,,,`)
+            if nv_nou <= nv:
+                respinse[nr] = linie
+                nr += 1
+            else:
+                nv = nv_nou
+                nl += 1
+                offsets[nl] = nv
+
+        pos = sfarsit + 1
+
+    return valori[:nv].copy(), offsets[:nl + 1].copy(), respinse[:nr].copy()
+
+@jit(nopython=True, nogil=True, cache=True)
+def parseaza_variante_octeti(buf, numar_maxim):
+    """Variante `ID, n n n n` -> (început id, sfârșit id, valori uint8, offsets int32, linii respinse int32)"""
+    max_linii = numara_linii(buf)
+    inceput_id = np.empty(max_linii, dtype=np.int64)
+    sfarsit_id = np.empty(max_linii, dtype=np.int64)
+    valori = np.empty(buf.shape[0] // 2 + 1, dtype=np.uint8)
+    offsets = np.zeros(max_linii + 1, dtype=np.int32)
+    respinse = np.empty(max_linii, dtype=np.int32)
+    nv = 0
+    nl = 0
+    nr = 0
+    linie = 0
+    pos = 0
+
+    while pos < buf.shape[0]:
+        sfarsit = pos
+        virgula = -1
+        while sfarsit < buf.shape[0] and buf[sfarsit] != LINIE_NOUA:
+            if virgula < 0 and buf[sfarsit] == VIRGULA:
+                virgula = sfarsit
+            sfarsit += 1
+        linie += 1
+
+        if not este_linie_goala(buf, pos, sfarsit):
+            nv_nou = -1
+            if virgula >= 0:
+                nv_nou = parseaza_numere_linie(buf, virgula + 1, sfarsit, SPATIU, numar_maxim, valori, nv)
+
+            if nv_nou <= nv:
+                respinse[nr] = linie
+                nr += 1
+            else:
+                # ID-ul fără spațiile din jur
+                a = pos
+                b = virgula
+                while a < b and (buf[a] == SPATIU or buf[a] == TAB):
+                    a += 1
+                while b > a and (buf[b - 1] == SPATIU or buf[b - 1] == TAB):
+                    b -= 1
+                inceput_id[nl] = a
+                sfarsit_id[nl] = b
+                nv = nv_nou
+                nl += 1
+                offsets[nl] = nv
+
+        pos = sfarsit + 1
+
+    return (inceput_id[:nl].copy(), sfarsit_id[:nl].copy(), valori[:nv].copy(),
+            offsets[:nl + 1].copy(), respinse[:nr].copy())
+
+def extrage_ids(buf, inceput_id, sfarsit_id):
+    """Id-urile ca tablou de șiruri; vectorizat prin tablou de octeți cu lățime fixă când id-urile sunt ASCII"""
+    lungimi = sfarsit_id - inceput_id
+    latime = int(lungimi.max()) if lungimi.shape[0] > 0 else 0
+    if latime == 0:
+        return np.zeros(lungimi.shape[0], dtype=str)
+
+    pozitii = inceput_id[:, None] + np.arange(latime)
+    caractere = buf[np.minimum(pozitii, buf.shape[0] - 1)]
+    caractere[pozitii >= sfarsit_id[:, None]] = 0
+    if caractere.max() < 128:
+        return np.ascontiguousarray(caractere).view(f'S{latime}').ravel().astype(str)
+
+    date_brute = buf.tobytes()
+    return np.array([date_brute[a:b].decode('utf-8', errors='replace')
+                     for a, b in zip(inceput_id.tolist(), sfarsit_id.tolist())], dtype=str)
+
+def parseaza_runde(date, numar_maxim=NUMAR_MAXIM):
+    """Parsează runde din text/octeți -> (valori uint8, offsets int32, linii respinse)"""
+    buf = octeti(date)
+    with etapa("parsare runde", operatii=buf.shape[0]) as masurare:
+        valori, offsets, respinse = parseaza_runde_octeti(buf, numar_maxim)
+        masurare.elemente = offsets.shape[0] - 1
+    return valori, offsets, respinse
+
+def parseaza_variante(date, numar_maxim=NUMAR_MAXIM):
+    """Parsează variante din text/octeți -> (ids, matrice numere uint8 (V, k) completată cu 0, linii respinse)"""
+    buf = octeti(date)
+    with etapa("parsare variante", operatii=buf.shape[0]) as masurare:
+        inceput_id, sfarsit_id, valori, offsets, respinse = parseaza_variante_octeti(buf, numar_maxim)
+        masurare.elemente = inceput_id.shape[0]
+    with etapa("conversie id-uri și matrice variante", elemente=inceput_id.shape[0]):
+        ids = extrage_ids(buf, inceput_id, sfarsit_id)
+
+        # CSR -> matrice (V, k)
+        lungimi = np.diff(offsets)
+        k = int(lungimi.max()) if lungimi.shape[0] > 0 else 0
+        numere = np.zeros((lungimi.shape[0], k), dtype=np.uint8)
+        randuri = np.repeat(np.arange(lungimi.shape[0]), lungimi)
+        coloane = np.arange(valori.shape[0]) - np.repeat(offsets[:-1], lungimi)
+        numere[randuri, coloane] = valori
+    return ids, numere, respinse
@@ -0,0 +1,220 @@
+"""Instrumentare opțională pe etape: timp, elemente, debit, octeți alocați și timpul de compilare Numba.
+
+Etapele se marchează în cod cu `with etapa("nume", elemente=..., operatii=...)`. Fără o instrumentare
+activă (activeaza(None), implicit) marcajul nu face nimic. Instrumentarea activă e ținută într-un
+ContextVar, deci o preiau și lucrările de fundal pornite din același context (vezi lucrari.py).
+
+Timpul de compilare vine din evenimentele Numba: "numba:compiler_lock" acoperă tot primul apel al unei
+semnături (compilare sau încărcare din cache-ul de pe disc), "numba:compile" doar compilările reale.
+Restul timpului etapei e regimul stabil, din care se calculează debitul. Octeții alocați vin din
+tracemalloc (alocările numpy și Python, inclusiv tablourile create în nucleele Numba, pe care runtime-ul
+Numba le alocă prin PyMem_RawMalloc) și sunt globali procesului: etapele care rulează simultan pe fire diferite se pot influența.
+"""
+import contextvars
+import json
+from collections import deque
+import threading
+import time
+import tracemalloc
+
+from numba.core import event
+
+_activa = contextvars.ContextVar('instrumentare', default=None)
+
+class TimpCompilare(event.Listener):
+    """Timpul petrecut în evenimentele Numba de un anumit tip, acumulat separat pe fiecare fir"""
+
+    def __init__(self):
+        self._fire = threading.local()
+
+    def _stare(self):
+        if not hasattr(self._fire, 'adancime'):
+            self._fire.adancime = 0
+            self._fire.inceput = 0.0
+            self._fire.secunde = 0.0
+            self._fire.numar = 0
+        return self._fire
+
+    def on_start(self, ev):
+        stare = self._stare()
+        # Doar evenimentul exterior: compilarea unui nucleu le include pe ale funcțiilor apelate
+        if stare.adancime == 0:
+            stare.inceput = time.perf_counter()
+        stare.adancime += 1
+
+    def on_end(self, ev):
+        stare = self._stare()
+        stare.adancime -= 1
+        if stare.adancime == 0:
+            stare.secunde += time.perf_counter() - stare.inceput
+            stare.numar += 1
+
+    def citeste(self):
+        """(secunde, număr de evenimente) acumulate până acum pe firul curent"""
+        stare = self._stare()
+        return stare.secunde, stare.numar
+
+_ascultatori = {}
+_blocare_ascultatori = threading.Lock()
+
+def ascultator(tip):
+    """Ascultătorul pentru evenimentele Numba `tip`, înregistrat o singură dată per proces"""
+    with _blocare_ascultatori:
+        if tip not in _ascultatori:
+            _ascultatori[tip] = TimpCompilare()
+            event.register(tip, _ascultatori[tip])
+        return _ascultatori[tip]
+
+# Câte înregistrări se păstrează; cele mai vechi se pierd
+MAXIM_INREGISTRARI = 5000
+
+class Instrumentare:
+    """Înregistrările etapelor măsurate (dicționare), în ordinea terminării; poate fi folosită din mai multe fire"""
+
+    def __init__(self, maxim_inregistrari=MAXIM_INREGISTRARI):
+        self.blocare = threading.Lock()
+        self.etape = deque(maxlen=maxim_inregistrari)
+        self.rulare = 0
+
+    def adauga(self, inregistrare):
+        with self.blocare:
+            self.etape.append(inregistrare)
+
+    def goleste(self):
+        with self.blocare:
+            self.etape.clear()
+
+    def inregistrari(self):
+        with self.blocare:
+            return list(self.etape)
+
+    def rezumat(self):
+        """Totalurile etapelor exterioare (cele imbricate sunt incluse în ele): secunde, compilare Numba, regim stabil"""
+        toate = self.inregistrari()
+        etape = [e for e in toate if e['nivel'] == 0]
+        return {
+            'etape': len(toate),
+            'secunde': sum(e['secunde'] for e in etape),
+            'compilare_numba_s': sum(e['compilare_numba_s'] for e in etape),
+            'nuclee_compilate': sum(e['nuclee_compilate'] for e in etape),
+            'stabil_s': sum(e['stabil_s'] for e in etape),
+        }
+
+    def ca_json(self):
+        return json.dumps({'rezumat': self.rezumat(), 'etape': self.inregistrari()}, indent=2, ensure_ascii=False).encode('utf-8')
+
+# Vârfurile alocărilor pentru etapele deschise pe firul curent (etapele se pot imbrica)
+_deschise = threading.local()
+
+def activeaza(instrumentare):
+    """Setează instrumentarea (sau None) pentru contextul curent; pornește tracemalloc dacă e nevoie.
+
+    Etapele rămase deschise pe firul curent (întrerupte de o excepție) se abandonează.
+    """
+    _deschise.stiva = []
+    if instrumentare is not None:
+        ascultator("numba:compiler_lock")
+        ascultator("numba:compile")
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    _activa.set(instrumentare)
+
+def activa():
+    return _activa.get()
+
+def opreste_urmarirea_memoriei():
+    """Oprește tracemalloc (global procesului) când nu mai e nevoie de octeții alocați per etapă"""
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+class Etapa:
+    """O etapă măsurată; folosită cu `with` sau cu porneste()/opreste() când blocul e prea lung pentru `with`"""
+
+    def __init__(self, instrumentare, nume, elemente=None, operatii=None):
+        self.instrumentare = instrumentare
+        self.nume = nume
+        self.elemente = elemente
+        self.operatii = operatii
+
+    def porneste(self):
+        stiva = getattr(_deschise, 'stiva', None)
+        if stiva is None:
+            stiva = _deschise.stiva = []
+        # Vârful de până acum se păstrează pentru etapa părinte, apoi se măsoară de la zero
+        curent, varf = tracemalloc.get_traced_memory()
+        if stiva:
+            stiva[-1].varf_copii = max(stiva[-1].varf_copii, varf)
+        tracemalloc.reset_peak()
+        self.nivel = len(stiva)
+        stiva.append(self)
+
+        self.varf_copii = 0
+        self.memorie_inceput = curent
+        self.compilare_inceput = ascultator("numba:compiler_lock").citeste()[0]
+        self.compilari_inceput = ascultator("numba:compile").citeste()[1]
+        self.inceput = time.perf_counter()
+        return self
+
+    def opreste(self):
+        secunde = time.perf_counter() - self.inceput
+        compilare = ascultator("numba:compiler_lock").citeste()[0] - self.compilare_inceput
+        compilari = ascultator("numba:compile").citeste()[1] - self.compilari_inceput
+        curent, varf = tracemalloc.get_traced_memory()
+        varf = max(varf, self.varf_copii)
+
+        stiva = _deschise.stiva
+        if self in stiva:
+            stiva.remove(self)
+        if stiva:
+            stiva[-1].varf_copii = max(stiva[-1].varf_copii, varf)
+
+        stabil = max(secunde - compilare, 0.0)
+        self.instrumentare.adauga({
+            'etapa': self.nume,
+            'rulare': self.instrumentare.rulare,
+            'fir': threading.current_thread().name,
+            'nivel': self.nivel,
+            'secunde': secunde,
+            'compilare_numba_s': compilare,
+            'nuclee_compilate': compilari,
+            'stabil_s': stabil,
+            'elemente': self.elemente,
+            'operatii': self.operatii,
+            'debit_pe_s': self.operatii / stabil if self.operatii and stabil > 0 else None,
+            'octeti_alocati': max(curent - self.memorie_inceput, 0),
+            'octeti_varf': max(varf - self.memorie_inceput, 0),
+        })
+
+    def __enter__(self):
+        return self.porneste()
+
+    def __exit__(self, *exceptie):
+        self.opreste()
+        return False
+
+class EtapaInactiva:
+    """Marcajul folosit când instrumentarea e oprită: nu măsoară nimic (nici elementele setate după pornire)"""
+
+    elemente = property(lambda self: None, lambda self, valoare: None)
+    operatii = property(lambda self: None, lambda self, valoare: None)
+
+    def porneste(self):
+        return self
+
+    def opreste(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exceptie):
+        return False
+
+ETAPA_INACTIVA = EtapaInactiva()
+
+def etapa(nume, elemente=None, operatii=None):
+    """Etapa `nume` în instrumentarea activă; `operatii` (ex. variante × runde) dă debitul în regim stabil"""
+    instrumentare = _activa.get()
+    if instrumentare is None:
+        return ETAPA_INACTIVA
+    return Etapa(instrumentare, nume, elemente, operatii)
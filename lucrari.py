@@ -0,0 +1,58 @@
+"""Lucrări de calcul în fundal: rulează funcțiile motorului pe un fond de fire, cu progres și anulare.
+
+Funcția lucrării primește argumentul `progres`; fiecare apel actualizează fracția afișată și, dacă
+lucrarea a fost anulată între timp, întrerupe calculul cu LucrareAnulata. Nucleele Numba sunt
+compilate cu nogil=True, deci interfața rămâne liberă cât timp lucrarea calculează. Lucrarea rulează
+în contextul (contextvars) din care a fost pornită, deci preia și instrumentarea activă.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from numba import set_num_threads
+
+NUMAR_LUCRATORI = 2
+
+class LucrareAnulata(Exception):
+    """Lucrarea a fost anulată; ridicată în firul lucrării la următorul raport de progres"""
+
+class Lucrare:
+    """O funcție a motorului trimisă la fondul de fire, cu progres (0..1), anulare și rezultat"""
+
+    def __init__(self, fond, functie, *argumente, numar_fire=None, context=None, **optiuni):
+        self.progres = 0.0
+        self.context = {} if context is None else context
+        self.inceput = time.perf_counter()
+        self.durata = None
+        self._anulare = threading.Event()
+        self.viitor = fond.submit(contextvars.copy_context().run, self._ruleaza, functie, argumente, optiuni, numar_fire)
+
+    def _ruleaza(self, functie, argumente, optiuni, numar_fire):
+        # Numărul de fire Numba e per fir de execuție, deci se setează în firul lucrării
+        if numar_fire is not None:
+            set_num_threads(numar_fire)
+        try:
+            return functie(*argumente, progres=self.raporteaza, **optiuni)
+        finally:
+            self.durata = time.perf_counter() - self.inceput
+
+    def raporteaza(self, fractie):
+        if self._anulare.is_set():
+            raise LucrareAnulata()
+        self.progres = min(max(fractie, 0.0), 1.0)
+
+    def anuleaza(self):
+        self._anulare.set()
+        self.viitor.cancel()
+
+    def in_curs(self):
+        return not self.viitor.done()
+
+    def rezultat(self):
+        """Rezultatul funcției; ridică excepția ei (sau LucrareAnulata) dacă nu s-a terminat cu succes"""
+        return self.viitor.result()
+
+def fond_lucrari(numar_lucratori=NUMAR_LUCRATORI):
+    """Fondul de fire pe care rulează lucrările (unul per proces de server)"""
+    return ThreadPoolExecutor(max_workers=numar_lucratori, thread_name_prefix="lucrare")
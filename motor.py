@@ -0,0 +1,1210 @@
+"""Motorul de analiză: măști, histograme de potriviri, punctaje, clasament TOP și filtrare cu diversitate.
+
+Nu depinde de Streamlit - se folosește din pagina web (analizarundevariante.py) și din linia de
+comandă (cli.py) pentru rulări în lot.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from math import comb
+
+import numpy as np
+from numba import jit, prange, get_num_threads
+
+from ingestie import NUMAR_MAXIM, parseaza_runde, parseaza_variante
+from instrumentare import etapa
+
+# Numerele (1..66) sunt codificate ca măști de 128 biți: două cuvinte uint64 per rundă/variantă.
+# Numărul n ocupă bitul (n & 63) din cuvântul (n >> 6).
+MASCA_M1 = np.uint64(0x5555555555555555)
+MASCA_M2 = np.uint64(0x3333333333333333)
+MASCA_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+MASCA_H01 = np.uint64(0x0101010101010101)
+
+@jit(nopython=True, nogil=True, cache=True)
+def popcount64(x):
+    """Numără biții setați dintr-un cuvânt uint64"""
+    x = x - ((x >> np.uint64(1)) & MASCA_M1)
+    x = (x & MASCA_M2) + ((x >> np.uint64(2)) & MASCA_M2)
+    x = (x + (x >> np.uint64(4))) & MASCA_M4
+    return (x * MASCA_H01) >> np.uint64(56)
+
+@jit(nopython=True, nogil=True, cache=True)
+def numara_potriviri_masti(a0, a1, b0, b1):
+    """Numără potrivirile dintre două măști de 128 biți"""
+    return np.int64(popcount64(a0 & b0) + popcount64(a1 & b1))
+
+@jit(nopython=True, nogil=True, cache=True)
+def codifica_masti_csr(valori, offsets):
+    """Codifică liste de numere (valori + offsets) în măști (N, 2) uint64"""
+    n = offsets.shape[0] - 1
+    masti = np.zeros((n, 2), dtype=np.uint64)
+    for i in range(n):
+        for j in range(offsets[i], offsets[i + 1]):
+            numar = valori[j]
+            if 0 < numar < 128:
+                masti[i, numar >> 6] |= np.uint64(1) << np.uint64(numar & 63)
+    return masti
+
+class RundeChenar:
+    """Rundele unui chenar în format CSR: valori uint8 + offsets int32, cu măștile precalculate.
+
+    Rundele pot avea lungimi diferite (6, 10, 20 numere); runda j ocupă valori[offsets[j]:offsets[j+1]].
+    """
+    
+    def __init__(self, valori=None, offsets=None, masti=None):
+        self.valori = np.zeros(0, dtype=np.uint8) if valori is None else np.asarray(valori, dtype=np.uint8)
+        self.offsets = np.zeros(1, dtype=np.int32) if offsets is None else np.asarray(offsets, dtype=np.int32)
+        # Măștile deja calculate (de exemplu dintr-un pachet salvat) nu se mai recalculează
+        if masti is None:
+            with etapa("conversie măști runde", elemente=len(self)):
+                masti = codifica_masti_csr(self.valori, self.offsets)
+        self.masti = masti
+        self._index = None
+        self._blocare_index = threading.Lock()
+    
+    def __len__(self):
+        return self.offsets.shape[0] - 1
+    
+    @property
+    def index(self):
+        """Indexul de submulțimi al chenarului, construit la prima folosire"""
+        if self._index is None:
+            # Lucrările simultane așteaptă aceeași construire; indexul e publicat doar complet
+            with self._blocare_index:
+                if self._index is None:
+                    index = IndexSubmultimi()
+                    index.adauga(self.masti)
+                    self._index = index
+        return self._index
+    
+    def are_index(self):
+        return self._index is not None
+    
+    def __iter__(self):
+        for j in range(len(self)):
+            yield self.runda(j)
+    
+    def runda(self, j):
+        """Numerele rundei j ca listă"""
+        return self.valori[self.offsets[j]:self.offsets[j + 1]].tolist()
+    
+    def adauga(self, alte):
+        """RundeChenar nou, cu rundele altui RundeChenar adăugate la final; obiectul curent rămâne neschimbat.
+
+        Lucrările de fundal pornite pe chenarul curent continuă pe datele lor, iar indexul existent se copiază
+        și se extinde doar cu rundele noi.
+        """
+        rezultat = RundeChenar(
+            np.concatenate([self.valori, alte.valori]),
+            np.concatenate([self.offsets, alte.offsets[1:] + self.offsets[-1]]),
+            np.concatenate([self.masti, alte.masti])
+        )
+        if self._index is not None:
+            index = self._index.copie()
+            index.adauga(alte.masti)
+            rezultat._index = index
+        return rezultat
+
+class StocVariante:
+    """Variante în format columnar: id-uri, matrice de numere uint8 (V, k), măști și coloane de punctaj.
+
+    Variantele mai scurte decât k sunt completate cu 0. Măștile se calculează la prima folosire, iar
+    coloanele de punctaj (dicționarul `coloane`) se atașează la cerere și se invalidează la adăugare.
+    """
+    
+    def __init__(self, ids=None, numere=None, masti=None):
+        self.ids = np.zeros(0, dtype=str) if ids is None else np.asarray(ids, dtype=str)
+        self.numere = np.zeros((0, 0), dtype=np.uint8) if numere is None else np.asarray(numere, dtype=np.uint8)
+        self._masti = masti
+        self._blocare_masti = threading.Lock()
+        self.coloane = {}
+    
+    def __len__(self):
+        return self.ids.shape[0]
+    
+    @property
+    def masti(self):
+        if self._masti is None:
+            with self._blocare_masti:
+                if self._masti is None:
+                    n, k = self.numere.shape
+                    offsets = np.arange(n + 1, dtype=np.int64) * k
+                    with etapa("conversie măști variante", elemente=n):
+                        self._masti = codifica_masti_csr(self.numere.ravel(), offsets)
+        return self._masti
+    
+    def numere_varianta(self, i):
+        """Numerele variantei i ca listă (fără completarea cu 0)"""
+        rand = self.numere[i]
+        return rand[rand > 0].tolist()
+    
+    def linie(self, i):
+        """Varianta i în formatul de input: 'ID, n n n n'"""
+        return f"{self.ids[i]}, {' '.join(map(str, self.numere_varianta(i)))}"
+    
+    def subset(self, indici):
+        """Stoc nou cu variantele de la indicii dați (în ordinea dată), inclusiv coloanele atașate"""
+        rezultat = StocVariante(self.ids[indici], self.numere[indici])
+        if self._masti is not None:
+            rezultat._masti = self._masti[indici]
+        rezultat.coloane = {nume: coloana[indici] for nume, coloana in self.coloane.items()}
+        return rezultat
+    
+    def adauga(self, alt):
+        """Adaugă la final variantele altui stoc"""
+        k = max(self.numere.shape[1], alt.numere.shape[1])
+        numere = np.zeros((len(self) + len(alt), k), dtype=np.uint8)
+        numere[:len(self), :self.numere.shape[1]] = self.numere
+        numere[len(self):, :alt.numere.shape[1]] = alt.numere
+        masti = None if self._masti is None else np.concatenate([self._masti, alt.masti])
+        self.ids = np.concatenate([self.ids, alt.ids])
+        self.numere = numere
+        self._masti = masti
+        self.coloane = {}
+
+@jit(nopython=True, nogil=True, cache=True)
+def verifica_varianta_numba(varianta, runda):
+    """Verifică câte numere se potrivesc între variantă și rundă"""
+    a0 = np.uint64(0)
+    a1 = np.uint64(0)
+    for v in varianta:
+        if v < 64:
+            a0 |= np.uint64(1) << np.uint64(v)
+        else:
+            a1 |= np.uint64(1) << np.uint64(v - 64)
+    b0 = np.uint64(0)
+    b1 = np.uint64(0)
+    for r in runda:
+        if r < 64:
+            b0 |= np.uint64(1) << np.uint64(r)
+        else:
+            b1 |= np.uint64(1) << np.uint64(r - 64)
+    return numara_potriviri_masti(a0, a1, b0, b1)
+
+@jit(nopython=True, nogil=True, cache=True)
+def calculeaza_punctaj_numba(potriviri):
+    """Calculează punctaj bazat pe potriviri"""
+    if potriviri == 2:
+        return 5
+    elif potriviri == 3:
+        return 8
+    elif potriviri == 4:
+        return 10
+    return 0
+
+@jit(nopython=True, nogil=True, cache=True)
+def acumuleaza_statistici_chenar(masti_variante, start, stop, masti_runde, numar_minim, acumulator):
+    """Adună în acumulator [castiguri, 2/4, 3/4, 4/4, suma punctaj] pentru variantele start..stop"""
+    for r in range(masti_runde.shape[0]):
+        b0 = masti_runde[r, 0]
+        b1 = masti_runde[r, 1]
+        for v in range(start, stop):
+            potriviri = numara_potriviri_masti(masti_variante[v, 0], masti_variante[v, 1], b0, b1)
+            
+            if potriviri >= numar_minim:
+                acumulator[0] += 1
+            
+            if potriviri == 4:
+                acumulator[3] += 1
+            elif potriviri == 3:
+                acumulator[2] += 1
+            elif potriviri == 2:
+                acumulator[1] += 1
+            acumulator[4] += calculeaza_punctaj_numba(potriviri)
+
+@jit(nopython=True, nogil=True, cache=True)
+def calculeaza_statistici_chenar(masti_variante, masti_runde, numar_minim):
+    """Calculează statistici pentru un chenar (măști variante × măști runde)"""
+    acumulator = np.zeros(5, dtype=np.int64)
+    acumuleaza_statistici_chenar(masti_variante, 0, masti_variante.shape[0], masti_runde, numar_minim, acumulator)
+    return acumulator[0], acumulator[1], acumulator[2], acumulator[3], acumulator[4]
+
+@jit(nopython=True, nogil=True, parallel=True, cache=True)
+def calculeaza_statistici_chenar_paralel(masti_variante, masti_runde, numar_minim, n_blocuri):
+    """Ca calculeaza_statistici_chenar, paralel pe axa variantelor - câte un acumulator per bloc"""
+    n_variante = masti_variante.shape[0]
+    acumulatori = np.zeros((n_blocuri, 5), dtype=np.int64)
+    
+    for b in prange(n_blocuri):
+        start = b * n_variante // n_blocuri
+        stop = (b + 1) * n_variante // n_blocuri
+        acumuleaza_statistici_chenar(masti_variante, start, stop, masti_runde, numar_minim, acumulatori[b])
+    
+    total = acumulatori.sum(axis=0)
+    return total[0], total[1], total[2], total[3], total[4]
+
+def codifica_chenare(runde_chenare):
+    """Măștile tuturor chenarelor (RundeChenar) într-un singur tablou + pozițiile de început ale fiecărui chenar"""
+    inceput_chenare = np.zeros(len(runde_chenare) + 1, dtype=np.int64)
+    np.cumsum([len(runde) for runde in runde_chenare], out=inceput_chenare[1:])
+    masti_runde = np.concatenate([runde.masti for runde in runde_chenare])
+    return masti_runde, inceput_chenare
+
+@jit(nopython=True, nogil=True, cache=True)
+def numar_maxim_potriviri(masti_variante):
+    """Cel mai mare număr de potriviri posibil (numere distincte în cea mai lungă variantă)"""
+    maxim = 0
+    for v in range(masti_variante.shape[0]):
+        maxim = max(maxim, np.int64(popcount64(masti_variante[v, 0]) + popcount64(masti_variante[v, 1])))
+    return maxim
+
+@jit(nopython=True, nogil=True, cache=True)
+def acumuleaza_histograma_varianta(v, masti_variante, masti_runde, inceput_chenare, histograma):
+    """Adună în histograma[v, c, j] numărul de runde din chenarul c cu exact j potriviri"""
+    a0 = masti_variante[v, 0]
+    a1 = masti_variante[v, 1]
+    
+    for c in range(inceput_chenare.shape[0] - 1):
+        for r in range(inceput_chenare[c], inceput_chenare[c + 1]):
+            histograma[v, c, numara_potriviri_masti(a0, a1, masti_runde[r, 0], masti_runde[r, 1])] += 1
+
+@jit(nopython=True, nogil=True, cache=True)
+def calculeaza_histograma(masti_variante, masti_runde, inceput_chenare, numar_coloane):
+    """Histograma potrivirilor V × chenare × (k+1) - toate variantele și chenarele într-un singur apel"""
+    n_variante = masti_variante.shape[0]
+    histograma = np.zeros((n_variante, inceput_chenare.shape[0] - 1, numar_coloane), dtype=np.uint32)
+    
+    for v in range(n_variante):
+        acumuleaza_histograma_varianta(v, masti_variante, masti_runde, inceput_chenare, histograma)
+    
+    return histograma
+
+@jit(nopython=True, nogil=True, parallel=True, cache=True)
+def calculeaza_histograma_paralel(masti_variante, masti_runde, inceput_chenare, numar_coloane):
+    """Ca calculeaza_histograma, paralel pe axa variantelor"""
+    n_variante = masti_variante.shape[0]
+    histograma = np.zeros((n_variante, inceput_chenare.shape[0] - 1, numar_coloane), dtype=np.uint32)
+    
+    for v in prange(n_variante):
+        acumuleaza_histograma_varianta(v, masti_variante, masti_runde, inceput_chenare, histograma)
+    
+    return histograma
+
+# Sub acest număr de perechi variantă × rundă, pornirea firelor costă mai mult decât câștigă
+PRAG_PARALEL = 2_000_000
+
+def statistici_chenar(masti_variante, masti_runde, numar_minim):
+    """Statistici chenar - varianta paralelă pentru date mari, cea serială pentru date mici"""
+    if get_num_threads() > 1 and masti_variante.shape[0] * masti_runde.shape[0] >= PRAG_PARALEL:
+        return calculeaza_statistici_chenar_paralel(masti_variante, masti_runde, numar_minim, get_num_threads() * 4)
+    return calculeaza_statistici_chenar(masti_variante, masti_runde, numar_minim)
+
+def histograma_potriviri(masti_variante, masti_runde, inceput_chenare, numar_coloane=None):
+    """Histograma potrivirilor - varianta paralelă pentru date mari, cea serială pentru date mici"""
+    if numar_coloane is None:
+        numar_coloane = numar_maxim_potriviri(masti_variante) + 1
+    if get_num_threads() > 1 and masti_variante.shape[0] * masti_runde.shape[0] >= PRAG_PARALEL:
+        return calculeaza_histograma_paralel(masti_variante, masti_runde, inceput_chenare, numar_coloane)
+    return calculeaza_histograma(masti_variante, masti_runde, inceput_chenare, numar_coloane)
+
+# Cel mai mare punctaj al unei runde (calculeaza_punctaj_numba)
+PUNCTAJ_MAXIM = 10
+
+def tabel_punctaje(numar_coloane):
+    """Punctajul pentru fiecare număr de potriviri 0..numar_coloane-1"""
+    return np.array([calculeaza_punctaj_numba(j) for j in range(numar_coloane)], dtype=np.int64)
+
+def statistici_din_histograma(histograma, numar_minim):
+    """Statistici per chenar (castiguri, 2/4, 3/4, 4/4, suma punctaj) din histogramă, pentru orice numar_minim"""
+    totaluri = histograma.sum(axis=0, dtype=np.int64)
+    castiguri = totaluri[:, numar_minim:].sum(axis=1)
+    suma_punctaj = totaluri @ tabel_punctaje(totaluri.shape[1])
+    
+    if totaluri.shape[1] < 5:
+        totaluri = np.pad(totaluri, ((0, 0), (0, 5 - totaluri.shape[1])))
+    return castiguri, totaluri[:, 2], totaluri[:, 3], totaluri[:, 4], suma_punctaj
+
+def punctaje_din_histograma(histograma):
+    """Matricea de punctaje variante × chenare, chenare active și SD (populație) din histogramă"""
+    punctaje = histograma.astype(np.int64) @ tabel_punctaje(histograma.shape[2])
+    chenare_active = (histograma[:, :, 2:].sum(axis=2) > 0).sum(axis=1)
+    return punctaje, chenare_active, sd_punctaje(punctaje)
+
+def sd_punctaje(punctaje):
+    """SD populație (ca np.std) a punctajelor per chenar; calculată exact pe întregi pentru punctajele întregi"""
+    if punctaje.dtype.kind == 'f':
+        return punctaje.std(axis=1)
+    n_chenare = punctaje.shape[1]
+    suma = punctaje.sum(axis=1)
+    suma_patrate = (punctaje * punctaje).sum(axis=1)
+    return np.sqrt(np.maximum(n_chenare * suma_patrate - suma * suma, 0)) / n_chenare
+
+# Index de submulțimi: pentru fiecare submulțime de 1..4 numere din 1..66, câte runde o conțin.
+# Submulțimea {x < y < z < w} (numere - 1) are rangul C(x,1) + C(y,2) + C(z,3) + C(w,4) în tabelul ei.
+MARIME_MAXIMA_INDEX = 4
+BINOM = np.array([[comb(n, k) for k in range(MARIME_MAXIMA_INDEX + 1)] for n in range(NUMAR_MAXIM + 1)], dtype=np.int64)
+
+@jit(nopython=True, nogil=True, cache=True)
+def numere_din_masca(m0, m1, numere):
+    """Scrie în `numere` numerele din mască (ca n - 1, crescător) și returnează câte sunt"""
+    n = 0
+    for numar in range(1, NUMAR_MAXIM + 1):
+        cuvant = m0 if numar < 64 else m1
+        if (cuvant >> np.uint64(numar & 63)) & np.uint64(1):
+            numere[n] = numar - 1
+            n += 1
+    return n
+
+@jit(nopython=True, nogil=True, cache=True)
+def adauga_in_index(masti_runde, index_1, index_2, index_3, index_4):
+    """Numără fiecare submulțime de 1..4 numere din fiecare rundă"""
+    numere = np.empty(NUMAR_MAXIM, dtype=np.int64)
+    for r in range(masti_runde.shape[0]):
+        m = numere_din_masca(masti_runde[r, 0], masti_runde[r, 1], numere)
+        for i in range(m):
+            rang_1 = numere[i]
+            index_1[rang_1] += 1
+            for j in range(i + 1, m):
+                rang_2 = rang_1 + BINOM[numere[j], 2]
+                index_2[rang_2] += 1
+                for k in range(j + 1, m):
+                    rang_3 = rang_2 + BINOM[numere[k], 3]
+                    index_3[rang_3] += 1
+                    for l in range(k + 1, m):
+                        index_4[rang_3 + BINOM[numere[l], 4]] += 1
+
+@jit(nopython=True, nogil=True, cache=True)
+def histograma_varianta_din_index(v, masti_variante, n_runde, index_1, index_2, index_3, index_4, histograma):
+    """Rândul v al histogramei prin includere-excludere: 16 căutări pentru o variantă de 4 numere.
+
+    Cu A_s = suma rundelor care conțin fiecare submulțime de s numere a variantei,
+    rundele cu exact j potriviri sunt sum_{s >= j} (-1)^(s-j) C(s, j) A_s.
+    """
+    numere = np.empty(NUMAR_MAXIM, dtype=np.int64)
+    k = numere_din_masca(masti_variante[v, 0], masti_variante[v, 1], numere)
+    sume = np.zeros(MARIME_MAXIMA_INDEX + 1, dtype=np.int64)
+    sume[0] = n_runde
+    
+    for i in range(k):
+        rang_1 = numere[i]
+        sume[1] += index_1[rang_1]
+        for j in range(i + 1, k):
+            rang_2 = rang_1 + BINOM[numere[j], 2]
+            sume[2] += index_2[rang_2]
+            for jj in range(j + 1, k):
+                rang_3 = rang_2 + BINOM[numere[jj], 3]
+                sume[3] += index_3[rang_3]
+                for jjj in range(jj + 1, k):
+                    sume[4] += index_4[rang_3 + BINOM[numere[jjj], 4]]
+    
+    for j in range(k + 1):
+        exact = 0
+        semn = 1
+        for marime in range(j, k + 1):
+            exact += semn * BINOM[marime, j] * sume[marime]
+            semn = -semn
+        histograma[v, j] = exact
+
+@jit(nopython=True, nogil=True, cache=True)
+def calculeaza_histograma_index(masti_variante, n_runde, index_1, index_2, index_3, index_4, numar_coloane):
+    """Histograma V × (k+1) a unui chenar, din indexul de submulțimi (k <= 4)"""
+    histograma = np.zeros((masti_variante.shape[0], numar_coloane), dtype=np.uint32)
+    for v in range(masti_variante.shape[0]):
+        histograma_varianta_din_index(v, masti_variante, n_runde, index_1, index_2, index_3, index_4, histograma)
+    return histograma
+
+@jit(nopython=True, nogil=True, parallel=True, cache=True)
+def calculeaza_histograma_index_paralel(masti_variante, n_runde, index_1, index_2, index_3, index_4, numar_coloane):
+    """Ca calculeaza_histograma_index, paralel pe axa variantelor"""
+    histograma = np.zeros((masti_variante.shape[0], numar_coloane), dtype=np.uint32)
+    for v in prange(masti_variante.shape[0]):
+        histograma_varianta_din_index(v, masti_variante, n_runde, index_1, index_2, index_3, index_4, histograma)
+    return histograma
+
+class IndexSubmultimi:
+    """Numărul de runde care conțin fiecare număr, pereche, triplet și cvartet din 1..66 (tabele dense)"""
+    
+    def __init__(self):
+        self.n_runde = 0
+        self.tabele = [np.zeros(BINOM[NUMAR_MAXIM, marime], dtype=np.uint32) for marime in range(1, MARIME_MAXIMA_INDEX + 1)]
+    
+    def adauga(self, masti_runde):
+        """Adaugă rundele noi în index"""
+        with etapa("construire index submulțimi", elemente=masti_runde.shape[0]):
+            adauga_in_index(masti_runde, *self.tabele)
+        self.n_runde += masti_runde.shape[0]
+    
+    def copie(self):
+        """Index independent cu aceleași numărători"""
+        index = IndexSubmultimi()
+        index.n_runde = self.n_runde
+        index.tabele = [tabel.copy() for tabel in self.tabele]
+        return index
+    
+    def histograma(self, masti_variante, numar_coloane):
+        """Histograma potrivirilor V × numar_coloane pentru variante de cel mult 4 numere"""
+        if get_num_threads() > 1 and masti_variante.shape[0] * 16 >= PRAG_PARALEL:
+            return calculeaza_histograma_index_paralel(masti_variante, self.n_runde, *self.tabele, numar_coloane)
+        return calculeaza_histograma_index(masti_variante, self.n_runde, *self.tabele, numar_coloane)
+
+def cost_construire_index(runde):
+    """Numărul de incrementări necesare pentru a construi indexul unui chenar"""
+    lungimi = np.diff(runde.offsets).astype(np.int64)
+    return int(sum(BINOM[np.minimum(lungimi, NUMAR_MAXIM), marime].sum() for marime in range(1, MARIME_MAXIMA_INDEX + 1)))
+
+def foloseste_index(runde, n_variante, numar_coloane):
+    """Indexul de submulțimi e mai ieftin decât scorarea pe măști (variante de cel mult 4 numere)?"""
+    if numar_coloane > MARIME_MAXIMA_INDEX + 1 or len(runde) == 0:
+        return False
+    cost_index = 16 * n_variante + (0 if runde.are_index() else cost_construire_index(runde))
+    return cost_index < n_variante * len(runde)
+
+def histograma_chenar(masti_variante, runde, numar_coloane):
+    """Histograma V × numar_coloane pentru un chenar - prin index sau pe măști, care e mai ieftin"""
+    if foloseste_index(runde, masti_variante.shape[0], numar_coloane):
+        return runde.index.histograma(masti_variante, numar_coloane)
+    inceput = np.array([0, len(runde)], dtype=np.int64)
+    return histograma_potriviri(masti_variante, runde.masti, inceput, numar_coloane)[:, 0]
+
+# Memoria maximă ocupată de histogramele păstrate între rerulări
+BUGET_CACHE_OCTETI = 512 * 1024 * 1024
+# Stări incrementale per chenar: câte seturi de variante diferite (de exemplu pagina 1 și pagina 2)
+NUMAR_STARI_CHENAR = 2
+
+class CacheRezultate:
+    """Cache LRU cu buget de memorie pentru histogramele per chenar, cheie = amprente de conținut.
+
+    Poate fi folosit simultan din mai multe lucrări de fundal.
+    """
+    
+    def __init__(self, buget_octeti=BUGET_CACHE_OCTETI):
+        self.buget_octeti = buget_octeti
+        self.blocare = threading.Lock()
+        self.intrari = OrderedDict()
+        # Memoria fiecărei intrări, așa cum a fost contabilizată în `octeti`
+        self.marimi = {}
+        self.octeti = 0
+        self.gasite = 0
+        self.ratate = 0
+        # Ultimele stări calculate per chenar (cea mai recentă prima), pentru actualizări incrementale la adăugare;
+        # câte una per set de variante, ca paginile cu seturi diferite să nu-și suprascrie starea
+        self.stari_chenare = {}
+    
+    def obtine(self, cheie):
+        with self.blocare:
+            valoare = self.intrari.get(cheie)
+            if valoare is None:
+                self.ratate += 1
+                return None
+            self.intrari.move_to_end(cheie)
+            self.gasite += 1
+            return valoare
+    
+    def stari(self, c):
+        """Stările incrementale ale chenarului c, cea mai recentă prima"""
+        with self.blocare:
+            return list(self.stari_chenare.get(c, ()))
+    
+    def retine_stare(self, c, stare, inlocuita=None):
+        """Reține starea nouă a chenarului c, în locul celei din care a fost actualizată (sau a celei mai vechi)"""
+        with self.blocare:
+            stari = [s for s in self.stari_chenare.get(c, ()) if s is not inlocuita and s[:4] != stare[:4]]
+            self.stari_chenare[c] = [stare] + stari[:NUMAR_STARI_CHENAR - 1]
+    
+    def contine(self, cheie):
+        """Cheia e în cache? (fără a schimba ordinea LRU sau statisticile)"""
+        with self.blocare:
+            return cheie in self.intrari
+    
+    def adauga(self, cheie, valoare):
+        if valoare.nbytes > self.buget_octeti:
+            return
+        with self.blocare:
+            if cheie in self.intrari:
+                del self.intrari[cheie]
+                self.octeti -= self.marimi.pop(cheie)
+            self.intrari[cheie] = valoare
+            self.marimi[cheie] = valoare.nbytes
+            self.octeti += valoare.nbytes
+            self._evacueaza()
+    
+    def reevalueaza(self, cheie):
+        """Recalculează memoria unei intrări care a crescut după adăugare (de exemplu ScoruriRecente)"""
+        with self.blocare:
+            if cheie not in self.intrari:
+                return
+            marime = self.intrari[cheie].nbytes
+            self.octeti += marime - self.marimi[cheie]
+            self.marimi[cheie] = marime
+            self._evacueaza()
+    
+    def _evacueaza(self):
+        # Evacuare LRU până intrăm în buget (apelată cu blocarea luată)
+        while self.octeti > self.buget_octeti:
+            cheie, _ = self.intrari.popitem(last=False)
+            self.octeti -= self.marimi.pop(cheie)
+
+def amprenta(tablou):
+    """Amprentă de conținut (blake2b) pentru un tablou numpy"""
+    return hashlib.blake2b(np.ascontiguousarray(tablou), digest_size=16).hexdigest()
+
+def histograma_incrementala(stare, masti_variante, runde, numar_coloane):
+    """Actualizează histograma unui chenar când s-au adăugat doar runde și/sau variante la final.
+
+    Returnează None dacă datele vechi nu sunt un prefix al celor noi (e nevoie de recalculare completă).
+    """
+    if stare is None:
+        return None
+    
+    amprenta_runde, n_runde, amprenta_variante, n_variante, histograma_veche = stare
+    if n_runde > len(runde) or n_variante > masti_variante.shape[0]:
+        return None
+    if histograma_veche.shape[1] > numar_coloane:
+        return None
+    if amprenta(runde.masti[:n_runde]) != amprenta_runde or amprenta(masti_variante[:n_variante]) != amprenta_variante:
+        return None
+    
+    histograma = np.zeros((masti_variante.shape[0], numar_coloane), dtype=np.uint32)
+    histograma[:n_variante, :histograma_veche.shape[1]] = histograma_veche
+    
+    # Runde noi: doar ele se scorează pentru variantele vechi
+    if n_runde < len(runde) and n_variante > 0:
+        runde_noi = runde.masti[n_runde:]
+        inceput_noi = np.array([0, runde_noi.shape[0]], dtype=np.int64)
+        histograma[:n_variante] += histograma_potriviri(masti_variante[:n_variante], runde_noi, inceput_noi, numar_coloane)[:, 0]
+    
+    # Variante noi: se scorează pe toate rundele
+    if n_variante < masti_variante.shape[0]:
+        histograma[n_variante:] = histograma_chenar(masti_variante[n_variante:], runde, numar_coloane)
+    
+    return histograma
+
+# Variantele scorate pe măști se procesează în blocuri, pentru raportarea progresului
+MARIME_BLOC_VARIANTE = 1 << 16
+
+def histograma_in_cache(cache, masti_variante, runde_chenare):
+    """Histogramele tuturor chenarelor sunt deja în cache (histograma_chenare nu mai scorează nimic)?"""
+    if cache is None:
+        return False
+    numar_coloane = numar_maxim_potriviri(masti_variante) + 1
+    amprenta_variante = amprenta(masti_variante)
+    return all(cache.contine((amprenta(runde.masti), amprenta_variante, numar_coloane)) for runde in runde_chenare)
+
+def histograma_chenare(masti_variante, runde_chenare, cache=None, progres=None):
+    """Histograma potrivirilor V × chenare × (k+1), asamblată per chenar.
+
+    Cu cache: din cache, incremental după adăugări sau recalculată. Chenarele recalculate pe măști
+    merg împreună, în blocuri de variante; cele pentru care indexul de submulțimi e mai ieftin îl
+    folosesc. `progres(fractie)` e apelat după fiecare chenar indexat și fiecare bloc.
+    """
+    n_variante = masti_variante.shape[0]
+    n_chenare = len(runde_chenare)
+    numar_coloane = numar_maxim_potriviri(masti_variante) + 1
+    amprenta_variante = amprenta(masti_variante) if cache is not None else None
+    histograma = np.zeros((n_variante, n_chenare, numar_coloane), dtype=np.uint32)
+    chei = [None] * n_chenare
+    
+    def pastreaza(c, histograma_chenar_c, adauga_in_cache, stare_veche=None):
+        histograma[:, c] = histograma_chenar_c
+        if cache is not None:
+            if adauga_in_cache:
+                cache.adauga(chei[c], histograma_chenar_c)
+            stare = (chei[c][0], len(runde_chenare[c]), amprenta_variante, n_variante, histograma_chenar_c)
+            cache.retine_stare(c, stare, stare_veche)
+    
+    indexate = []
+    lipsa = []
+    for c, runde in enumerate(runde_chenare):
+        if cache is not None:
+            with etapa(f"cache histogramă (chenar {c+1})", elemente=n_variante):
+                chei[c] = (amprenta(runde.masti), amprenta_variante, numar_coloane)
+                din_cache = cache.obtine(chei[c])
+                histograma_chenar_c = din_cache
+                stare_veche = None
+                if din_cache is None:
+                    for stare_veche in cache.stari(c):
+                        histograma_chenar_c = histograma_incrementala(stare_veche, masti_variante, runde, numar_coloane)
+                        if histograma_chenar_c is not None:
+                            break
+            if histograma_chenar_c is not None:
+                pastreaza(c, histograma_chenar_c, din_cache is None, stare_veche)
+                continue
+        
+        if foloseste_index(runde, n_variante, numar_coloane):
+            indexate.append(c)
+        else:
+            lipsa.append(c)
+    
+    # Progresul se măsoară în operații estimate: 16 căutări per variantă prin index, o comparație per rundă pe măști
+    runde_lipsa = sum(len(runde_chenare[c]) for c in lipsa)
+    cost_total = max(16 * n_variante * len(indexate) + n_variante * runde_lipsa, 1)
+    cost_facut = 0
+    
+    for c in indexate:
+        index = runde_chenare[c].index
+        with etapa(f"nucleu index (chenar {c+1})", elemente=n_variante, operatii=n_variante * len(runde_chenare[c])):
+            pastreaza(c, index.histograma(masti_variante, numar_coloane), True)
+        cost_facut += 16 * n_variante
+        if progres is not None:
+            progres(cost_facut / cost_total)
+    
+    if lipsa:
+        # Chenarele scorate pe măști se calculează împreună, bloc cu bloc
+        masti_lipsa, inceput_lipsa = codifica_chenare([runde_chenare[c] for c in lipsa])
+        with etapa(f"nucleu măști ({len(lipsa)} chenare)", elemente=n_variante, operatii=n_variante * runde_lipsa):
+            for inceput in range(0, n_variante, MARIME_BLOC_VARIANTE):
+                sfarsit = min(inceput + MARIME_BLOC_VARIANTE, n_variante)
+                histograma[inceput:sfarsit, lipsa] = histograma_potriviri(
+                    masti_variante[inceput:sfarsit], masti_lipsa, inceput_lipsa, numar_coloane
+                )
+                cost_facut += (sfarsit - inceput) * runde_lipsa
+                if progres is not None:
+                    progres(cost_facut / cost_total)
+        
+        for c in lipsa:
+            pastreaza(c, histograma[:, c].copy(), True)
+    
+    return histograma
+
+# Punctaje pe runde recente. Rundele unui chenar sunt în ordinea adăugării, ultima fiind cea mai recentă.
+# Per variantă și chenar se păstrează sumele cumulative de-a lungul rundelor (punctaj și runde cu cel puțin
+# 2 potriviri) la anumite poziții: întotdeauna la capătul istoricului, apoi înapoi de la capăt, mai dese în
+# ultimele ZONA_RECENTA runde. Suma pe ultimele N runde e diferența a două sume cumulative; când N nu cade pe
+# o poziție păstrată, se scorează direct doar rundele până la cea mai apropiată poziție (cel mult jumătate din
+# distanța dintre două poziții). Toate pozițiile sunt păstrate (diferență pură) când datele încap în buget.
+BUGET_RECENTE_OCTETI = 256 * 1024 * 1024
+# Ferestrele folosite în practică (pagina, CLI, benchmark-ul 'ferestre') sunt de cel mult atâtea runde;
+# în ele intră trei sferturi din pozițiile păstrate
+ZONA_RECENTA = 5000
+# Variantele se parcurg în blocuri, ca sumele curente ale blocului să rămână în cache
+MARIME_BLOC_RECENTE = 1024
+
+@jit(nopython=True, nogil=True, cache=True)
+def acumuleaza_cumulative(masti_variante, start, stop, masti_runde, pozitii, descrestere, punctaj_cumulat, active_cumulate,
+                          cu_active):
+    """Scrie pe rândul j sumele pe primele pozitii[j] runde (pozitii[0] = 0, crescătoare), pentru variantele start..stop.
+
+    Punctajul se cumulează cu descreștere (S = descrestere·S + punctaj; 1 = sumă simplă).
+    """
+    suma = np.zeros(stop - start, dtype=np.float64)
+    numar = np.zeros(stop - start, dtype=np.int64)
+    rand = 1
+    for k in range(masti_runde.shape[0]):
+        b0 = masti_runde[k, 0]
+        b1 = masti_runde[k, 1]
+        for v in range(start, stop):
+            potriviri = numara_potriviri_masti(masti_variante[v, 0], masti_variante[v, 1], b0, b1)
+            suma[v - start] = descrestere * suma[v - start] + calculeaza_punctaj_numba(potriviri)
+            if potriviri >= 2:
+                numar[v - start] += 1
+        
+        if rand < pozitii.shape[0] and pozitii[rand] == k + 1:
+            for v in range(start, stop):
+                punctaj_cumulat[rand, v] = suma[v - start]
+                if cu_active:
+                    active_cumulate[rand, v] = numar[v - start]
+            rand += 1
+
+@jit(nopython=True, nogil=True, cache=True)
+def calculeaza_cumulative(masti_variante, masti_runde, pozitii, descrestere, punctaj_cumulat, active_cumulate, cu_active):
+    """Sumele cumulative (rânduri = pozitii, coloane = variante) în tablourile date, cu rândul 0 zero"""
+    n_variante = masti_variante.shape[0]
+    for start in range(0, n_variante, MARIME_BLOC_RECENTE):
+        stop = min(start + MARIME_BLOC_RECENTE, n_variante)
+        acumuleaza_cumulative(masti_variante, start, stop, masti_runde, pozitii, descrestere, punctaj_cumulat,
+                              active_cumulate, cu_active)
+
+@jit(nopython=True, nogil=True, parallel=True, cache=True)
+def calculeaza_cumulative_paralel(masti_variante, masti_runde, pozitii, descrestere, punctaj_cumulat, active_cumulate,
+                                  cu_active):
+    """Ca calculeaza_cumulative, paralel pe blocurile de variante"""
+    n_variante = masti_variante.shape[0]
+    n_blocuri = (n_variante + MARIME_BLOC_RECENTE - 1) // MARIME_BLOC_RECENTE
+    for b in prange(n_blocuri):
+        start = b * MARIME_BLOC_RECENTE
+        stop = min(start + MARIME_BLOC_RECENTE, n_variante)
+        acumuleaza_cumulative(masti_variante, start, stop, masti_runde, pozitii, descrestere, punctaj_cumulat,
+                              active_cumulate, cu_active)
+
+@jit(nopython=True, nogil=True, parallel=True, cache=True)
+def punctaje_ponderate(masti_variante, masti_runde, ponderi):
+    """Σ ponderi[r] · punctaj(v, r) și numărul de runde cu cel puțin 2 potriviri, per variantă"""
+    n_variante = masti_variante.shape[0]
+    punctaj = np.zeros(n_variante, dtype=np.float64)
+    active = np.zeros(n_variante, dtype=np.int64)
+    for v in prange(n_variante):
+        a0 = masti_variante[v, 0]
+        a1 = masti_variante[v, 1]
+        for r in range(masti_runde.shape[0]):
+            potriviri = numara_potriviri_masti(a0, a1, masti_runde[r, 0], masti_runde[r, 1])
+            punctaj[v] += ponderi[r] * calculeaza_punctaj_numba(potriviri)
+            if potriviri >= 2:
+                active[v] += 1
+    return punctaj, active
+
+def tip_cumulativ(maxim):
+    """Cel mai mic tip întreg fără semn în care încape `maxim`"""
+    return np.uint16 if maxim <= np.iinfo(np.uint16).max else np.uint32
+
+def octeti_cumulative(n_variante, lungimi, pas, descrestere=False):
+    """Memoria sumelor cumulative cu un pas dat: punctaj + runde active sau (descrestere) punctajul float64"""
+    total = 0
+    for lungime in lungimi:
+        if descrestere:
+            octeti_pe_rand = 8
+        else:
+            octeti_pe_rand = np.dtype(tip_cumulativ(lungime * PUNCTAJ_MAXIM)).itemsize + np.dtype(tip_cumulativ(lungime)).itemsize
+        total += (lungime // pas + 1) * octeti_pe_rand
+    return n_variante * total
+
+def pas_cumulative(n_variante, lungimi, buget_octeti=BUGET_RECENTE_OCTETI, descrestere=False):
+    """Cel mai mic pas (în runde) la care sumele cumulative încap în buget"""
+    pas = max(octeti_cumulative(n_variante, lungimi, 1, descrestere) // max(buget_octeti, 1), 1)
+    while pas < max(lungimi, default=1) and octeti_cumulative(n_variante, lungimi, pas, descrestere) > buget_octeti:
+        pas += 1
+    return pas
+
+def pozitii_cumulative(n_runde, n_pozitii, zona=ZONA_RECENTA):
+    """Pozițiile (număr de runde de la început, crescătoare, de la 0 la n_runde) la care se păstrează sumele cumulative.
+
+    În afară de 0 sunt n_pozitii poziții, așezate înapoi de la capăt: trei sferturi uniform în ultimele `zona` runde,
+    restul uniform pe istoricul mai vechi. Toate pozițiile, dacă n_pozitii >= n_runde.
+    """
+    if n_pozitii >= n_runde:
+        return np.arange(n_runde + 1, dtype=np.int64)
+    zona = min(zona, n_runde)
+    in_zona = n_pozitii if zona == n_runde else min(max(n_pozitii * 3 // 4, 1), zona)
+    distante = np.concatenate([
+        np.linspace(0, zona, in_zona + 1),
+        np.linspace(zona, n_runde, max(n_pozitii - in_zona, 0) + 1),
+    ])
+    return np.unique(np.concatenate([[0], n_runde - np.rint(distante).astype(np.int64)]))
+
+def rand_apropiat(pozitii, x, urcare_maxima):
+    """Indicele poziției păstrate cea mai apropiată de x: sub x sau, dacă e mai aproape, cel mult `urcare_maxima` peste"""
+    j = int(np.searchsorted(pozitii, x, side='right')) - 1
+    if (pozitii[j] < x and j + 1 < pozitii.shape[0] and pozitii[j + 1] - x < x - pozitii[j]
+            and pozitii[j + 1] - x <= urcare_maxima):
+        return j + 1
+    return j
+
+class ScoruriRecente:
+    """Sumele cumulative de-a lungul rundelor fiecărui chenar, per variantă: ferestre și descreștere fără rescorare.
+
+    punctaj[c][k, v] = punctajul variantei v pe primele pozitii[c][k] runde ale chenarului c, active[c][k, v] =
+    câte dintre ele au cel puțin 2 potriviri. Pentru descreștere se calculează (o dată per factor, cu pozițiile
+    proprii) sumele cumulate cu E = factor·E + punctaj, din care fereastra e E(sfârșit) - factor^lungime · E(început).
+    Fiecare din cele două seturi de sume are bugetul dat; numărul de poziții per chenar e cel de la pasul
+    uniform care încape în buget.
+    """
+    
+    def __init__(self, masti_variante, runde_chenare, buget_octeti=BUGET_RECENTE_OCTETI, progres=None):
+        self.masti_variante = masti_variante
+        self.masti_runde = [runde.masti for runde in runde_chenare]
+        lungimi = [masti.shape[0] for masti in self.masti_runde]
+        self.pas = pas_cumulative(masti_variante.shape[0], lungimi, buget_octeti)
+        self.pas_descrestere = pas_cumulative(masti_variante.shape[0], lungimi, buget_octeti, descrestere=True)
+        self.pozitii = [pozitii_cumulative(lungime, max(lungime // self.pas, 1)) for lungime in lungimi]
+        self.pozitii_descrestere = [
+            pozitii_cumulative(lungime, max(lungime // self.pas_descrestere, 1)) for lungime in lungimi
+        ]
+        self.punctaj = []
+        self.active = []
+        self.blocare = threading.Lock()
+        self.descrescatoare = {}
+        # Cache-ul (și cheia) în care e păstrat obiectul: sumele cu descreștere se adaugă la memoria contabilizată
+        self.in_cache = None
+        
+        total = max(sum(lungimi), 1)
+        facut = 0
+        for c, masti in enumerate(self.masti_runde):
+            punctaj = self._tablou_cumulativ(self.pozitii[c], tip_cumulativ(masti.shape[0] * PUNCTAJ_MAXIM))
+            active = self._tablou_cumulativ(self.pozitii[c], tip_cumulativ(masti.shape[0]))
+            self._cumuleaza(c, self.pozitii[c], 1.0, punctaj, active, True)
+            self.punctaj.append(punctaj)
+            self.active.append(active)
+            facut += masti.shape[0]
+            if progres is not None:
+                progres(facut / total)
+    
+    def _tablou_cumulativ(self, pozitii, tip):
+        return np.zeros((pozitii.shape[0], self.masti_variante.shape[0]), dtype=tip)
+    
+    def _cumuleaza(self, c, pozitii, descrestere, punctaj, active, cu_active):
+        masti = self.masti_runde[c]
+        n_variante = self.masti_variante.shape[0]
+        with etapa(f"sume cumulative pe runde (chenar {c+1})", elemente=n_variante, operatii=n_variante * masti.shape[0]):
+            if get_num_threads() > 1 and n_variante * masti.shape[0] >= PRAG_PARALEL:
+                calculeaza_cumulative_paralel(self.masti_variante, masti, pozitii, descrestere, punctaj, active, cu_active)
+            else:
+                calculeaza_cumulative(self.masti_variante, masti, pozitii, descrestere, punctaj, active, cu_active)
+    
+    @property
+    def nbytes(self):
+        tablouri = self.punctaj + self.active + [t for lista in self.descrescatoare.values() for t in lista]
+        return sum(tablou.nbytes for tablou in tablouri)
+    
+    def _descrescatoare(self, descrestere):
+        """Sumele cumulate cu descreștere pentru factorul dat; se păstrează doar ultimul factor cerut"""
+        with self.blocare:
+            tablouri = self.descrescatoare.get(descrestere)
+            calculate = tablouri is None
+            if calculate:
+                tablouri = []
+                for c, masti in enumerate(self.masti_runde):
+                    tablou = self._tablou_cumulativ(self.pozitii_descrestere[c], np.float64)
+                    self._cumuleaza(c, self.pozitii_descrestere[c], descrestere, tablou, self.active[c], False)
+                    tablouri.append(tablou)
+                self.descrescatoare = {descrestere: tablouri}
+        if calculate and self.in_cache is not None:
+            cache, cheie = self.in_cache
+            cache.reevalueaza(cheie)
+        return tablouri
+    
+    def _prefix(self, c, x):
+        """(punctaj, runde active) pe primele x runde ale chenarului c: suma cumulativă de la cea mai apropiată poziție
+        păstrată, corectată cu rundele dintre ea și x, scorate direct"""
+        pozitii = self.pozitii[c]
+        j = rand_apropiat(pozitii, x, pozitii[-1])
+        punctaj = self.punctaj[c][j].astype(np.int64)
+        active = self.active[c][j].astype(np.int64)
+        if pozitii[j] != x:
+            jos, sus = sorted((int(pozitii[j]), x))
+            punctaj_rest, active_rest = punctaje_ponderate(self.masti_variante, self.masti_runde[c][jos:sus],
+                                                           np.ones(sus - jos))
+            semn = 1 if pozitii[j] < x else -1
+            punctaj += semn * punctaj_rest.astype(np.int64)
+            active += semn * active_rest
+        return punctaj, active
+    
+    def _prefix_descrescator(self, c, x, descrestere, putere=0):
+        """descrestere^putere · E(x), unde E(x) = Σ descrestere^(x-1-j) · punctaj(runda j) pe primele x runde ale chenarului c.
+
+        O poziție păstrată de deasupra lui x se folosește doar până la `putere` runde distanță: factorul rămas
+        descrestere^(putere - distanță) e cel mult 1, deci scăderea nu amplifică erorile de rotunjire.
+        """
+        pozitii = self.pozitii_descrestere[c]
+        sume = self._descrescatoare(descrestere)[c]
+        j = rand_apropiat(pozitii, x, putere)
+        p = int(pozitii[j])
+        if p > x:
+            # E(p) = descrestere^(p-x) · E(x) + Σ_{x ≤ r < p} descrestere^(p-1-r) · punctaj(r)
+            ponderi = np.power(descrestere, np.arange(p - x - 1, -1, -1, dtype=np.float64))
+            corectie = punctaje_ponderate(self.masti_variante, self.masti_runde[c][x:p], ponderi)[0]
+            return descrestere ** (putere - (p - x)) * (sume[j] - corectie)
+        punctaj = sume[j] * descrestere ** (x - p)
+        if x > p:
+            ponderi = np.power(descrestere, np.arange(x - p - 1, -1, -1, dtype=np.float64))
+            punctaj = punctaj + punctaje_ponderate(self.masti_variante, self.masti_runde[c][p:x], ponderi)[0]
+        return descrestere ** putere * punctaj
+    
+    def fereastra(self, c, lungime=None, decalaj=0, descrestere=1.0):
+        """(punctaj, runde cu ≥ 2 potriviri) per variantă pe `lungime` runde (None = toate) din chenarul c.
+
+        Fereastra se termină cu `decalaj` runde înaintea celei mai recente. Cu descrestere < 1, runda aflată
+        la distanța a de capătul ferestrei are ponderea descrestere**a, iar punctajul e float64.
+        """
+        n_runde = self.masti_runde[c].shape[0]
+        sfarsit = n_runde - min(decalaj, n_runde)
+        inceput = 0 if lungime is None else max(sfarsit - lungime, 0)
+        punctaj_sfarsit, active_sfarsit = self._prefix(c, sfarsit)
+        punctaj_inceput, active_inceput = self._prefix(c, inceput)
+        if descrestere != 1.0:
+            punctaj_sfarsit = self._prefix_descrescator(c, sfarsit, descrestere)
+            punctaj_inceput = self._prefix_descrescator(c, inceput, descrestere, sfarsit - inceput)
+        return punctaj_sfarsit - punctaj_inceput, active_sfarsit - active_inceput
+
+def recente_chenare(masti_variante, runde_chenare, cache=None, progres=None):
+    """ScoruriRecente pentru variante × chenare, din cache dacă aceleași date au mai fost procesate"""
+    cheie = None
+    if cache is not None:
+        cheie = ('recente', tuple(amprenta(runde.masti) for runde in runde_chenare), amprenta(masti_variante))
+        recente = cache.obtine(cheie)
+        if recente is not None:
+            return recente
+    recente = ScoruriRecente(masti_variante, runde_chenare, progres=progres)
+    if cache is not None:
+        recente.in_cache = (cache, cheie)
+        cache.adauga(cheie, recente)
+    return recente
+
+def punctaje_recente(recente, fereastra=None, descrestere=1.0, decalaj=0):
+    """Matricea de punctaje variante × chenare, chenare active și SD pe fereastra de runde recente (ca punctaje_din_histograma)"""
+    coloane = [recente.fereastra(c, fereastra, decalaj, descrestere) for c in range(len(recente.masti_runde))]
+    punctaje = np.stack([punctaj for punctaj, _ in coloane], axis=1)
+    chenare_active = np.stack([active > 0 for _, active in coloane], axis=1).sum(axis=1)
+    return punctaje, chenare_active, sd_punctaje(punctaje)
+
+def mesaj_linii_respinse(sursa, linii_respinse):
+    """Textul avertismentului pentru liniile respinse la parsare"""
+    exemple = ', '.join(map(str, linii_respinse[:10].tolist()))
+    if len(linii_respinse) > 10:
+        exemple += ', ...'
+    return f"⚠️ {sursa}: {len(linii_respinse)} linii respinse (format invalid sau numere în afara 1..{NUMAR_MAXIM}) - liniile {exemple}"
+
+@jit(nopython=True, nogil=True, cache=True)
+def selecteaza_diversitate(numere, ordine, max_aparitii, limita):
+    """Parcurge variantele în ordinea dată și le păstrează pe cele care nu depășesc max_aparitii per număr.
+
+    Se oprește la `limita` variante selectate. Returnează indicii selectați și aparițiile finale (uint16[67]).
+    """
+    aparitii = np.zeros(NUMAR_MAXIM + 1, dtype=np.uint16)
+    selectati = np.empty(min(limita, ordine.shape[0]), dtype=np.int64)
+    n_selectati = 0
+    
+    for idx in ordine:
+        if n_selectati >= limita:
+            break
+        
+        poate_adauga = True
+        for num in numere[idx]:
+            if num > 0 and aparitii[num] + 1 > max_aparitii:
+                poate_adauga = False
+                break
+        
+        if poate_adauga:
+            selectati[n_selectati] = idx
+            n_selectati += 1
+            for num in numere[idx]:
+                if num > 0:
+                    aparitii[num] += 1
+    
+    return selectati[:n_selectati], aparitii
+
+def aplica_restrictie_diversitate(numere, ordine, max_aparitii, limita=100):
+    """Aplică restricția de diversitate - fiecare număr apare maxim X ori (numere = matrice stoc, ordine = indici sortați)"""
+    with etapa("filtru diversitate", elemente=len(ordine)):
+        return selecteaza_diversitate(numere, np.asarray(ordine, dtype=np.int64), max_aparitii, limita)
+
+def ordoneaza_clasament(indici, chenare_active, punctaj_total, sd=None):
+    """Sortează indicii după (-chenare_active, -punctaj_total[, sd]); egalitățile păstrează ordinea indicilor"""
+    chei = (-punctaj_total[indici], -chenare_active[indici])
+    if sd is not None:
+        chei = (sd[indici],) + chei
+    return indici[np.lexsort(chei)]
+
+# Câți candidați se sortează inițial, ca multiplu al țintei; se extinde dacă diversitatea respinge prea mulți
+FACTOR_SUPRASELECTIE = 4
+
+def clasament_top(numere, chenare_active, punctaj_total, sd, max_aparitii, limita):
+    """TOP `limita` cu diversitate, sortând doar cei mai buni candidați în loc de toate variantele.
+
+    Candidații sunt toate variantele cu (chenare_active, punctaj_total) cel puțin cât al m-lea cel mai bun,
+    deci formează un prefix exact al clasamentului complet. Dacă filtrul de diversitate nu atinge ținta
+    în acest prefix, m crește și selecția se reia.
+    """
+    n_variante = numere.shape[0]
+    chenare_active = chenare_active.astype(np.int64)
+    # Punctajele cu descreștere pe runde recente sunt reale, restul întregi
+    punctaj_total = punctaj_total.astype(np.float64 if punctaj_total.dtype.kind == 'f' else np.int64)
+    cheie = chenare_active * (punctaj_total.max(initial=0) + 1) + punctaj_total
+    m = max(limita * FACTOR_SUPRASELECTIE, 1024)
+    
+    while True:
+        with etapa("sortare clasament", elemente=n_variante):
+            if m >= n_variante:
+                candidati = np.arange(n_variante)
+            else:
+                prag = np.partition(cheie, n_variante - m)[n_variante - m]
+                candidati = np.flatnonzero(cheie >= prag)
+            
+            ordine = ordoneaza_clasament(candidati, chenare_active, punctaj_total, sd)
+        selectati, aparitii = aplica_restrictie_diversitate(numere, ordine, max_aparitii, limita)
+        if selectati.shape[0] >= limita or candidati.shape[0] == n_variante:
+            return selectati, aparitii
+        m *= FACTOR_SUPRASELECTIE
+
+def ataseaza_punctaje(variante, punctaje, chenare_active, sd):
+    """Atașează la stoc coloanele de punctaj (punctaje_per_chenar, punctaj_total, chenare_active, sd)"""
+    variante.coloane['punctaje_per_chenar'] = punctaje
+    variante.coloane['punctaj_total'] = punctaje.sum(axis=1)
+    variante.coloane['chenare_active'] = chenare_active
+    variante.coloane['sd'] = sd
+
+def top_stabilitate(variante, histograma, max_aparitii, limita=100):
+    """TOP stabilitate: atașează coloanele de punctaj la stoc și returnează (indici TOP, apariții)"""
+    with etapa("punctaje din histogramă", elemente=len(variante)):
+        punctaje, chenare_active, sd = punctaje_din_histograma(histograma)
+    ataseaza_punctaje(variante, punctaje, chenare_active, sd)
+    return clasament_top(variante.numere, chenare_active, variante.coloane['punctaj_total'], sd, max_aparitii, limita)
+
+def top_recente(variante, recente, max_aparitii, limita=100, fereastra=None, descrestere=1.0):
+    """TOP stabilitate pe ultimele `fereastra` runde ale fiecărui chenar și/sau cu descreștere (ca top_stabilitate)"""
+    with etapa("punctaje pe runde recente", elemente=len(variante)):
+        punctaje, chenare_active, sd = punctaje_recente(recente, fereastra, descrestere)
+    ataseaza_punctaje(variante, punctaje, chenare_active, sd)
+    return clasament_top(variante.numere, chenare_active, variante.coloane['punctaj_total'], sd, max_aparitii, limita)
+
+def filtrare_variante_finale_hibrid(variante, runde_chenare, usar_runde, max_aparitii_finale, target_count, cache=None,
+                                    progres=None, fereastra=None, descrestere=1.0):
+    """Filtrează variante HIBRID (StocVariante) - cu sau fără runde pentru sortare.
+
+    Cu `fereastra` (ultimele N runde per chenar) și/sau `descrestere` < 1, punctajele vin din sumele
+    cumulative pe runde recente în loc de histograma pe toate rundele.
+    """
+    
+    # PAS 1: Sortare (dacă se folosesc runde)
+    if usar_runde and any(len(runde) > 0 for runde in runde_chenare):
+        # Calculează punctaj pentru fiecare variantă
+        if fereastra is None and descrestere == 1.0:
+            histograma = histograma_chenare(variante.masti, runde_chenare, cache, progres)
+            with etapa("punctaje din histogramă", elemente=len(variante)):
+                punctaje, chenare_active, sd = punctaje_din_histograma(histograma)
+        else:
+            recente = recente_chenare(variante.masti, runde_chenare, cache, progres)
+            with etapa("punctaje pe runde recente", elemente=len(variante)):
+                punctaje, chenare_active, sd = punctaje_recente(recente, fereastra, descrestere)
+        ataseaza_punctaje(variante, punctaje, chenare_active, sd)
+        
+        # PAS 2: Sortare după punctaj (doar candidații necesari) + filtrare diversitate (max apariții)
+        indici_filtrati, aparitii = clasament_top(
+            variante.numere, chenare_active, variante.coloane['punctaj_total'], None, max_aparitii_finale, target_count
+        )
+    else:
+        # Fără sortare - ordinea originală, doar filtrare diversitate
+        indici_filtrati, aparitii = aplica_restrictie_diversitate(
+            variante.numere, np.arange(len(variante)), max_aparitii_finale, target_count
+        )
+    
+    return variante.subset(indici_filtrati), aparitii
+
+# Căutarea exhaustivă enumeră toate combinările de MARIME_COMBINARE numere din 1..66, în blocuri
+MARIME_COMBINARE = 4
+MARIME_BLOC_COMBINARI = 65536
+
+@jit(nopython=True, nogil=True, cache=True)
+def combinari_bloc(rang_inceput, n, marime):
+    """Combinările cu rangurile colex rang_inceput..rang_inceput+n-1, ca matrice uint8 (n, marime) crescătoare"""
+    combinare = np.empty(marime, dtype=np.int64)
+    rest = rang_inceput
+    limita = NUMAR_MAXIM
+    for i in range(marime, 0, -1):
+        x = i - 1
+        while x + 1 < limita and BINOM[x + 1, i] <= rest:
+            x += 1
+        combinare[i - 1] = x
+        rest -= BINOM[x, i]
+        limita = x
+    
+    numere = np.empty((n, marime), dtype=np.uint8)
+    for r in range(n):
+        for i in range(marime):
+            numere[r, i] = combinare[i] + 1
+        
+        # Succesorul în ordine colex: primul element care poate crește, cele de dinainte revin la 0, 1, ...
+        i = 0
+        while i < marime - 1 and combinare[i] + 1 == combinare[i + 1]:
+            i += 1
+        combinare[i] += 1
+        for j in range(i):
+            combinare[j] = j
+    return numere
+
+def pastreaza_candidati(cheie, m):
+    """Indicii cu cheia cel puțin cât a m-a cea mai mare (toate egalitățile incluse)"""
+    if cheie.shape[0] <= m:
+        return np.arange(cheie.shape[0])
+    prag = np.partition(cheie, cheie.shape[0] - m)[cheie.shape[0] - m]
+    return np.flatnonzero(cheie >= prag)
+
+def candidati_exhaustivi(runde_chenare, m, marime_bloc=MARIME_BLOC_COMBINARI, progres=None):
+    """Scorează toate combinările bloc cu bloc și păstrează doar primii m candidați după (chenare_active, punctaj).
+
+    Cheia fiecărei combinări nu depinde de bloc, iar pragul celor m rămași doar crește de la un bloc
+    la altul, deci rezultatul e exact prefixul clasamentului complet (cu egalități). Memoria rămâne
+    limitată la un bloc plus candidații.
+    """
+    n_combinari = int(BINOM[NUMAR_MAXIM, MARIME_COMBINARE])
+    punctaj_maxim = calculeaza_punctaj_numba(MARIME_COMBINARE) * sum(len(runde) for runde in runde_chenare)
+    numere = np.zeros((0, MARIME_COMBINARE), dtype=np.uint8)
+    chenare_active = np.zeros(0, dtype=np.int64)
+    punctaj_total = np.zeros(0, dtype=np.int64)
+    sd = np.zeros(0, dtype=np.float64)
+    
+    for inceput in range(0, n_combinari, marime_bloc):
+        bloc = StocVariante(np.zeros(0, dtype=str), combinari_bloc(inceput, min(marime_bloc, n_combinari - inceput), MARIME_COMBINARE))
+        punctaje_bloc, chenare_active_bloc, sd_bloc = punctaje_din_histograma(histograma_chenare(bloc.masti, runde_chenare))
+        
+        numere = np.concatenate([numere, bloc.numere])
+        chenare_active = np.concatenate([chenare_active, chenare_active_bloc])
+        punctaj_total = np.concatenate([punctaj_total, punctaje_bloc.sum(axis=1)])
+        sd = np.concatenate([sd, sd_bloc])
+        
+        pastrati = pastreaza_candidati(chenare_active * (punctaj_maxim + 1) + punctaj_total, m)
+        numere, chenare_active, punctaj_total, sd = numere[pastrati], chenare_active[pastrati], punctaj_total[pastrati], sd[pastrati]
+        
+        if progres is not None:
+            progres(min(inceput + marime_bloc, n_combinari) / n_combinari)
+    
+    return numere, chenare_active, punctaj_total, sd
+
+def cautare_exhaustiva(runde_chenare, max_aparitii, limita, marime_bloc=MARIME_BLOC_COMBINARI, progres=None):
+    """TOP `limita` din toate combinările de 4 numere, cu aceleași reguli de punctaj și diversitate ca TOP 100.
+
+    Dacă diversitatea nu atinge ținta printre candidații păstrați, căutarea se reia cu mai mulți. Când
+    ținta depășește ce permite max_aparitii (66 × max_aparitii numere în total), se scorează direct tot.
+    """
+    n_combinari = int(BINOM[NUMAR_MAXIM, MARIME_COMBINARE])
+    m = max(limita * FACTOR_SUPRASELECTIE, 1024)
+    if limita * MARIME_COMBINARE > NUMAR_MAXIM * max_aparitii:
+        m = n_combinari
+    
+    while True:
+        numere, chenare_active, punctaj_total, sd = candidati_exhaustivi(runde_chenare, m, marime_bloc, progres)
+        ordine = ordoneaza_clasament(np.arange(numere.shape[0]), chenare_active, punctaj_total, sd)
+        selectati, aparitii = aplica_restrictie_diversitate(numere, ordine, max_aparitii, limita)
+        if selectati.shape[0] >= limita or m >= n_combinari:
+            break
+        m *= FACTOR_SUPRASELECTIE ** 2
+    
+    rezultat = StocVariante(np.array([f"E{j}" for j in range(1, selectati.shape[0] + 1)], dtype=str), numere[selectati])
+    rezultat.coloane['chenare_active'] = chenare_active[selectati]
+    rezultat.coloane['punctaj_total'] = punctaj_total[selectati]
+    rezultat.coloane['sd'] = sd[selectati]
+    return rezultat, aparitii
+
+def citeste_runde_chenare(cai):
+    """Citește fișierele de runde (câte unul per chenar, None = chenar gol) -> (listă RundeChenar, linii respinse per fișier)"""
+    runde_chenare = []
+    respinse = []
+    for cale in cai:
+        if cale is None:
+            runde_chenare.append(RundeChenar())
+            respinse.append(np.zeros(0, dtype=np.int32))
+            continue
+        with open(cale, 'rb') as fisier:
+            valori, offsets, linii_respinse = parseaza_runde(fisier.read())
+        runde_chenare.append(RundeChenar(valori, offsets))
+        respinse.append(linii_respinse)
+    return runde_chenare, respinse
+
+def citeste_variante(cale):
+    """Citește un fișier de variante -> (StocVariante, linii respinse)"""
+    with open(cale, 'rb') as fisier:
+        ids, numere, respinse = parseaza_variante(fisier.read())
+    return StocVariante(ids, numere), respinse
+
+def incalzeste():
+    """Compilează (sau încarcă din cache-ul de pe disc) toate nucleele pe date minuscule; returnează secundele"""
+    inceput = time.perf_counter()
+    valori, offsets, _ = parseaza_runde(b"1,2,3,4,5,6\n7,8,9,10,64,66\n")
+    runde = RundeChenar(valori, offsets)
+    ids, numere, _ = parseaza_variante(b"1, 1 2 3 4\n2, 5 6 64 66\n")
+    variante = StocVariante(ids, numere)
+    masti = variante.masti
+    inceput_chenare = np.array([0, len(runde)], dtype=np.int64)
+    
+    # Ambele variante (serială și paralelă) ale fiecărui nucleu, indiferent de pragul de date
+    calculeaza_histograma(masti, runde.masti, inceput_chenare, 5)
+    calculeaza_histograma_paralel(masti, runde.masti, inceput_chenare, 5)
+    calculeaza_histograma_index(masti, runde.index.n_runde, *runde.index.tabele, 5)
+    calculeaza_histograma_index_paralel(masti, runde.index.n_runde, *runde.index.tabele, 5)
+    calculeaza_statistici_chenar(masti, runde.masti, 4)
+    calculeaza_statistici_chenar_paralel(masti, runde.masti, 4, 2)
+    verifica_varianta_numba(numere[0], valori[:6])
+    
+    histograma = histograma_chenare(masti, [runde, RundeChenar()])
+    top_stabilitate(variante, histograma, 5, 100)
+    for tip in (np.uint16, np.uint32, np.float64):
+        cumulate = np.zeros((len(runde) + 1, masti.shape[0]), dtype=tip)
+        active = np.zeros((len(runde) + 1, masti.shape[0]), dtype=np.uint16)
+        pozitii = np.arange(len(runde) + 1, dtype=np.int64)
+        calculeaza_cumulative(masti, runde.masti, pozitii, 1.0, cumulate, active, True)
+        calculeaza_cumulative_paralel(masti, runde.masti, pozitii, 1.0, cumulate, active, True)
+    recente = ScoruriRecente(masti, [runde, RundeChenar()])
+    top_recente(variante, recente, 5, 100, 1, 0.9)
+    filtrare_variante_finale_hibrid(variante, [runde], False, 5, 100)
+    combinari_bloc(0, 1, MARIME_COMBINARE)
+    return time.perf_counter() - inceput
@@ -0,0 +1,87 @@
+"""Pachet binar pentru un set de date (cele 7 chenare + variantele), reîncărcat prin memory-map.
+
+Pachetul e un director cu fișiere .npy necomprimate - numerele uint8, offset-urile CSR și măștile
+precalculate - plus un manifest.json scris ultimul. La încărcare tablourile se mapează direct din
+fișiere (np.load cu mmap_mode='r'): nu se parsează text și nu se copiază date.
+
+Salvarea peste un pachet existent (inclusiv cel din care sunt mapate datele salvate) șterge întâi
+manifestul, scrie fișiere temporare și le mută apoi peste cele vechi: maparea existentă rămâne
+pe fișierele vechi, care nu sunt trunchiate.
+
+Din interfață pachetele se salvează și se încarcă doar sub DIRECTOR_PACHETE (directorul_pachet).
+"""
+import json
+import os
+
+import numpy as np
+
+from motor import RundeChenar, StocVariante
+
+FISIER_MANIFEST = 'manifest.json'
+VERSIUNE_PACHET = 1
+SUFIX_TEMPORAR = '.tmp'
+# Directorul (relativ la cel de lucru al serverului) sub care interfața salvează și încarcă pachete
+DIRECTOR_PACHETE = 'pachete'
+
+def directorul_pachet(nume, baza=DIRECTOR_PACHETE):
+    """Calea pachetului `nume` sub directorul de bază; ValueError dacă ar ieși din el (.., cale absolută, legătură)"""
+    baza = os.path.realpath(baza)
+    cale = os.path.realpath(os.path.join(baza, nume.strip()))
+    if cale == baza or os.path.commonpath([baza, cale]) != baza:
+        raise ValueError(f"pachetul trebuie să fie un subdirector al {baza}")
+    return cale
+
+def este_pachet(director):
+    return os.path.isfile(os.path.join(director, FISIER_MANIFEST))
+
+def salveaza_pachet(director, runde_chenare, variante):
+    """Scrie chenarele (RundeChenar) și variantele (StocVariante) ca pachet binar în `director`"""
+    os.makedirs(director, exist_ok=True)
+    tablouri = {}
+    for i, runde in enumerate(runde_chenare):
+        tablouri[f'chenar_{i+1}_valori'] = runde.valori
+        tablouri[f'chenar_{i+1}_offsets'] = runde.offsets
+        tablouri[f'chenar_{i+1}_masti'] = runde.masti
+    tablouri['variante_ids'] = variante.ids
+    tablouri['variante_numere'] = variante.numere
+    tablouri['variante_masti'] = variante.masti
+
+    # Fără manifest pachetul e marcat incomplet până la final, chiar dacă scrierea se întrerupe
+    cale_manifest = os.path.join(director, FISIER_MANIFEST)
+    if os.path.exists(cale_manifest):
+        os.remove(cale_manifest)
+
+    temporare = {}
+    for nume, tablou in tablouri.items():
+        temporare[nume] = os.path.join(director, f'{nume}.npy{SUFIX_TEMPORAR}')
+        with open(temporare[nume], 'wb') as fisier:
+            np.save(fisier, np.ascontiguousarray(tablou))
+    for nume, temporar in temporare.items():
+        os.replace(temporar, os.path.join(director, f'{nume}.npy'))
+
+    # Manifestul se scrie ultimul: un pachet fără manifest e incomplet
+    manifest = {
+        'versiune': VERSIUNE_PACHET,
+        'chenare': [len(runde) for runde in runde_chenare],
+        'variante': len(variante),
+    }
+    with open(cale_manifest + SUFIX_TEMPORAR, 'w', encoding='utf-8') as fisier:
+        json.dump(manifest, fisier)
+    os.replace(cale_manifest + SUFIX_TEMPORAR, cale_manifest)
+
+def incarca_pachet(director):
+    """Încarcă un pachet salvat -> (listă RundeChenar, StocVariante), cu tablourile mapate din fișiere"""
+    with open(os.path.join(director, FISIER_MANIFEST), encoding='utf-8') as fisier:
+        manifest = json.load(fisier)
+    if manifest.get('versiune') != VERSIUNE_PACHET:
+        raise ValueError(f"versiune de pachet necunoscută: {manifest.get('versiune')}")
+
+    def mapeaza(nume):
+        return np.load(os.path.join(director, f'{nume}.npy'), mmap_mode='r')
+
+    runde_chenare = [
+        RundeChenar(mapeaza(f'chenar_{i}_valori'), mapeaza(f'chenar_{i}_offsets'), mapeaza(f'chenar_{i}_masti'))
+        for i in range(1, len(manifest['chenare']) + 1)
+    ]
+    variante = StocVariante(mapeaza('variante_ids'), mapeaza('variante_numere'), mapeaza('variante_masti'))
+    return runde_chenare, variante
@@ -0,0 +1,130 @@
+"""Scorare partiționată pe procese pentru seturi foarte mari de variante (zeci de milioane).
+
+Măștile rundelor (și tabelele indexului de submulțimi, pentru chenarele care îl folosesc) și măștile
+variantelor stau în multiprocessing.shared_memory: fiecare proces le vede fără copiere. Variantele se
+împart în partiții; fiecare partiție întoarce doar candidații ei de TOP (prefixul exact după
+(chenare_active, punctaj_total)) și totalurile histogramei per chenar, care se unesc în procesul principal.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from numba import set_num_threads
+
+from motor import (
+    BINOM, FACTOR_SUPRASELECTIE, MARIME_MAXIMA_INDEX, NUMAR_MAXIM, aplica_restrictie_diversitate,
+    calculeaza_histograma_index, codifica_chenare, foloseste_index, histograma_potriviri, numar_maxim_potriviri,
+    ordoneaza_clasament, pastreaza_candidati, punctaje_din_histograma
+)
+
+MARIME_PARTITIE = 1 << 20
+
+# Tablourile partajate, atașate o dată per proces lucrător
+_tablouri = {}
+_blocuri = []
+
+def creeaza_partajate(tablouri):
+    """Copiază tablourile în memorie partajată -> (descrieri pentru lucrători, blocurile de eliberat)"""
+    descrieri = {}
+    blocuri = []
+    for nume, tablou in tablouri.items():
+        bloc = shared_memory.SharedMemory(create=True, size=max(tablou.nbytes, 1))
+        blocuri.append(bloc)
+        np.ndarray(tablou.shape, dtype=tablou.dtype, buffer=bloc.buf)[...] = tablou
+        descrieri[nume] = (bloc.name, tablou.shape, tablou.dtype.str)
+    return descrieri, blocuri
+
+def elibereaza_partajate(blocuri):
+    for bloc in blocuri:
+        bloc.close()
+        bloc.unlink()
+
+def initializeaza_lucrator(descrieri, fire_per_proces):
+    """Atașează tablourile partajate (fără copiere); paralelismul vine din procese, nu din fire"""
+    set_num_threads(fire_per_proces)
+    for nume, (nume_bloc, forma, tip) in descrieri.items():
+        # Lucrătorii pornesc din procesul principal și îi folosesc resource_tracker-ul, deci blocul
+        # rămâne al procesului principal, care îl șterge la final
+        bloc = shared_memory.SharedMemory(name=nume_bloc)
+        _blocuri.append(bloc)
+        _tablouri[nume] = np.ndarray(forma, dtype=tip, buffer=bloc.buf)
+
+def scoreaza_partitie(inceput, sfarsit, chenare_index, chenare_masti, numar_coloane, m, cu_sd):
+    """Scorează variantele [inceput, sfarsit) -> (indici candidați, chenare active, punctaj total, SD, totaluri C × K)"""
+    masti_variante = _tablouri['masti_variante'][inceput:sfarsit]
+    n_chenare = len(chenare_index) + len(chenare_masti)
+    histograma = np.zeros((sfarsit - inceput, n_chenare, numar_coloane), dtype=np.uint32)
+
+    for poz, c in enumerate(chenare_index):
+        tabele = [_tablouri[f'index_{marime}'][poz] for marime in range(1, MARIME_MAXIMA_INDEX + 1)]
+        histograma[:, c] = calculeaza_histograma_index(
+            masti_variante, _tablouri['runde_index'][poz], *tabele, numar_coloane
+        )
+    if chenare_masti:
+        histograma[:, chenare_masti] = histograma_potriviri(
+            masti_variante, _tablouri['masti_runde'], _tablouri['inceput_chenare'], numar_coloane
+        )
+
+    punctaje, chenare_active, sd = punctaje_din_histograma(histograma)
+    punctaj_total = punctaje.sum(axis=1)
+    candidati = pastreaza_candidati(chenare_active * (punctaj_total.max(initial=0) + 1) + punctaj_total, m)
+    return (inceput + candidati, chenare_active[candidati], punctaj_total[candidati],
+            sd[candidati] if cu_sd else None, histograma.sum(axis=0, dtype=np.int64))
+
+def clasament_partitionat(variante, runde_chenare, max_aparitii, limita, cu_sd=True, n_procese=None,
+                          marime_partitie=MARIME_PARTITIE):
+    """TOP `limita` cu diversitate (ca clasament_top), scorat pe un fond de procese.
+
+    Returnează (indici selectați, apariții, totaluri per chenar C × K - ca histograma.sum(axis=0)).
+    Dacă diversitatea nu atinge ținta printre candidați, partițiile se rescorează cu mai mulți candidați.
+    """
+    n_procese = n_procese or os.cpu_count()
+    n_variante = len(variante)
+    masti_variante = variante.masti
+    numar_coloane = numar_maxim_potriviri(masti_variante) + 1
+
+    chenare_index = [c for c, runde in enumerate(runde_chenare) if foloseste_index(runde, n_variante, numar_coloane)]
+    chenare_masti = [c for c in range(len(runde_chenare)) if c not in chenare_index]
+    if chenare_masti:
+        masti_runde, inceput_chenare = codifica_chenare([runde_chenare[c] for c in chenare_masti])
+    else:
+        masti_runde, inceput_chenare = np.zeros((0, 2), dtype=np.uint64), np.zeros(1, dtype=np.int64)
+
+    tablouri = {'masti_variante': masti_variante, 'masti_runde': masti_runde, 'inceput_chenare': inceput_chenare,
+                'runde_index': np.array([runde_chenare[c].index.n_runde for c in chenare_index], dtype=np.int64)}
+    for marime in range(1, MARIME_MAXIMA_INDEX + 1):
+        tabele = [runde_chenare[c].index.tabele[marime - 1] for c in chenare_index]
+        tablouri[f'index_{marime}'] = np.stack(tabele) if tabele else np.zeros((0, BINOM[NUMAR_MAXIM, marime]), dtype=np.uint32)
+    descrieri, blocuri = creeaza_partajate(tablouri)
+
+    inceputuri = list(range(0, n_variante, marime_partitie))
+    sfarsituri = [min(inceput + marime_partitie, n_variante) for inceput in inceputuri]
+    m = max(limita * FACTOR_SUPRASELECTIE, 1024)
+    try:
+        with ProcessPoolExecutor(n_procese, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=initializeaza_lucrator, initargs=(descrieri, 1)) as fond:
+            while True:
+                n = len(inceputuri)
+                rezultate = list(fond.map(scoreaza_partitie, inceputuri, sfarsituri, [chenare_index] * n,
+                                          [chenare_masti] * n, [numar_coloane] * n, [m] * n, [cu_sd] * n))
+
+                indici = np.concatenate([r[0] for r in rezultate]) if rezultate else np.zeros(0, dtype=np.int64)
+                chenare_active = np.concatenate([r[1] for r in rezultate]) if rezultate else np.zeros(0, dtype=np.int64)
+                punctaj_total = np.concatenate([r[2] for r in rezultate]) if rezultate else np.zeros(0, dtype=np.int64)
+                sd = np.concatenate([r[3] for r in rezultate]) if rezultate and cu_sd else None
+                totaluri = sum((r[4] for r in rezultate), np.zeros((len(runde_chenare), numar_coloane), dtype=np.int64))
+
+                # Candidații globali: prefixul exact din reuniunea prefixelor partițiilor
+                pastrati = pastreaza_candidati(chenare_active * (punctaj_total.max(initial=0) + 1) + punctaj_total, m)
+                ordine = indici[pastrati][ordoneaza_clasament(
+                    np.arange(pastrati.shape[0]), chenare_active[pastrati], punctaj_total[pastrati],
+                    sd[pastrati] if sd is not None else None
+                )]
+                selectati, aparitii = aplica_restrictie_diversitate(variante.numere, ordine, max_aparitii, limita)
+                if selectati.shape[0] >= limita or m >= n_variante:
+                    return selectati, aparitii, totaluri
+                m *= FACTOR_SUPRASELECTIE ** 2
+    finally:
+        elibereaza_partajate(blocuri)
@@ -0,0 +1,11 @@
+"""Testele importă modulele din rădăcina depozitului (motor, export, ...) ca aplicația."""
+import os
+import sys
+
+RADACINA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RADACINA not in sys.path:
+    sys.path.insert(0, RADACINA)
+
+# Nucleele paralele rulează și din firele lucrărilor; cu stratul TBB procesul de test rămâne blocat la ieșire,
+# deci OpenMP are prioritate (TBB / workqueue rămân rezerve dacă OpenMP lipsește)
+os.environ.setdefault('NUMBA_THREADING_LAYER_PRIORITY', 'omp tbb workqueue')
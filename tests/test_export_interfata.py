@@ -0,0 +1,52 @@
+"""Descărcările din interfață: funcțiile amânate (data=callable) ale butoanelor TXT / CSV / Parquet rulează cu succes."""
+import os
+import time
+
+import numpy as np
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.testing.v1 import AppTest
+
+from export import parquet_disponibil
+
+APLICATIE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'analizarundevariante.py')
+
+def asteapta_lucrarile(aplicatie, secunde=300):
+    """Rulează aplicația până când lucrările de fundal s-au terminat și rezultatele au fost livrate"""
+    limita = time.monotonic() + secunde
+    while aplicatie.session_state['lucrari'] and time.monotonic() < limita:
+        time.sleep(0.1)
+        if all(not lucrare.in_curs() for lucrare in aplicatie.session_state['lucrari'].values()):
+            aplicatie.run()
+    assert not aplicatie.session_state['lucrari']
+
+def test_descarcari_top_100(monkeypatch):
+    rng = np.random.default_rng(1)
+    runde = "\n".join(",".join(map(str, sorted(rng.choice(np.arange(1, 67), 6, replace=False)))) for _ in range(30))
+    variante = [sorted(rng.choice(np.arange(1, 67), 4, replace=False).tolist()) for _ in range(50)]
+    text_variante = "\n".join(f"{i}, {' '.join(map(str, numere))}" for i, numere in enumerate(variante))
+
+    # Funcțiile amânate ale butoanelor de descărcare, după numele fișierului
+    amanate = {}
+    inregistreaza = MediaFileManager.add_deferred
+
+    def retine(self, functie, mimetype, coordonate, file_name=None):
+        amanate[file_name] = functie
+        return inregistreaza(self, functie, mimetype, coordonate, file_name=file_name)
+
+    monkeypatch.setattr(MediaFileManager, 'add_deferred', retine)
+
+    aplicatie = AppTest.from_file(APLICATIE, default_timeout=300)
+    aplicatie.run()
+    aplicatie.text_area(key="input_runde_0").input(runde)
+    aplicatie.button(key="add_runde_0").click().run()
+    aplicatie.text_area(key="input_variante_bulk").input(text_variante)
+    aplicatie.button(key="add_var").click().run()
+    asteapta_lucrarile(aplicatie)
+    assert not aplicatie.exception
+
+    asteptate = ['top_100.txt', 'top_100.csv'] + (['top_100.parquet'] if parquet_disponibil() else [])
+    for nume in asteptate:
+        date = amanate[nume]()
+        assert len(date) > 0, nume
+    linii = amanate['top_100.txt']().decode().splitlines()
+    assert all(linie.split(", ")[0].isdigit() for linie in linii)
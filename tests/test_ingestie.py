@@ -0,0 +1,18 @@
+"""Semnul + lipit de cifre e acceptat ca la int(); restul formelor cu + sunt respinse."""
+import numpy as np
+
+from ingestie import parseaza_runde, parseaza_variante
+
+
+def test_plus_in_runde():
+    valori, offsets, respinse = parseaza_runde(b"+1,2, +3 ,4,5,+66\n1,+ 2,3\n1,2+,3\n+,1\n1,++2\n1,2,+\n")
+    np.testing.assert_array_equal(valori, [1, 2, 3, 4, 5, 66])
+    np.testing.assert_array_equal(offsets, [0, 6])
+    np.testing.assert_array_equal(respinse, [2, 3, 4, 5, 6])
+
+
+def test_plus_in_variante():
+    ids, numere, respinse = parseaza_variante(b"A, +1 2 +3\nB, 1 + 2\nC, 1 +2+\n")
+    assert list(ids) == ["A"]
+    np.testing.assert_array_equal(numere, [[1, 2, 3]])
+    np.testing.assert_array_equal(respinse, [2, 3])
@@ -0,0 +1,27 @@
+"""Căile pachetelor alese din interfață rămân sub directorul de bază."""
+import os
+
+import pytest
+
+from pachet import directorul_pachet
+
+
+def test_subdirector_acceptat(tmp_path):
+    baza = tmp_path / "pachete"
+    assert directorul_pachet("pachet_date", baza) == os.path.join(os.path.realpath(baza), "pachet_date")
+    assert directorul_pachet("a/b", baza) == os.path.join(os.path.realpath(baza), "a", "b")
+
+
+@pytest.mark.parametrize("nume", ["", ".", "..", "../alt", "a/../../alt", "/etc", "/tmp/pachet"])
+def test_cale_in_afara_bazei_respinsa(tmp_path, nume):
+    with pytest.raises(ValueError):
+        directorul_pachet(nume, tmp_path / "pachete")
+
+
+def test_legatura_simbolica_in_afara_bazei_respinsa(tmp_path):
+    baza = tmp_path / "pachete"
+    baza.mkdir()
+    (tmp_path / "alt").mkdir()
+    os.symlink(tmp_path / "alt", baza / "legatura")
+    with pytest.raises(ValueError):
+        directorul_pachet("legatura", baza)
@@ -0,0 +1,67 @@
+"""Ferestrele de runde recente: valorile față de scorarea directă și câte runde se rescorează la un pas mare."""
+import numpy as np
+import pytest
+
+import motor
+
+N_RUNDE = 8000
+
+
+@pytest.fixture(scope="module")
+def date():
+    generator = np.random.default_rng(7)
+    valori = np.concatenate([generator.choice(np.arange(1, 81), 20, replace=False) for _ in range(N_RUNDE)])
+    runde = motor.RundeChenar(valori, np.arange(N_RUNDE + 1) * 20)
+    numere = np.array([np.sort(generator.choice(np.arange(1, 81), 6, replace=False)) for _ in range(200)])
+    variante = motor.StocVariante(np.arange(200).astype(str), numere)
+    # Bugetul permite ~20 de poziții per set de sume, deci pasul uniform e de sute de runde
+    buget = motor.octeti_cumulative(200, [N_RUNDE], 400, descrestere=True)
+    return variante.masti, runde, motor.ScoruriRecente(variante.masti, [runde], buget_octeti=buget)
+
+
+def referinta(masti, runde, inceput, sfarsit, descrestere=1.0):
+    ponderi = np.power(descrestere, np.arange(sfarsit - inceput - 1, -1, -1, dtype=np.float64))
+    return motor.punctaje_ponderate(masti, runde.masti[inceput:sfarsit], ponderi)
+
+
+def test_ferestre_egale_cu_scorarea_directa(date):
+    masti, runde, recente = date
+    assert recente.pas >= 200 and recente.pas_descrestere >= 200
+    for lungime, decalaj in ((50, 0), (1234, 0), (5000, 0), (N_RUNDE, 0), (777, 333), (50, 7950)):
+        punctaj, active = recente.fereastra(0, lungime, decalaj)
+        asteptat_punctaj, asteptat_active = referinta(masti, runde, N_RUNDE - decalaj - lungime, N_RUNDE - decalaj)
+        np.testing.assert_array_equal(punctaj, asteptat_punctaj)
+        np.testing.assert_array_equal(active, asteptat_active)
+        punctaj = recente.fereastra(0, lungime, decalaj, 0.99)[0]
+        asteptat = referinta(masti, runde, N_RUNDE - decalaj - lungime, N_RUNDE - decalaj, 0.99)[0]
+        np.testing.assert_allclose(punctaj, asteptat, rtol=1e-9, atol=1e-9)
+
+
+def test_baleierea_ferestrelor_rescoreaza_putine_runde(date, monkeypatch):
+    masti, runde, recente = date
+    recente.fereastra(0, 100, 0, 0.99)
+    scorate = []
+    original = motor.punctaje_ponderate
+
+    def numara(masti_variante, masti_runde, ponderi):
+        scorate.append(masti_runde.shape[0])
+        return original(masti_variante, masti_runde, ponderi)
+
+    monkeypatch.setattr(motor, "punctaje_ponderate", numara)
+    # Capătul istoricului e o poziție păstrată: ultimele N runde sunt o scădere plus cel mult jumătate
+    # din distanța dintre pozițiile din zona recentă
+    distante = []
+    for pozitii, pas in ((recente.pozitii[0], recente.pas), (recente.pozitii_descrestere[0], recente.pas_descrestere)):
+        assert pozitii[-1] == N_RUNDE
+        distante.append(np.diff(pozitii[pozitii >= N_RUNDE - motor.ZONA_RECENTA]).max())
+        assert distante[-1] < pas
+    for lungime in range(50, motor.ZONA_RECENTA + 1, 50):
+        scorate.clear()
+        recente.fereastra(0, lungime)
+        assert sum(scorate) <= (distante[0] + 1) // 2
+        scorate.clear()
+        recente.fereastra(0, lungime, 0, 0.99)
+        assert sum(scorate) <= (distante[0] + 1) // 2 + (distante[1] + 1) // 2
+    scorate.clear()
+    recente.fereastra(0, None)
+    assert scorate == []